@@ -0,0 +1,3 @@
+"""
+Benchmarks: synthetic scenes and a throughput runner.
+"""
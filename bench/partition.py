@@ -0,0 +1,105 @@
+"""
+Partitioned physics against a single World: does splitting the ground into regions pay off?
+
+    python -m bench.partition --scene grid --cubes 4000 --grids 1x1,2x2 --steps 240
+
+Every run steps the same seeded scene. Besides wall-clock steps/s it reports the
+coordinator's own time per step and the critical path: coordinator time plus the
+slowest region of each step. That is how long the steps take with a core per region,
+so it still tells the grids apart on a machine with fewer cores than regions.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+from bench.scenes import SCENES, make_scene
+from core.headless import HeadlessSim
+from core.partition import PartitionedWorld, RegionGrid
+from core.settings import PHYSICS
+
+
+@dataclass
+class PartitionResult:
+    grid: str  # "world" for the single in-process World
+    cubes: int
+    steps: int
+    steps_per_sec: float
+    critical_steps_per_sec: float  # with a core per region
+    coordinator_ms: float  # per step
+    handoffs: int
+    ghosts: int
+
+
+def run_world(kind: str, n: int, steps: int, seed: int) -> PartitionResult:
+    sim = HeadlessSim(specs=make_scene(kind, n, seed))
+    stats = sim.run(steps)
+    rate = stats.steps_per_sec
+    return PartitionResult("world", n, steps, rate, rate, 0.0, 0, 0)
+
+
+def run_grid(grid: RegionGrid, kind: str, n: int, steps: int, seed: int) -> PartitionResult:
+    dt = PHYSICS.dt_substep
+    with PartitionedWorld(grid=grid) as world:
+        for spec in make_scene(kind, n, seed):
+            world.spawn(spec)
+        world.step_physics(dt, 1, dt)  # bodies enter their regions; not timed, like HeadlessSim's spawn
+        stats = world.stats
+        coordinator0, critical0, handoffs0 = stats.coordinator_time, stats.critical_time, stats.handoffs
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            world.step_physics(dt, 1, dt)
+        wall = time.perf_counter() - t0
+        critical = stats.critical_time - critical0
+        return PartitionResult(
+            grid=f"{grid.cols}x{grid.rows}",
+            cubes=n,
+            steps=steps,
+            steps_per_sec=steps / wall if wall > 0.0 else 0.0,
+            critical_steps_per_sec=steps / critical if critical > 0.0 else 0.0,
+            coordinator_ms=(stats.coordinator_time - coordinator0) / steps * 1000.0,
+            handoffs=stats.handoffs - handoffs0,
+            ghosts=stats.ghosts,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench.partition", description="Partitioned physics benchmark")
+    parser.add_argument("--scene", default="grid", choices=list(SCENES), help="Synthetic scene kind.")
+    parser.add_argument("--cubes", type=int, default=4000)
+    parser.add_argument("--grids", default="1x1,2x2", help="Comma separated region grids.")
+    parser.add_argument("--steps", type=int, default=240, help="Fixed physics steps per run.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="Write results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = [run_world(args.scene, args.cubes, args.steps, args.seed)]
+    for text in args.grids.split(","):
+        results.append(run_grid(RegionGrid.parse(text), args.scene, args.cubes, args.steps, args.seed))
+    for r in results:
+        print(
+            f"{r.grid:>6} {r.cubes:>7}  {r.steps_per_sec:7.1f} steps/s  "
+            f"critical {r.critical_steps_per_sec:7.1f} steps/s  coordinator {r.coordinator_ms:6.2f} ms  "
+            f"{r.handoffs} handoffs  {r.ghosts} ghosts",
+            file=sys.stderr,
+        )
+
+    report = {
+        "cpus": os.cpu_count(),
+        "settings": {"scene": args.scene, "cubes": args.cubes, "steps": args.steps, "seed": args.seed},
+        "results": [asdict(r) for r in results],
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark runner: parse, spawn, step, pick and impulse throughput on synthetic scenes.
+
+    python -m bench.runner --sizes 1000,10000 --scenes grid,pile --out bench.json
+
+Scenes, step counts and query points are seeded, so results from different
+commits on the same machine are directly comparable.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+
+from panda3d.core import LPoint3
+
+from bench.scenes import SCENES, make_scene, to_config
+from core.headless import HeadlessSim
+from core.scene_config import iter_scene_config
+from core.settings import IMPULSE, PHYSICS
+
+
+@dataclass
+class BenchResult:
+    scene: str
+    cubes: int
+    parse_ms: float
+    spawn_ms: float
+    steps: int
+    steps_per_sec: float
+    step_ms_p50: float
+    step_ms_p95: float
+    pick_us_mean: float
+    impulse_us_mean: float
+    impulse_bodies_mean: float
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_one(kind: str, n: int, steps: int, queries: int, seed: int, radius: float, strength: float) -> BenchResult:
+    specs = make_scene(kind, n, seed)
+
+    # parse: the JSON schema through the streaming parser, as the app loads it
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"{kind}_{n}.json"
+        path.write_text(json.dumps(to_config(specs)), encoding="utf-8")
+        t0 = time.perf_counter()
+        parsed = sum(1 for _ in iter_scene_config(path))
+        parse_s = time.perf_counter() - t0
+    assert parsed == n
+
+    # idle_skip off: a scene that settles during the run would otherwise report skipped steps as fast ones
+    sim = HeadlessSim(specs=specs, physics=replace(PHYSICS, idle_skip=False))
+
+    # step: one fixed step per call, like the headless runner
+    dt = PHYSICS.dt_substep
+    world = sim.world
+    step_times = []
+    t_all = time.perf_counter()
+    for _ in range(steps):
+        t0 = time.perf_counter()
+        world.step_physics(dt=dt, max_substeps=1, substep_dt=dt)
+        step_times.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - t_all
+
+    rng = random.Random(seed)
+    nps = [record.np for record in world.records]
+    targets = [nps[rng.randrange(len(nps))].getPos() for _ in range(queries)]
+
+    # pick: vertical rays through random bodies
+    t0 = time.perf_counter()
+    for p in targets:
+        world.pick(LPoint3(p.x, p.y, p.z + 50.0), LPoint3(p.x, p.y, -1.0))
+    pick_s = (time.perf_counter() - t0) / max(1, queries)
+
+    # impulse: the query behind CrashWorldApp._emit_radial_impulse
+    pushed = 0
+    t0 = time.perf_counter()
+    for p in targets:
+        pushed += world.apply_radial_impulse(p, radius, strength)
+    impulse_s = (time.perf_counter() - t0) / max(1, queries)
+
+    return BenchResult(
+        scene=kind,
+        cubes=n,
+        parse_ms=parse_s * 1000.0,
+        spawn_ms=sim.stats.spawn_time * 1000.0,
+        steps=steps,
+        steps_per_sec=steps / wall if wall > 0.0 else 0.0,
+        step_ms_p50=statistics.median(step_times) * 1000.0,
+        step_ms_p95=_percentile(step_times, 0.95) * 1000.0,
+        pick_us_mean=pick_s * 1e6,
+        impulse_us_mean=impulse_s * 1e6,
+        impulse_bodies_mean=pushed / max(1, queries),
+    )
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        from panda3d.core import PandaSystem
+        panda = PandaSystem.getVersionString()
+    except ImportError:
+        panda = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "panda3d": panda,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench", description="CrashWorld benchmarks")
+    parser.add_argument("--scenes", default=",".join(SCENES), help="Comma separated scene kinds.")
+    parser.add_argument(
+        "--sizes", default="1000,10000",
+        help="Comma separated cube counts. 100000 works too, but steps for many minutes per scene.",
+    )
+    parser.add_argument("--steps", type=int, default=240, help="Fixed physics steps per scene.")
+    parser.add_argument("--queries", type=int, default=100, help="Picks and impulses per scene.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="Write results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = []
+    for n in (int(x) for x in args.sizes.split(",")):
+        for kind in args.scenes.split(","):
+            r = run_one(kind, n, args.steps, args.queries, args.seed, IMPULSE.radius, IMPULSE.strength)
+            results.append(r)
+            print(
+                f"{kind:>9} {n:>7}  parse {r.parse_ms:8.1f} ms  spawn {r.spawn_ms:8.1f} ms  "
+                f"{r.steps_per_sec:8.1f} steps/s  pick {r.pick_us_mean:7.1f} us  "
+                f"impulse {r.impulse_us_mean:8.1f} us",
+                file=sys.stderr,
+            )
+
+    report = {
+        "environment": _environment(),
+        "settings": {"steps": args.steps, "queries": args.queries, "seed": args.seed, "dt": PHYSICS.dt_substep},
+        "results": [asdict(r) for r in results],
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Synthetic scene generators. Same kind, count and seed always give the same scene.
+"""
+from __future__ import annotations
+
+import math
+import random
+from typing import Callable
+
+from core.scene_config import CubeSpec, spec_to_dict
+
+
+_COLORS = [
+    (0.90, 0.20, 0.20, 1.0),
+    (0.20, 0.85, 0.30, 1.0),
+    (0.20, 0.35, 0.95, 1.0),
+    (0.95, 0.80, 0.25, 1.0),
+]
+
+
+def _cube(i: int, pos: tuple[float, float, float], size: float = 1.0) -> CubeSpec:
+    return CubeSpec(name=f"cube_{i}", size=size, mass=1.0, color=_COLORS[i % len(_COLORS)], pos=pos)
+
+
+def grid(n: int, rng: random.Random) -> list[CubeSpec]:
+    """
+    Cubes resting side by side on the ground.
+    """
+    side = math.ceil(math.sqrt(n))
+    off = side * 1.1 / 2.0
+    return [_cube(i, ((i % side) * 1.1 - off, (i // side) * 1.1 - off, 0.5)) for i in range(n)]
+
+
+def stacks(n: int, rng: random.Random, height: int = 10) -> list[CubeSpec]:
+    """
+    Towers of `height` cubes, spaced so they don't touch.
+    """
+    columns = math.ceil(n / height)
+    side = math.ceil(math.sqrt(columns))
+    off = side * 2.0 / 2.0
+    out = []
+    for i in range(n):
+        col, level = divmod(i, height)
+        out.append(_cube(i, ((col % side) * 2.0 - off, (col // side) * 2.0 - off, 0.5 + level * 1.01)))
+    return out
+
+
+def pile(n: int, rng: random.Random) -> list[CubeSpec]:
+    """
+    Cubes dropped into one dense heap.
+    """
+    r = max(2.0, math.sqrt(n) * 0.4)
+    return [
+        _cube(i, (rng.uniform(-r, r), rng.uniform(-r, r), 1.0 + rng.uniform(0.0, n / (r * r) * 1.5)))
+        for i in range(n)
+    ]
+
+
+def freefall(n: int, rng: random.Random) -> list[CubeSpec]:
+    """
+    Widely spaced cubes high up: integration cost without contacts.
+    """
+    side = math.ceil(n ** (1.0 / 3.0))
+    off = side * 3.0 / 2.0
+    return [
+        _cube(i, ((i % side) * 3.0 - off, ((i // side) % side) * 3.0 - off, 200.0 + (i // (side * side)) * 3.0))
+        for i in range(n)
+    ]
+
+
+SCENES: dict[str, Callable[[int, random.Random], list[CubeSpec]]] = {
+    "grid": grid,
+    "stacks": stacks,
+    "pile": pile,
+    "freefall": freefall,
+}
+
+
+def make_scene(kind: str, n: int, seed: int = 1) -> list[CubeSpec]:
+    return SCENES[kind](n, random.Random(seed))
+
+
+def to_config(specs: list[CubeSpec]) -> dict:
+    """
+    The JSON scene schema for specs, as accepted by parse_scene_config.
+    """
+    return {"version": 1, "cubes": [spec_to_dict(s) for s in specs]}
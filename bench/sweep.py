@@ -0,0 +1,268 @@
+"""
+Parameter sweeps: one scene under many physics and impulse settings, spread over a process pool.
+
+    python -m bench.sweep --config configs/demo_cubes.json --param gravity=-9.81,-3.71 \\
+        --param strength=35,70 --param dt=1/240,1/120 --out sweep.csv
+
+Every run builds its own headless World in a worker process, so Bullet state is
+never shared and the sweep scales with the number of cores.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from fractions import Fraction
+from pathlib import Path
+
+from panda3d.core import LPoint3
+
+from core.scene_config import GroupSpec, SceneSpec, iter_scene_config
+from core.settings import IMPULSE, PHYSICS, PhysicsConfig
+
+
+# sweepable parameters and their defaults
+DEFAULTS: dict[str, float] = {
+    "gravity": PHYSICS.gravity[2],  # z component
+    "dt": PHYSICS.dt_substep,  # fixed step
+    "substeps": 1,  # fixed steps per step_physics call (a "frame")
+    "mass": 1.0,  # multiplier on every spec mass
+    "strength": IMPULSE.strength,  # radial impulse strength
+    "radius": IMPULSE.radius,  # radial impulse radius
+}
+
+
+@dataclass(frozen=True)
+class SweepCase:
+    index: int
+    params: dict[str, float]
+    config: str | None = None  # scene config file, or
+    scene: str = "pile"  # a synthetic bench scene
+    cubes: int = 200
+    seed: int = 1
+    # times are sim seconds, not steps: a sweep over dt must still run each case equally long
+    duration: float = 10.0  # per run
+    impulse_at: float = 1.0  # when the impulse fires (negative: never)
+    settle_speed: float = 0.05  # m/s; the scene is settled once no body is faster
+    sample_interval: float = 1.0 / 24.0  # between settle/displacement samples
+
+
+@dataclass
+class SweepResult:
+    index: int
+    params: dict[str, float]
+    bodies: int
+    steps: int
+    sim_time: float  # seconds simulated; the same for every case, whatever its dt
+    pushed: int
+    settle_time: float | None  # sim seconds until settled after the impulse, None if never
+    max_displacement: float
+    steps_per_sec: float
+
+
+def _scale_mass(spec: SceneSpec, factor: float) -> SceneSpec:
+    if isinstance(spec, GroupSpec):
+        return replace(spec, cubes=tuple(replace(c, mass=c.mass * factor) for c in spec.cubes))
+    return replace(spec, mass=spec.mass * factor)
+
+
+def _specs(case: SweepCase) -> list[SceneSpec]:
+    if case.config:
+        specs: list[SceneSpec] = list(iter_scene_config(case.config))
+    else:
+        from bench.scenes import make_scene
+
+        specs = list(make_scene(case.scene, case.cubes, case.seed))
+    factor = case.params["mass"]
+    return specs if factor == 1.0 else [_scale_mass(s, factor) for s in specs]
+
+
+def run_case(case: SweepCase) -> SweepResult:
+    """
+    One headless run. Module level so the process pool can pickle it.
+    """
+    from core.headless import HeadlessSim
+    from core.world import ActorRecord
+
+    p = case.params
+    dt = p["dt"]
+    substeps = max(1, int(p["substeps"]))
+    physics = PhysicsConfig(gravity=(0.0, 0.0, p["gravity"]), substeps=substeps, dt_substep=dt)
+    sim = HeadlessSim(specs=_specs(case), physics=physics)
+    # whole frames of `substeps` fixed steps, so every case stops and fires at the same sim time
+    frame = dt * substeps
+    steps = max(1, round(case.duration / frame)) * substeps
+    impulse_step = round(case.impulse_at / frame) * substeps if case.impulse_at >= 0.0 else -1
+    sample_every = max(1, round(case.sample_interval / dt))
+    world = sim.world
+    bodies = sim.stats.bodies
+    # displacement is measured from where each body entered the World; the bodies change
+    # under the loop when a group breaks apart (the group leaves, its cubes arrive)
+    start = {record.np.node(): record.np.getPos() for record in world.records}
+
+    def on_added(record: ActorRecord) -> None:
+        start[record.np.node()] = record.np.getPos()
+
+    world.on_actor_added.append(on_added)
+    world.on_actor_removed.append(lambda record: start.pop(record.np.node(), None))
+
+    pushed = 0
+    settled_at: int | None = None
+    max_disp = 0.0
+    step = 0
+    next_sample = 0
+    t0 = time.perf_counter()
+    while step < steps:
+        world.step_physics(dt=dt * substeps, max_substeps=substeps, substep_dt=dt)
+        step += substeps
+        if impulse_step >= 0 and step - substeps < impulse_step <= step:
+            center = sum((body.getTransform().getPos() for body in start), LPoint3(0, 0, 0)) / max(1, len(start))
+            pushed = world.apply_radial_impulse(LPoint3(center.x, center.y, 0.0), p["radius"], p["strength"])
+            settled_at = None
+        if step < next_sample:
+            continue
+        next_sample = step + sample_every
+        moving = False
+        for body, p0 in start.items():
+            if body.getLinearVelocity().length() > case.settle_speed:
+                moving = True
+            d = (body.getTransform().getPos() - p0).length()
+            if d > max_disp:
+                max_disp = d
+        if moving:
+            settled_at = None
+        elif settled_at is None and step >= max(0, impulse_step):
+            settled_at = step
+    wall = time.perf_counter() - t0
+
+    settle_steps = None if settled_at is None else settled_at - max(0, impulse_step)
+    return SweepResult(
+        index=case.index,
+        params=dict(p),
+        bodies=bodies,
+        steps=step,
+        sim_time=step * dt,
+        pushed=pushed,
+        settle_time=None if settle_steps is None else settle_steps * dt,
+        max_displacement=max_disp,
+        steps_per_sec=step / wall if wall > 0.0 else 0.0,
+    )
+
+
+def run_sweep(cases: list[SweepCase], jobs: int | None = None) -> list[SweepResult]:
+    """
+    Run every case, in parallel when jobs > 1. Results come back in case order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(cases) == 1:
+        return [run_case(c) for c in cases]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(cases))) as pool:
+        return list(pool.map(run_case, cases))
+
+
+def _parse_value(text: str) -> float:
+    # "1/240" is easier to type than 0.004166...
+    return float(Fraction(text)) if "/" in text else float(text)
+
+
+def parse_params(items: list[str]) -> list[dict[str, float]]:
+    """
+    ["gravity=-9.81,-3.71", "dt=1/240"] -> the cartesian product as parameter dicts.
+    """
+    axes: dict[str, list[float]] = {}
+    for item in items:
+        key, sep, values = item.partition("=")
+        key = key.strip()
+        if not sep or key not in DEFAULTS:
+            raise ValueError(f"--param expects NAME=V1,V2,... with NAME one of {', '.join(DEFAULTS)}: {item!r}")
+        axes[key] = [_parse_value(v) for v in values.split(",") if v.strip()]
+    names = list(axes)
+    return [
+        {**DEFAULTS, **dict(zip(names, combo))}
+        for combo in itertools.product(*(axes[n] for n in names))
+    ]
+
+
+def _fmt(value: float | None) -> str:
+    return "-" if value is None else f"{value:.4g}"
+
+
+def _table(results: list[SweepResult], swept: list[str]) -> str:
+    head = [*swept, "bodies", "pushed", "settle_s", "max_disp", "steps/s"]
+    rows = [
+        [*(_fmt(r.params[k]) for k in swept), str(r.bodies), str(r.pushed),
+         _fmt(r.settle_time), _fmt(r.max_displacement), f"{r.steps_per_sec:.0f}"]
+        for r in results
+    ]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(head)]
+    lines = ["  ".join(h.rjust(w) for h, w in zip(head, widths))]
+    lines += ["  ".join(c.rjust(w) for c, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def _write(path: str, results: list[SweepResult]) -> None:
+    rows = []
+    for r in results:
+        row = asdict(r)
+        row.update(row.pop("params"))
+        rows.append(row)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        if Path(path).suffix == ".csv":
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, fh, indent=2)
+            fh.write("\n")
+
+
+def main() -> None:
+    from bench.scenes import SCENES
+
+    parser = argparse.ArgumentParser(prog="sweep", description="CrashWorld parameter sweeps")
+    parser.add_argument("--config", default=None, help="Scene config to sweep (default: a synthetic scene).")
+    parser.add_argument("--scene", default="pile", choices=list(SCENES), help="Synthetic scene kind.")
+    parser.add_argument("--cubes", type=int, default=200, help="Cube count of the synthetic scene.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--param", action="append", default=[],
+        help=f"NAME=V1,V2,... (repeatable; one of {', '.join(DEFAULTS)}). Runs the cartesian product.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Sim seconds per run.")
+    parser.add_argument("--impulse-at", type=float, default=1.0, help="Sim second of the impulse (-1: none).")
+    parser.add_argument("--settle-speed", type=float, default=0.05, help="Settled below this speed (m/s).")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--out", default=None, help="Write results as .csv or JSON.")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_params(args.param)
+    except ValueError as e:
+        parser.error(str(e))
+    cases = [
+        SweepCase(
+            index=i, params=params, config=args.config, scene=args.scene, cubes=args.cubes,
+            seed=args.seed, duration=args.duration, impulse_at=args.impulse_at, settle_speed=args.settle_speed,
+        )
+        for i, params in enumerate(grid)
+    ]
+
+    t0 = time.perf_counter()
+    results = run_sweep(cases, args.jobs)
+    wall = time.perf_counter() - t0
+
+    swept = list(dict.fromkeys(a.partition("=")[0].strip() for a in args.param))
+    print(_table(results, swept))
+    print(f"{len(results)} runs in {wall:.2f} s", file=sys.stderr)
+    if args.out:
+        _write(args.out, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,30 +3,61 @@ High-level application bootstrap.
 """
 from __future__ import annotations
 
+from array import array
+from typing import TYPE_CHECKING, Callable, Iterator
+
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
-from panda3d.core import LVector3
-from panda3d.core import CollisionNode, CollisionRay, CollisionTraverser, CollisionHandlerQueue
+from panda3d.core import LVector3, NodePath, WindowProperties
 from panda3d.core import BitMask32, Vec3, Point3
 
-from core.settings import WINDOW, CAMERA, PHYSICS
-from core.world import World
+from core.settings import WINDOW, CAMERA, PHYSICS, IMPULSE, QUALITY, SPAWN, DESPAWN, PERF, STREAM
+from core.world import World, ActorRecord, ActorPool, DespawnPolicy
 from core.camera import CameraRig
 from core.controls import ControlSystem
-from ui.compass import CompassOverlay
-from objects.primitives import GroundPlane, BoxActor
+from ui.perf_hud import PerfHud
+from objects.primitives import GroundPlane
 
 from core.lights import LightingRig
-from core.scene_config import load_scene_config, SceneConfigError
+from core.instancing import InstancedBoxRenderer
+from core.spawner import BackgroundSpecs, SpawnStreamer
+from core.profiling import FrameProfiler, StartupTimer
+from core.quality import QualityController, QualityState
+from core.static_batch import StaticBatcher
+from core.scene_config import SceneConfigError, SceneSpec, SleepSpec, CubeSpec, DEMO_CUBE
+
+# recording, replay, streaming, threaded physics and the compass are imported where they are built
+if TYPE_CHECKING:
+    from core.physics_thread import PhysicsThread
+    from core.recording import Recorder, Replay
+    from core.streaming import TransformPublisher
+    from ui.compass import CompassOverlay
 
 # deaxtivate sound
 from panda3d.core import loadPrcFileData
 loadPrcFileData("", "audio-library-name null")
+# every model is built in code: skip the loader's scan of installed packages for file-type plugins
+loadPrcFileData("", "loader-support-entry-points false")
 
 
 PICK_MASK = BitMask32.bit(1)
-IMPULSE_RADIUS = 4.0
-IMPULSE_STRENGTH = 35.0
+SHADOW_FIT_INTERVAL = 0.5  # seconds between refits of the sun's shadow area
+DROP_DISTANCE = 8.0  # how far in front of the camera the space key drops a cube
+CHECKPOINT_PATH = "crashworld.cwck"  # F5 target when --save-checkpoint is not given
+DROP_COLORS = [
+    (0.90, 0.20, 0.20, 1.0),
+    (0.20, 0.85, 0.30, 1.0),
+    (0.20, 0.35, 0.95, 1.0),
+    (0.95, 0.80, 0.25, 1.0),
+]
+
+
+def _config_errors_as_runtime(specs: Iterator[SceneSpec]) -> Iterator[SceneSpec]:
+    # streamed configs are validated while spawning; report errors like the eager path does
+    try:
+        yield from specs
+    except SceneConfigError as e:
+        raise RuntimeError(f"Scene config error: {e}") from e
 
 
 class CrashWorldApp(ShowBase):
@@ -34,35 +65,132 @@ class CrashWorldApp(ShowBase):
     Main app that wires world, camera, UI, and controls.
     """
 
-    def __init__(self, config_path: str | None = None) -> None:
+    def __init__(
+        self,
+        config_path: str | None = None,
+        instanced: bool | None = None,
+        perf_log: str | None = None,
+        hud: bool | None = None,
+        record_path: str | None = None,
+        replay_path: str | None = None,
+        threaded: bool | None = None,
+        checkpoint_path: str | None = None,
+        save_checkpoint_path: str | None = None,
+        stream_name: str | None = None,
+        startup: StartupTimer | None = None,
+        startup_report: bool | None = None,
+    ) -> None:
+        self.startup = startup or StartupTimer()
+        self._startup_report = PERF.startup_report if startup_report is None else startup_report
+
+        # The scene config is parsed on a worker thread while the window opens
+        scene: BackgroundSpecs | None = None
+        if config_path and not (replay_path or checkpoint_path):
+            scene = BackgroundSpecs(config_path, streamed=SPAWN.streaming)
+
         super().__init__()
-        
+        self.startup.mark("window")
+
         dr0 = self.win.getDisplayRegion(0)
         dr0.setClearColorActive(True)
         dr0.setClearColor(WINDOW.clear_color)
 
-        # Window
+        # Window; per-pixel shading is switched on after the first frame (see _build_shading)
         self.win.setClearColor(WINDOW.clear_color)
-        self.render.setShaderAuto()
 
-        # World + physics
-        self.world = World(self.render, gravity=LVector3(*PHYSICS.gravity))
-        
-        # Used for mouse click
-        self.actors: list = []
+        # World + physics; threaded physics keeps the bodies out of the rendered graph
+        if threaded is None:
+            threaded = PHYSICS.threaded
+        if threaded and (record_path or replay_path):
+            print("Threaded physics is not available while recording or replaying; stepping on the main thread")
+            threaded = False
+        self.world = World(
+            NodePath("physics") if threaded else self.render,
+            gravity=LVector3(*PHYSICS.gravity),
+            sleep=SleepSpec(linear=PHYSICS.sleep_linear, angular=PHYSICS.sleep_angular),
+            idle_skip=PHYSICS.idle_skip,
+            # endless sessions: old and lost actors go, their bodies are recycled
+            despawn_policy=DespawnPolicy(
+                max_actors=DESPAWN.max_actors,
+                lifetime=DESPAWN.lifetime_s,
+                kill_z=DESPAWN.kill_z,
+                bounds_radius=DESPAWN.bounds_radius,
+            ),
+            pool=ActorPool(max_free=DESPAWN.pool_size),
+        )
+
+        self.spawner: SpawnStreamer | None = None
+        if not threaded:
+            self.world.on_actor_added.append(self._on_actor_added)
+            self.world.on_actor_removed.append(self._on_actor_removed)
+
+        # Recording logs spawns, poses and clicks; a replay drives visuals without physics.
+        # (not self.recorder: that is ShowBase's input recorder, which igLoop calls every frame)
+        self.run_recorder: Recorder | None = None
+        self.replay: Replay | None = None
+        if record_path or replay_path:
+            from core.recording import Recorder, Replay
+
+            self.run_recorder = Recorder(self.world, record_path) if record_path else None
+            self.replay = Replay(replay_path, self.render) if replay_path else None
+        self._replay_clock = 0.0
+
+        # Transform stream: other processes watch the bodies through shared memory
+        self.publisher: TransformPublisher | None = None
+        if stream_name is None and STREAM.enabled:
+            stream_name = STREAM.name
+        if stream_name and self.replay is None:
+            from core.streaming import TransformPublisher
+
+            self.publisher = TransformPublisher(
+                self.world,
+                name=stream_name,
+                capacity=STREAM.capacity,
+                slots=STREAM.slots,
+                keyframe_interval=STREAM.keyframe_interval,
+            )
+
+        # Instanced mode: bodies get no per-actor visual, one batch per cube size draws them
+        if instanced is None:
+            instanced = QUALITY.instanced
+        self.instancer = InstancedBoxRenderer(self.render) if instanced else None
+        self._instances_dirty = True  # set when instances come or go, so a settled scene still refreshes
+
+        # Threaded physics: a worker owns the World, proxy nodes under render show the actors
+        self.physics_thread: PhysicsThread | None = None
+        if threaded:
+            from core.physics_thread import PhysicsThread
+
+            self.physics_thread = PhysicsThread(self.world, self.render, visual=self.instancer is None)
+            self.physics_thread.on_proxy_added.append(self._on_proxy_added)
+            self.physics_thread.on_proxy_removed.append(self._on_proxy_removed)
+
+        # Static batching: settled bodies are drawn from a few flattened nodes (per-actor visuals only)
+        self.batcher: StaticBatcher | None = None
+        if QUALITY.static_batching and self.replay is None and self.physics_thread is None:
+            self.batcher = StaticBatcher(
+                self.render, self.world, cell_size=QUALITY.batch_cell_size, sleep_delay=QUALITY.batch_after_s
+            )
+
+        self.startup.mark("world")
 
         # Visual base plane and grid
-        GroundPlane.attach_visual_floor(self.render, size=200.0, step=5.0)
+        floor_mode = QUALITY.floor_mode
+        if floor_mode == "shader" and not self.win.getGsg().getSupportsGlsl():
+            floor_mode = "lines"
+        GroundPlane.attach_visual_floor(self.render, size=QUALITY.floor_size, step=QUALITY.floor_step, mode=floor_mode)
 
         # Spawn cubes from config (or fall back to a single demo cube)
-        if config_path:
-            self._spawn_from_config(config_path)
+        if self.replay is not None:
+            pass  # the recording brings its own bodies
+        elif checkpoint_path:
+            visual = self.instancer is None and self.physics_thread is None
+            self._submit(lambda world: world.load_checkpoint(checkpoint_path, visual=visual))
+        elif scene is not None:
+            self._spawn_from_config(scene)
         else:
-            box = BoxActor(size=1.0, mass=1.0)
-            box_np = self.world.attach_actor(box)
-            box_np.setPos(0, 0, 8)
-            np.node().setIntoCollideMask(PICK_MASK)
-            self.actors.append(box_np)
+            self._spawn_specs([DEMO_CUBE])
+        self.startup.mark("scene")
 
         # Camera rig + controls
         self.disableMouse()
@@ -79,45 +207,158 @@ class CrashWorldApp(ShowBase):
             mouse_sens=CAMERA.mouse_sensitivity,
         )
 
-        # UI
-        self.compass = CompassOverlay(base=self)
-        
-        # Lighting
-        LightingRig(self.render)
+        # UI; the compass is built after the first frame
+        self.compass: CompassOverlay | None = None
+
+        # Frame timing: phases of _update plus the render pass, optional overlay and log
+        self.profiler = FrameProfiler(
+            window=PERF.window,
+            log_path=perf_log or PERF.log_path,
+            expected_phases=("controls", "physics", "instances", "batching", "ui", "render"),
+        )
+        self.perf_hud = PerfHud(
+            base=self,
+            profiler=self.profiler,
+            extra=self._perf_extra,
+            visible=PERF.hud if hud is None else hud,
+        )
+        self.accept("f3", self.perf_hud.toggle)
+        self.startup.mark("ui")
+
+        # Lighting; the shadow buffer and its shaders come after the first frame
+        self.lighting = LightingRig(self.render, defer_shadows=True)
+        self.startup.mark("lights")
+        self._shadow_fit_at = 0.0
+        self._pos_buf = array("f")
+
+        # Runtime quality: physics settings live here so the controller can change them
+        self._substeps = PHYSICS.substeps
+        self._substep_dt = PHYSICS.dt_substep
+        self.quality: QualityController | None = None
+        if QUALITY.adaptive:
+            self.quality = QualityController(
+                profiler=self.profiler,
+                apply=self._apply_quality,
+                state=QualityState(
+                    shadow_map_size=self.lighting.shadow_buffer_size,
+                    substeps=self._substeps,
+                    dt_substep=self._substep_dt,
+                    instanced=self.instancer is not None,
+                ),
+                target_fps=QUALITY.target_fps or self._refresh_rate() or 60.0,
+                shadow_map_sizes=QUALITY.shadow_map_sizes,
+                substep_budgets=QUALITY.substep_budgets,
+                substep_dts=QUALITY.substep_dts,
+                allow_instanced=QUALITY.adaptive_instancing and self.replay is None,
+            )
 
         # Input bindings
         self.accept("alt-0", self.camera_rig.reset_pose)
         self.controls.bind_mouse_right_drag()
         self.controls.bind_keyboard_defaults()
         
-        # Mouse click picking
-        self._setup_mouse_picking()
+        # Mouse click picking: a Bullet ray test on click, nothing to set up
         self.accept("mouse1", self._on_mouse_click)
+        self._drops = 0
+        self.accept("space", self._drop_cube)
+        self._checkpoint_path = save_checkpoint_path or CHECKPOINT_PATH
+        self.accept("f5", self._save_checkpoint)
+
+        # Subsystems the first frame can do without, built one per frame after it
+        self._deferred: list[tuple[str, Callable[[], None]]] = [
+            ("shading", self._build_shading),
+            ("compass", self._build_compass),
+        ]
+        self.startup.mark("input")
 
         # Tasks
         self.taskMgr.add(self._update, "app_update")
+        # igLoop (sort 50) renders the frame; bracket it to time the render pass
+        self.taskMgr.add(self._perf_frame_begin, "perf_frame_begin", sort=-100)
+        self.taskMgr.add(self._perf_render_begin, "perf_render_begin", sort=49)
+        self.taskMgr.add(self._perf_frame_end, "perf_frame_end", sort=51)
+        self.exitFunc = self._on_exit
 
-    def _spawn_from_config(self, config_path: str) -> None:
-      try:
-        specs = load_scene_config(config_path)
-      except SceneConfigError as e:
-        raise RuntimeError(f"Scene config error: {e}") from e
+    def _spawn_from_config(self, scene: BackgroundSpecs) -> None:
+      if not SPAWN.streaming:
+        try:
+          specs = list(scene)
+        except SceneConfigError as e:
+          raise RuntimeError(f"Scene config error: {e}") from e
+        self._spawn_specs(specs)
+        return
+
+      # Stream: spawn batches under a per-frame budget as the parser delivers them, so the first frame shows up at once.
+      self._title = self.win.getProperties().getTitle()
+      self.spawner = SpawnStreamer(
+        specs=_config_errors_as_runtime(scene.ready()),
+        spawn_one=self._spawn_spec,
+        budget_ms=SPAWN.budget_ms,
+        on_progress=self._on_spawn_progress,
+        on_done=self._on_spawn_done,
+      )
+      self.taskMgr.add(self.spawner.task, "spawn_stream", sort=-10)
 
+    def _spawn_specs(self, specs: list[SceneSpec]) -> None:
       # "Spawn at once": create all actors in one pass before the main loop runs.
       for spec in specs:
-        actor = BoxActor(size=spec.size, mass=spec.mass, color=spec.color)
-        np = self.world.attach_actor(actor)
-        np.setName(spec.name)
-        np.setPos(*spec.pos)
-        np.node().setIntoCollideMask(PICK_MASK)
-        
-        self.actors.append(np)
+        self._spawn_spec(spec)
+
+    def _spawn_spec(self, spec: SceneSpec) -> None:
+      visual = self.instancer is None and self.physics_thread is None
+      self._submit(lambda world: world.spawn(spec, visual=visual))
+
+    def _submit(self, command: Callable[[World], None]) -> None:
+      # anything touching the World runs on the physics worker when there is one
+      if self.physics_thread is not None:
+        self.physics_thread.submit(command)
+      else:
+        command(self.world)
+
+    def _on_actor_added(self, record: ActorRecord) -> None:
+      # also runs for cubes split off a breaking group
+      np = record.np
+      np.node().setIntoCollideMask(PICK_MASK)
+      if self.instancer is not None:
+        self.instancer.add_actor(np, record.actor)
+        self._instances_dirty = True
+
+    def _on_actor_removed(self, record: ActorRecord) -> None:
+      if self.instancer is not None:
+        self.instancer.remove(record.np)
+        self._instances_dirty = True
+
+    def _on_proxy_added(self, record: ActorRecord, proxy: NodePath) -> None:
+      if self.instancer is not None:
+        self.instancer.add_actor(proxy, record.actor)
+        self._instances_dirty = True
+
+    def _on_proxy_removed(self, record: ActorRecord, proxy: NodePath) -> None:
+      if self.instancer is not None:
+        self.instancer.remove(proxy)
+        self._instances_dirty = True
 
-    def _setup_mouse_picking(self) -> None:
-        pass
+    def _on_spawn_progress(self, spawned: int, total: int | None) -> None:
+      wp = WindowProperties()
+      if total:
+        wp.setTitle(f"{self._title} - loading {spawned}/{total} ({100 * spawned // total}%)")
+      else:
+        wp.setTitle(f"{self._title} - loading {spawned}")
+      self.win.requestProperties(wp)
+
+    def _on_spawn_done(self) -> None:
+      wp = WindowProperties()
+      wp.setTitle(self._title)
+      self.win.requestProperties(wp)
+      print(f"Spawned {self.spawner.spawned} actors in {self.spawner.load_time:.2f} s")
+
+    @property
+    def _loading_frozen(self) -> bool:
+      # bodies stay where they were spawned until the whole scene is in
+      return SPAWN.freeze_until_loaded and self.spawner is not None and not self.spawner.done
 
     def _on_mouse_click(self) -> None:
-        if not self.mouseWatcherNode.hasMouse():
+        if self.replay is not None or not self.mouseWatcherNode.hasMouse():
             return
     
         mpos = self.mouseWatcherNode.getMouse()
@@ -130,56 +371,233 @@ class CrashWorldApp(ShowBase):
         near_world = self.render.getRelativePoint(self.camera, near)
         far_world = self.render.getRelativePoint(self.camera, far)
     
-        result = self.world.bullet_world.rayTestClosest(near_world, far_world)
-    
-        if not result.hasHit():
+        self._submit(lambda world: self._pick_and_push(world, near_world, far_world))
+
+    def _pick_and_push(self, world: World, ray_from: Point3, ray_to: Point3) -> None:
+        record, hit_pos = world.pick(ray_from, ray_to)
+        if hit_pos is None:
             return
+        if self.run_recorder is not None:
+            self.run_recorder.record_pick(hit_pos)
     
-        hit_node = result.getNode()  # BulletRigidBodyNode
-        actor_np = self.render.find(f"**/+{hit_node.getName()}")
-        if actor_np.isEmpty():
+        if record is None:
             # Fallback: use hit position directly
-            center = result.getHitPos()
+            center = hit_pos
         else:
-            center = actor_np.getPos(self.render)
+            center = record.np.getPos(world.scene_root)
     
         self._emit_radial_impulse(center)
 
     def _emit_radial_impulse(self, center: Vec3) -> None:
-        for actor_np in self.actors:
-            body = actor_np.node()
-            if body.getMass() <= 0.0:
-                continue  # static objects stay fixed
-    
-            pos = actor_np.getPos(self.render)
-            delta = pos - center
-            dist = delta.length()
-    
-            if dist <= 0.001 or dist > IMPULSE_RADIUS:
-                continue
-    
-            direction = delta.normalized()
-            falloff = 1.0 - (dist / IMPULSE_RADIUS)
-            strength = IMPULSE_STRENGTH * falloff
-    
-            impulse = direction * strength
-            body.applyCentralImpulse(impulse)
+        if self.run_recorder is not None:
+            self.run_recorder.record_impulse(center, IMPULSE.radius, IMPULSE.strength)
+        # broadphase query: only bodies near the hit point are visited
+        self.world.apply_radial_impulse(center, IMPULSE.radius, IMPULSE.strength)
+
+    def _save_checkpoint(self) -> None:
+        if self.replay is not None:
+            return
+        path = self._checkpoint_path
+        self._submit(lambda world: print(f"Saved {world.save_checkpoint(path)} bodies to {path}"))
+
+    def _drop_cube(self) -> None:
+        if self.replay is not None:
+            return
+        pos = self.render.getRelativePoint(self.camera, Point3(0.0, DROP_DISTANCE, 0.0))
+        self._spawn_spec(CubeSpec(
+            name=f"drop_{self._drops}",
+            size=1.0,
+            mass=1.0,
+            color=DROP_COLORS[self._drops % len(DROP_COLORS)],
+            pos=(pos.x, pos.y, max(pos.z, 1.0)),
+        ))
+        self._drops += 1
+
+    def _on_exit(self) -> None:
+        if self.physics_thread is not None:
+            self.physics_thread.stop()
+        self.profiler.close()
+        if self.run_recorder is not None:
+            self.run_recorder.close()
+        if self.publisher is not None:
+            self.publisher.close()
 
 
     # --- main loop ---
     def _update(self, task: Task) -> Task:
         dt = globalClock.getDt()
+        prof = self.profiler
 
         # input
-        self.controls.update(dt)
+        with prof.phase("controls"):
+            self.controls.update(dt)
 
-        # physics
-        self.world.step_physics(
-            dt=dt, max_substeps=PHYSICS.substeps, substep_dt=PHYSICS.dt_substep
-        )
+        # physics (or the recorded poses when replaying)
+        if self.replay is not None:
+            with prof.phase("physics"):
+                self._replay_clock += dt
+                self.replay.advance_to(self._replay_clock)
+        elif self.physics_thread is not None:
+            # never waits on the worker: shows its last step and kicks off the next one
+            with prof.phase("physics"):
+                if self.physics_thread.frame(
+                    dt, self._substeps, self._substep_dt, step=not self._loading_frozen
+                ):
+                    self._instances_dirty = True
+        elif not self._loading_frozen:
+            with prof.phase("physics"):
+                self.world.step_physics(
+                    dt=dt, max_substeps=self._substeps, substep_dt=self._substep_dt
+                )
+            if not self.world.idle:
+                self._instances_dirty = True  # Bullet synced (and interpolated) the transforms
+
+        # instanced visuals follow the bodies, but only when something moved
+        if self.instancer is not None and self._instances_dirty:
+            with prof.phase("instances"):
+                self.instancer.update()
+            self._instances_dirty = False
+        if self.instancer is None and self.batcher is not None:
+            with prof.phase("batching"):
+                self.batcher.update(task.time)
 
         # UI sync
-        self.compass.update_from_camera(self.camera)
+        with prof.phase("ui"):
+            if self.compass is not None:
+                self.compass.update_from_camera(self.camera)
+            self.perf_hud.update(task.time)
+            if self.quality is not None:
+                self.quality.update(task.time)
+            if QUALITY.fit_shadow_area and task.time >= self._shadow_fit_at:
+                self._shadow_fit_at = task.time + SHADOW_FIT_INTERVAL
+                self._fit_shadows()
 
         return Task.cont
 
+    # --- quality ---
+    def _apply_quality(self, state: QualityState) -> None:
+        self.lighting.set_shadow_map_size(state.shadow_map_size)
+        self._substeps = state.substeps
+        if state.dt_substep != self._substep_dt:
+            print(
+                f"Quality: physics step changed from 1/{round(1.0 / self._substep_dt)} "
+                f"to 1/{round(1.0 / state.dt_substep)} s; from here on results differ from a run at the old step"
+            )
+        self._substep_dt = state.dt_substep
+        self._set_instanced(state.instanced)
+        print(f"Quality: {state.describe()}")
+
+    def _refresh_rate(self) -> float | None:
+        info = self.pipe.getDisplayInformation() if self.pipe is not None else None
+        if info is None:
+            return None
+        mode = info.getCurrentDisplayModeIndex()
+        if not 0 <= mode < info.getTotalDisplayModes():
+            return None
+        rate = info.getDisplayModeRefreshRate(mode)
+        return float(rate) if rate > 0 else None
+
+    def _set_instanced(self, on: bool) -> None:
+        """
+        Switch every live actor between its own visual and the instanced batches.
+        """
+        if on == (self.instancer is not None):
+            return
+        threaded = self.physics_thread is not None
+        if threaded:
+            # the visuals live on the proxies; the worker's bodies never carry any
+            self.physics_thread.visual = not on
+            targets = self.physics_thread.proxies
+        else:
+            targets = [(record, record.np) for record in self.world.records]
+        if on:
+            if self.batcher is not None:
+                self.batcher.clear()  # bring the stashed visuals back before dropping them
+            self.instancer = InstancedBoxRenderer(self.render)
+            for record, np in targets:
+                np.getChildren().detach()
+                record.visual = False
+                self.instancer.add_actor(np, record.actor)
+        else:
+            self.instancer.destroy()
+            self.instancer = None
+            for record, np in targets:
+                record.actor.attach_visual(np)
+                record.visual = not threaded
+        if self.world.pool is not None and not threaded:
+            self.world.pool.clear()  # parked bodies carry the old kind of visual
+        self._instances_dirty = True
+
+    def _fit_shadows(self) -> None:
+        if self.replay is not None:
+            return
+        buf = self._pos_buf
+        if self.physics_thread is not None:
+            n = self.physics_thread.copy_positions(buf)
+        else:
+            n = self.world.actor_count
+            if len(buf) < 3 * n:
+                buf.extend([0.0] * (3 * n - len(buf)))
+            self.world.export_state(pos=buf)
+        if n == 0:
+            return
+        xs, ys, zs = buf[0:3 * n:3], buf[1:3 * n:3], buf[2:3 * n:3]
+        self.lighting.fit_shadow_area(
+            Point3(min(xs), min(ys), min(0.0, min(zs))), Point3(max(xs), max(ys), max(zs))
+        )
+
+    # --- frame timing ---
+    def _perf_frame_begin(self, task: Task) -> Task:
+        self.profiler.begin_frame()
+        if self.profiler.frames % PERF.counter_interval == 0:
+            counters = self.profiler.counters
+            self._submit(lambda world: counters.update(world.physics_counters()))
+        return Task.cont
+
+    def _perf_render_begin(self, task: Task) -> Task:
+        self.profiler.start("render")
+        return Task.cont
+
+    def _perf_frame_end(self, task: Task) -> Task:
+        self.profiler.stop("render")
+        self.profiler.end_frame()
+        if self.startup.first_frame_ms is None:
+            self.startup.first_frame()
+            self.taskMgr.add(self._run_deferred, "startup_deferred", sort=-50)
+        return Task.cont
+
+    # --- startup ---
+    def _run_deferred(self, task: Task) -> Task:
+        if self._deferred:
+            name, build = self._deferred.pop(0)
+            with self.startup.phase(name):
+                build()
+            return Task.cont
+        if self._startup_report:
+            print(self.startup.report())
+        return Task.done
+
+    def _build_shading(self) -> None:
+        # together, so the shader generator compiles each render state once, with shadows
+        self.render.setShaderAuto()
+        self.lighting.enable_shadows()
+
+    def _build_compass(self) -> None:
+        from ui.compass import CompassOverlay
+
+        self.compass = CompassOverlay(base=self)
+
+    def _perf_extra(self) -> dict[str, object]:
+        stats = self.world.step_stats
+        pool = self.world.pool
+        return {
+            "steps": stats.steps,
+            "caught up": stats.caught_up,
+            "dropped": stats.dropped,
+            "idle": stats.idle,
+            "pooled": pool.parked if pool is not None else 0,
+            "batched": self.batcher.batched if self.batcher is not None else 0,
+            "quality": self.quality.state.describe() if self.quality is not None else "fixed",
+            "worker": f"{self.physics_thread.step_ms:.1f} ms" if self.physics_thread is not None else "off",
+        }
+
@@ -0,0 +1,180 @@
+"""
+Bulk body state: poses and velocities to and from flat float buffers, impulses from them.
+
+Any writable, C-contiguous float32 or float64 buffer works (array('f'), array('d'),
+a numpy array of shape (n, 3) / (n, 4), a memoryview over shared memory...), so
+callers keep their buffers across frames instead of building objects per body.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from panda3d.core import Datagram, LPoint3, LQuaternion, LVecBase3, LVector3, TransformState
+from panda3d.bullet import BulletRigidBodyNode
+
+
+_FORMATS = ("f", "d")
+_INDEX_FORMATS = tuple("bBhHiIlLqQ")
+
+
+def _view(buf: Any, rows: int, width: int, name: str) -> memoryview:
+    """
+    Flat writable float view of buf, checked to hold rows x width values.
+    """
+    mv = memoryview(buf)
+    fmt = mv.format.lstrip("@=<")
+    if fmt not in _FORMATS:
+        raise TypeError(f"{name}: expected a float32 or float64 buffer, got format {mv.format!r}")
+    if not mv.c_contiguous:
+        raise ValueError(f"{name}: buffer must be C-contiguous")
+    mv = mv.cast("B").cast(fmt)
+    if len(mv) < rows * width:
+        raise ValueError(f"{name}: buffer holds {len(mv)} values, {rows} bodies need {rows * width}")
+    return mv
+
+
+def export_state(
+    bodies: Iterable[BulletRigidBodyNode],
+    count: int,
+    pos: Any = None,
+    quat: Any = None,
+    lin_vel: Any = None,
+    ang_vel: Any = None,
+) -> int:
+    """
+    Write one row per body: pos, lin_vel and ang_vel take 3 values, quat 4 (r, i, j, k).
+    Buffers left as None are skipped. Returns the number of rows written.
+    """
+    outs = [
+        (name, _view(buf, count, width, name))
+        for name, buf, width in (("pos", pos, 3), ("quat", quat, 4), ("lin_vel", lin_vel, 3), ("ang_vel", ang_vel, 3))
+        if buf is not None
+    ]
+    if not outs:
+        return 0
+    # Panda serializes each vector in C++ (little-endian float32), so there is no
+    # per-component Python work; four bound method calls per body is all that is left
+    dgs = {name: Datagram() for name, _ in outs}
+    p_dg = dgs.get("pos")
+    q_dg = dgs.get("quat")
+    l_dg = dgs.get("lin_vel")
+    a_dg = dgs.get("ang_vel")
+    want_ts = p_dg is not None or q_dg is not None
+
+    n = 0
+    for body in bodies:
+        if want_ts:
+            ts = body.getTransform()
+            if p_dg is not None:
+                ts.getPos().writeDatagramFixed(p_dg)
+            if q_dg is not None:
+                ts.getQuat().writeDatagramFixed(q_dg)
+        if l_dg is not None:
+            body.getLinearVelocity().writeDatagramFixed(l_dg)
+        if a_dg is not None:
+            body.getAngularVelocity().writeDatagramFixed(a_dg)
+        n += 1
+    if n != count:
+        raise ValueError(f"expected {count} bodies, got {n}")
+
+    for name, mv in outs:
+        data = array("f")
+        data.frombytes(dgs[name].getMessage())
+        if sys.byteorder == "big":
+            data.byteswap()
+        if mv.format == "d":
+            data = array("d", data)
+        mv[: len(data)] = data
+    return n
+
+
+def import_state(
+    bodies: Iterable[BulletRigidBodyNode],
+    count: int,
+    pos: Any,
+    quat: Any,
+    lin_vel: Any = None,
+    ang_vel: Any = None,
+) -> int:
+    """
+    Counterpart of export_state: pose each body from its pos and quat rows and set its
+    velocities. Zero velocity rows are skipped, so bodies at rest are not woken.
+    Call it before the bodies join a BulletWorld, so none is inserted at a stale pose.
+    Returns the number of rows read.
+    """
+    # one tolist per column, then plain iteration; no slicing or index math per body
+    p = iter(_view(pos, count, 3, "pos").tolist())
+    q = iter(_view(quat, count, 4, "quat").tolist())
+    zero = [0.0] * (3 * count)
+    lv = iter(_view(lin_vel, count, 3, "lin_vel").tolist() if lin_vel is not None else zero)
+    av = iter(_view(ang_vel, count, 3, "ang_vel").tolist() if ang_vel is not None else zero)
+    one = LVecBase3(1.0, 1.0, 1.0)
+    n = 0
+    for body, x, y, z, r, i, j, k, lx, ly, lz, ax, ay, az in zip(bodies, p, p, p, q, q, q, q, lv, lv, lv, av, av, av):
+        body.setTransform(TransformState.makePosQuatScale(LPoint3(x, y, z), LQuaternion(r, i, j, k), one))
+        if lx or ly or lz:
+            body.setLinearVelocity(LVector3(lx, ly, lz))
+        if ax or ay or az:
+            body.setAngularVelocity(LVector3(ax, ay, az))
+        n += 1
+    if n != count:
+        raise ValueError(f"expected {count} bodies, got {n}")
+    return n
+
+
+def apply_rows(bodies: list[BulletRigidBodyNode], values: Any, indices: Any, method: str) -> list[BulletRigidBodyNode]:
+    """
+    Call body.<method>(LVector3(row)) for each non-zero 3-value row. Row i belongs to
+    bodies[indices[i]] when indices are given, to bodies[i] otherwise. Returns the bodies touched.
+    """
+    if indices is None:
+        rows = len(bodies)
+        targets: Iterable[int] = range(rows)
+    else:
+        idx = memoryview(indices)
+        fmt = idx.format.lstrip("@=<")
+        if fmt not in _INDEX_FORMATS:
+            raise TypeError(f"indices: expected an integer buffer, got format {idx.format!r}")
+        targets = idx.cast("B").cast(fmt).tolist()
+        rows = len(targets)
+    vals = _view(values, rows, 3, "values").tolist()
+
+    touched = []
+    for row, i in enumerate(targets):
+        x, y, z = vals[3 * row: 3 * row + 3]
+        if x == 0.0 and y == 0.0 and z == 0.0:
+            continue
+        body = bodies[i]
+        body.setActive(True)  # sleeping bodies ignore impulses and forces
+        getattr(body, method)(LVector3(x, y, z))
+        touched.append(body)
+    return touched
+
+
+@dataclass
+class BodyState:
+    """
+    Reusable export buffers for World.snapshot; they only reallocate when the scene outgrows them.
+    """
+    typecode: str = "f"
+    count: int = 0
+    pos: array = field(default_factory=lambda: array("f"))
+    quat: array = field(default_factory=lambda: array("f"))
+    lin_vel: array = field(default_factory=lambda: array("f"))
+    ang_vel: array = field(default_factory=lambda: array("f"))
+
+    def __post_init__(self) -> None:
+        if self.typecode not in _FORMATS:
+            raise ValueError(f"typecode must be one of {_FORMATS}, got {self.typecode!r}")
+        for name in ("pos", "quat", "lin_vel", "ang_vel"):
+            if getattr(self, name).typecode != self.typecode:
+                setattr(self, name, array(self.typecode))
+
+    def reserve(self, n: int) -> None:
+        for name, width in (("pos", 3), ("quat", 4), ("lin_vel", 3), ("ang_vel", 3)):
+            buf = getattr(self, name)
+            if len(buf) < n * width:
+                buf.extend([0.0] * (n * width - len(buf)))
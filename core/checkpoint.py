@@ -0,0 +1,252 @@
+"""
+Binary checkpoints (.cwck) of a running World: every body and the sim clock.
+
+Layout, little-endian, every section 4-byte aligned:
+    header     magic "CWCK", u16 format version, u16 flags, f64 sim time, u64 fixed steps,
+               u32 palette count, u32 cube count, u32 group count
+    palette    per entry 9 x f32: size, mass, r, g, b, a,
+               sleep linear, sleep angular (NaN: unset), sleep enabled (-1: unset, 0, 1)
+    cubes      u32 palette index per cube, u32 flags per cube (bit 0: awake),
+               then pos 3 x f32, quat 4 x f32, linear and angular velocity 3 x f32 each,
+               every column for all cubes before the next
+    names      (flag bit 0) u32 offsets[count + 1], then one UTF-8 blob
+    groups     u32 byte length + UTF-8 JSON list of group specs, padded to 4 bytes,
+               then flags, pos, quat, lin_vel, ang_vel columns like the cubes
+
+Cube columns are read straight into arrays, so a restore costs one Python loop
+over the bodies and no config parsing or validation. Groups are rare and go
+through the JSON schema. Values are float32, the precision Bullet runs at here.
+"""
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from core.body_state import export_state
+from core.scene_config import CubeSpec, GroupSpec, SleepSpec, spec_from_dict, spec_to_dict
+from objects.primitives import BoxActor
+
+if TYPE_CHECKING:
+    from core.world import World
+
+
+MAGIC = b"CWCK"
+FORMAT_VERSION = 1
+FLAG_NAMES = 1
+SUFFIX = ".cwck"
+
+AWAKE = 1
+
+_HEADER = struct.Struct("<4sHHdQIII")
+_PALETTE_FLOATS = 9
+_LEN = struct.Struct("<I")
+
+
+@dataclass
+class BodyColumns:
+    """
+    Per-body columns of one kind of body, in file order.
+    """
+    count: int = 0
+    flags: array = field(default_factory=lambda: array("I"))
+    pos: array = field(default_factory=lambda: array("f"))
+    quat: array = field(default_factory=lambda: array("f"))
+    lin_vel: array = field(default_factory=lambda: array("f"))
+    ang_vel: array = field(default_factory=lambda: array("f"))
+
+    _WIDTHS = (("flags", 1), ("pos", 3), ("quat", 4), ("lin_vel", 3), ("ang_vel", 3))
+
+
+@dataclass
+class Checkpoint:
+    sim_time: float = 0.0
+    steps: int = 0
+    palette: list[tuple[float, float, tuple[float, float, float, float], SleepSpec | None]] = field(default_factory=list)
+    indices: array = field(default_factory=lambda: array("I"))  # palette entry per cube
+    cubes: BodyColumns = field(default_factory=BodyColumns)
+    names: list[str] | None = None  # None: "cube_<idx>"
+    groups: list[GroupSpec] = field(default_factory=list)
+    group_bodies: BodyColumns = field(default_factory=BodyColumns)
+
+
+def _sleep_floats(sleep: SleepSpec | None) -> tuple[float, float, float]:
+    if sleep is None:
+        return (math.nan, math.nan, -1.0)
+    return (
+        math.nan if sleep.linear is None else sleep.linear,
+        math.nan if sleep.angular is None else sleep.angular,
+        -1.0 if sleep.enabled is None else float(sleep.enabled),
+    )
+
+
+def _sleep_spec(linear: float, angular: float, enabled: float) -> SleepSpec | None:
+    if math.isnan(linear) and math.isnan(angular) and enabled < 0.0:
+        return None
+    return SleepSpec(
+        linear=None if math.isnan(linear) else linear,
+        angular=None if math.isnan(angular) else angular,
+        enabled=None if enabled < 0.0 else bool(enabled),
+    )
+
+
+def _le(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _columns(bodies: list, out: BodyColumns) -> None:
+    n = len(bodies)
+    out.count = n
+    out.flags = array("I", (AWAKE if b.isActive() else 0 for b in bodies))
+    for name, width in BodyColumns._WIDTHS[1:]:
+        setattr(out, name, array("f", bytes(4 * width * n)))
+    export_state(bodies, n, out.pos, out.quat, out.lin_vel, out.ang_vel)
+
+
+def _write_columns(fh, cols: BodyColumns) -> None:
+    for name, _ in BodyColumns._WIDTHS:
+        fh.write(_le(getattr(cols, name)))
+
+
+def save_checkpoint(world: World, path: str | Path) -> int:
+    """
+    Write every actor of world to path. Returns the number of bodies written.
+    """
+    palette: dict[tuple, int] = {}
+    pal = array("f")
+    indices = array("I")
+    cube_bodies = []
+    names: list[str] = []
+    custom_names = False
+    groups: list[GroupSpec] = []
+    group_bodies = []
+
+    for record in world.records:
+        body = record.np.node()
+        spec = record.spec
+        if isinstance(spec, GroupSpec):
+            groups.append(spec)
+            group_bodies.append(body)
+            continue
+        if spec is None:
+            if not isinstance(record.actor, BoxActor):
+                raise ValueError(f"Cannot checkpoint {record.np.getName()!r}: a group without a spec")
+            a = record.actor
+            spec = CubeSpec(name=record.np.getName(), size=a.size, mass=a.mass, color=a.color, pos=(0.0, 0.0, 0.0))
+        key = (spec.size, spec.mass, tuple(spec.color), spec.sleep)
+        k = palette.get(key)
+        if k is None:
+            k = palette[key] = len(palette)
+            pal.extend((spec.size, spec.mass, *spec.color, *_sleep_floats(spec.sleep)))
+        indices.append(k)
+        cube_bodies.append(body)
+        custom_names = custom_names or spec.name != f"cube_{len(names)}"
+        names.append(spec.name)
+
+    cubes = BodyColumns()
+    _columns(cube_bodies, cubes)
+    group_cols = BodyColumns()
+    _columns(group_bodies, group_cols)
+
+    stats = world.step_stats
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, FLAG_NAMES if custom_names else 0,
+            stats.sim_time, stats.steps, len(palette), len(indices), len(groups),
+        ))
+        fh.write(_le(pal))
+        fh.write(_le(indices))
+        _write_columns(fh, cubes)
+        if custom_names:
+            blobs = [n.encode("utf-8") for n in names]
+            offsets = array("I", [0])
+            total = 0
+            for b in blobs:
+                total += len(b)
+                offsets.append(total)
+            fh.write(_le(offsets))
+            fh.write(b"".join(blobs))
+            fh.write(bytes(-total % 4))
+        blob = json.dumps([spec_to_dict(g) for g in groups], separators=(",", ":")).encode("utf-8")
+        fh.write(_LEN.pack(len(blob)))
+        fh.write(blob + bytes(-len(blob) % 4))
+        _write_columns(fh, group_cols)
+    return len(indices) + len(groups)
+
+
+class _Reader:
+    def __init__(self, data: bytes, path: str | Path) -> None:
+        self.data = data
+        self.off = 0
+        self.path = path
+
+    def take(self, size: int) -> bytes:
+        if self.off + size > len(self.data):
+            raise ValueError(f"Checkpoint is truncated: {self.path}")
+        chunk = self.data[self.off:self.off + size]
+        self.off += size
+        return chunk
+
+    def array(self, typecode: str, count: int) -> array:
+        a = array(typecode)
+        a.frombytes(self.take(4 * count))
+        if sys.byteorder != "little":
+            a.byteswap()
+        return a
+
+    def columns(self, count: int) -> BodyColumns:
+        cols = BodyColumns(count=count)
+        for name, width in BodyColumns._WIDTHS:
+            setattr(cols, name, self.array("I" if name == "flags" else "f", width * count))
+        return cols
+
+
+def read_checkpoint(path: str | Path) -> Checkpoint:
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Checkpoint is truncated: {path}")
+    magic, version, flags, sim_time, steps, n_palette, n_cubes, n_groups = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Not a CrashWorld checkpoint: {path}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version}: {path}")
+
+    r = _Reader(data, path)
+    r.off = _HEADER.size
+    pal = r.array("f", n_palette * _PALETTE_FLOATS)
+    palette = []
+    for i in range(n_palette):
+        size, mass, cr, cg, cb, ca, lin, ang, enabled = pal[i * _PALETTE_FLOATS:(i + 1) * _PALETTE_FLOATS]
+        palette.append((size, mass, (cr, cg, cb, ca), _sleep_spec(lin, ang, enabled)))
+    indices = r.array("I", n_cubes)
+    if n_cubes and max(indices) >= n_palette:
+        raise ValueError(f"Checkpoint references a palette entry that does not exist: {path}")
+    cubes = r.columns(n_cubes)
+
+    names = None
+    if flags & FLAG_NAMES:
+        offsets = r.array("I", n_cubes + 1)
+        blob = r.take(offsets[-1])
+        r.take(-offsets[-1] % 4)
+        names = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_cubes)]
+
+    (size,) = _LEN.unpack(r.take(_LEN.size))
+    raw_groups = json.loads(r.take(size).decode("utf-8"))
+    r.take(-size % 4)
+    groups = [spec_from_dict(g) for g in raw_groups]
+    if len(groups) != n_groups:
+        raise ValueError(f"Checkpoint group count does not match its header: {path}")
+    group_bodies = r.columns(n_groups)
+
+    return Checkpoint(
+        sim_time=sim_time, steps=steps, palette=palette, indices=indices, cubes=cubes,
+        names=names, groups=groups, group_bodies=group_bodies,
+    )
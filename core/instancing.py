@@ -0,0 +1,214 @@
+"""
+Hardware-instanced rendering for large cube populations.
+
+All boxes of the same size are drawn by a single GeomNode with an instance
+count. Per-instance transforms and colors live in a buffer texture that is
+refilled from the Bullet body transforms once per frame.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+
+from panda3d.core import (
+    NodePath,
+    GeomNode,
+    GeomEnums,
+    Texture,
+    Shader,
+    OmniBoundingVolume,
+    LQuaternionf,
+    LVector3f,
+    LPoint3,
+    PandaNode,
+)
+
+from objects.primitives import unit_box_geom
+
+
+# 4 RGBA32F texels per instance: three matrix rows (translation in .w), color.
+TEXELS_PER_INSTANCE = 4
+FLOATS_PER_INSTANCE = TEXELS_PER_INSTANCE * 4
+
+_VERT = """
+#version 150
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instances;
+uniform float box_size;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+
+out vec3 v_normal;
+out vec4 v_color;
+
+void main() {
+    int base = gl_InstanceID * 4;
+    vec4 r0 = texelFetch(instances, base);
+    vec4 r1 = texelFetch(instances, base + 1);
+    vec4 r2 = texelFetch(instances, base + 2);
+    v_color = texelFetch(instances, base + 3);
+
+    vec3 p = p3d_Vertex.xyz * box_size;
+    vec3 world = p.x * r0.xyz + p.y * r1.xyz + p.z * r2.xyz + vec3(r0.w, r1.w, r2.w);
+    v_normal = p3d_Normal.x * r0.xyz + p3d_Normal.y * r1.xyz + p3d_Normal.z * r2.xyz;
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(world, 1.0);
+}
+"""
+
+_FRAG = """
+#version 150
+uniform vec3 sun_dir;
+uniform vec4 sun_color;
+uniform vec4 ambient_color;
+
+in vec3 v_normal;
+in vec4 v_color;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    float ndl = max(dot(normalize(v_normal), -sun_dir), 0.0);
+    vec3 light = ambient_color.rgb + sun_color.rgb * ndl;
+    p3d_FragColor = vec4(v_color.rgb * light, v_color.a);
+}
+"""
+
+
+@dataclass
+class _Instance:
+    body_np: NodePath
+    color: tuple[float, float, float, float]
+    offset: LPoint3 | None  # cube center relative to the body origin (rigid groups)
+    batch: "_Batch"
+    index: int
+
+
+@dataclass
+class _Batch:
+    root: NodePath
+    texture: Texture
+    capacity: int
+    items: list[_Instance]
+
+
+@dataclass
+class InstancedBoxRenderer:
+    """
+    Draws every registered body with one instanced draw call per box size.
+    Bodies are attached without their own visual; call `update` once per frame.
+    """
+    render_np: NodePath
+    sun_hpr: tuple[float, float, float] = (45.0, -60.0, 0.0)
+    sun_color: tuple[float, float, float, float] = (1.0, 0.98, 0.92, 1.0)
+    ambient_color: tuple[float, float, float, float] = (0.30, 0.30, 0.34, 1.0)
+    initial_capacity: int = 256
+
+    def __post_init__(self) -> None:
+        self._root = self.render_np.attachNewNode("instanced_boxes")
+        self._shader = Shader.make(Shader.SL_GLSL, vertex=_VERT, fragment=_FRAG)
+        self._batches: dict[float, _Batch] = {}
+        self._by_body: dict[PandaNode, list[_Instance]] = {}
+
+        q = LQuaternionf()
+        q.setHpr(self.sun_hpr)
+        sun_dir = q.getForward()
+        self._root.setShader(self._shader, 10)
+        self._root.setShaderInput("sun_dir", LVector3f(sun_dir))
+        self._root.setShaderInput("sun_color", self.sun_color)
+        self._root.setShaderInput("ambient_color", self.ambient_color)
+
+    # public API
+    def add(
+        self,
+        body_np: NodePath,
+        size: float,
+        color: tuple[float, float, float, float],
+        offset: LPoint3 | None = None,
+    ) -> None:
+        batch = self._batches.get(size)
+        if batch is None:
+            batch = self._make_batch(size)
+            self._batches[size] = batch
+        inst = _Instance(body_np=body_np, color=tuple(color), offset=offset, batch=batch, index=len(batch.items))
+        batch.items.append(inst)
+        self._by_body.setdefault(body_np.node(), []).append(inst)
+
+    def add_actor(self, body_np: NodePath, actor) -> None:
+        """
+        Register every cube an actor draws (see instance_parts on the actors).
+        """
+        for size, color, offset in actor.instance_parts():
+            self.add(body_np, size, color, offset)
+
+    def remove(self, body_np: NodePath) -> None:
+        # swap-remove: the last instance of the batch takes the freed slot
+        for inst in self._by_body.pop(body_np.node(), ()):
+            items = inst.batch.items
+            last = items.pop()
+            if last is not inst:
+                items[inst.index] = last
+                last.index = inst.index
+
+    def update(self) -> None:
+        """
+        Refill every batch's instance buffer from the current body transforms.
+        """
+        for batch in self._batches.values():
+            n = len(batch.items)
+            if n > batch.capacity:
+                self._grow(batch, n)
+
+            data = array("f")
+            extend = data.extend
+            for inst in batch.items:
+                m = inst.body_np.getMat()
+                r0 = m.getRow(0)
+                r1 = m.getRow(1)
+                r2 = m.getRow(2)
+                t = m.getRow3(3) if inst.offset is None else m.xformPoint(inst.offset)
+                extend((r0[0], r0[1], r0[2], t[0], r1[0], r1[1], r1[2], t[1], r2[0], r2[1], r2[2], t[2]))
+                extend(inst.color)
+
+            img = memoryview(batch.texture.modifyRamImage()).cast("B")
+            raw = memoryview(data).cast("B")
+            img[: len(raw)] = raw
+            batch.root.setInstanceCount(n)
+
+    def destroy(self) -> None:
+        self._root.removeNode()
+        self._batches.clear()
+        self._by_body.clear()
+
+    @property
+    def draw_calls(self) -> int:
+        return len(self._batches)
+
+    @property
+    def instance_count(self) -> int:
+        return sum(len(b.items) for b in self._batches.values())
+
+    # internals
+    def _make_batch(self, size: float) -> _Batch:
+        node = GeomNode(f"instanced_box_{size:g}")
+        node.addGeom(unit_box_geom())
+        # instances are placed in the shader, so culling by the unit cube bounds is wrong
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+        root = self._root.attachNewNode(node)
+        root.setShaderInput("box_size", float(size))
+
+        tex = Texture(f"instances_{size:g}")
+        batch = _Batch(root=root, texture=tex, capacity=0, items=[])
+        self._grow(batch, self.initial_capacity)
+        return batch
+
+    def _grow(self, batch: _Batch, needed: int) -> None:
+        cap = max(batch.capacity, self.initial_capacity)
+        while cap < needed:
+            cap *= 2
+        batch.texture.setupBufferTexture(
+            cap * TEXELS_PER_INSTANCE, Texture.T_float, Texture.F_rgba32, GeomEnums.UH_dynamic
+        )
+        batch.capacity = cap
+        batch.root.setShaderInput("instances", batch.texture)
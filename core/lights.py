@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from panda3d.core import AmbientLight, DirectionalLight, OrthographicLens, NodePath
+from panda3d.core import AmbientLight, DirectionalLight, OrthographicLens, NodePath, LPoint3
 
 from core.settings import QUALITY
 
@@ -17,8 +17,11 @@ class LightingRig:
     ambient_color: tuple[float, float, float, float] = (0.18, 0.18, 0.20, 1.0)
     ortho_film_size: float = 80.0
     ortho_near_far: tuple[float, float] = (1.0, 150.0)
+    defer_shadows: bool = False  # leave the shadow buffer out until enable_shadows()
 
     def __post_init__(self) -> None:
+        self.sun: DirectionalLight | None = None
+        self.sun_np: NodePath | None = None
         if self.render_np.getPythonTag("lighting_rig") is True:
             return
         self.render_np.setPythonTag("lighting_rig", True)
@@ -32,10 +35,11 @@ class LightingRig:
         # Sun with shadows
         sun = DirectionalLight("sun")
         sun.setColor(self.sun_color)
+        caster = not self.defer_shadows
         if QUALITY.shadows:
-            sun.setShadowCaster(True, QUALITY.shadow_map_size, QUALITY.shadow_map_size)
+            sun.setShadowCaster(caster, QUALITY.shadow_map_size, QUALITY.shadow_map_size)
         else:
-            sun.setShadowCaster(True, self.shadow_map_size, self.shadow_map_size)
+            sun.setShadowCaster(caster, self.shadow_map_size, self.shadow_map_size)
         lens = OrthographicLens()
         lens.setFilmSize(120.0)
         lens.setNearFar(5.0,120.0)
@@ -43,6 +47,8 @@ class LightingRig:
         sun_np = self.render_np.attachNewNode(sun)
         sun_np.setHpr(*self.sun_hpr)
         self.render_np.setLight(sun_np)
+        self.sun = sun
+        self.sun_np = sun_np
 
         # Skylight fill (no shadows)
         sky = DirectionalLight("sky_fill")
@@ -50,3 +56,33 @@ class LightingRig:
         sky_np = self.render_np.attachNewNode(sky)
         sky_np.setHpr(self.sun_hpr[0] + 180.0, 60.0, 0.0)
         self.render_np.setLight(sky_np)
+
+    @property
+    def shadow_buffer_size(self) -> int:
+        # the size in use, which may differ from the shadow_map_size field (see QUALITY)
+        return self.sun.getShadowBufferSize().x if self.sun is not None else 0
+
+    def enable_shadows(self) -> None:
+        # the shadow buffer and the shadowed shaders are built on the next frame
+        if self.sun is not None and not self.sun.isShadowCaster():
+            self.sun.setShadowCaster(True)
+
+    def set_shadow_map_size(self, size: int) -> None:
+        # Panda rebuilds the shadow buffer on the next frame
+        if self.sun is not None and size != self.shadow_buffer_size:
+            self.sun.setShadowCaster(self.sun.isShadowCaster(), size, size)
+
+    def fit_shadow_area(self, lo: LPoint3, hi: LPoint3, margin: float = 2.0) -> None:
+        """
+        Aim the sun's ortho lens at the box lo..hi, so the shadow map texels cover
+        only the area that has bodies instead of a fixed 120 m square.
+        """
+        if self.sun is None:
+            return
+        center = (lo + hi) * 0.5
+        radius = (hi - lo).length() * 0.5 + margin
+        # directional light: its position only places the shadow frustum
+        self.sun_np.setPos(center - self.sun_np.getQuat().getForward() * (radius + 5.0))
+        lens = self.sun.getLens()
+        lens.setFilmSize(2.0 * radius)
+        lens.setNearFar(1.0, 2.0 * radius + 10.0)
@@ -0,0 +1,615 @@
+"""
+Partitioned physics: the ground is split into a grid of regions, each simulated by
+its own worker process with its own World, so separate piles use separate cores.
+
+Every body has one owner, the region its center lies in. After each step a worker
+hands bodies that left its region back to the coordinator, which passes them on to
+the new owner with their pose and velocities. Bodies within `ghost_margin` of a
+border are mirrored into the neighbouring regions as kinematic ghosts, so bodies on
+either side still collide. Ghosts follow their original one step behind, and a body
+in transit skips the step it is handed over in: contacts across borders are
+approximate, everything else is exact. A ghost only moves once its original moved
+more than `ghost_epsilon`, and only an awake original wakes the bodies next to it,
+so a settled pile on a border can fall asleep on both sides.
+
+Per-body work stays in the workers, where it runs in parallel. A worker only looks
+at the bodies that are awake or just stopped, reports their poses and picks the
+ghosts for its neighbours itself. The coordinator routes those bytes on and keeps
+the last pose of every sleeping body, so its share of a step grows with what
+moves, not with the size of the scene.
+
+The coordinator merges the worker results into one transform stream, keyed by
+body id, in spawn order.
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import struct
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from panda3d.core import NodePath, LPoint3, LQuaternion, LVector3
+
+from core.body_state import _view
+from core.scene_config import DEMO_CUBE, SceneSpec, SleepSpec, iter_scene_config
+from core.settings import PHYSICS, PhysicsConfig
+from core.world import World
+from objects.primitives import actor_for_spec
+
+
+_POSE = struct.Struct("<Q7f?")  # body id, pos, quat (r, i, j, k), awake
+
+Pose = tuple[float, float, float, float, float, float, float]
+
+
+@dataclass(frozen=True)
+class RegionGrid:
+    """
+    cols x rows regions over the square [-extent, extent]; the outer regions reach to infinity.
+    """
+    cols: int = 2
+    rows: int = 2
+    extent: float = 100.0
+    # should exceed the largest body's half extent plus the distance it moves in one step
+    ghost_margin: float = 2.0
+    ghost_epsilon: float = 0.001  # smaller moves of an original (m, and per quat component) leave its ghost put
+    # how far a body may stray past its region's border before it is handed over, so one resting
+    # on a border doesn't go back and forth; well below ghost_margin
+    handoff_slack: float = 0.1
+
+    @property
+    def count(self) -> int:
+        return self.cols * self.rows
+
+    def _col(self, x: float) -> int:
+        c = math.floor((x + self.extent) / (2.0 * self.extent) * self.cols)
+        return min(max(c, 0), self.cols - 1)
+
+    def _row(self, y: float) -> int:
+        r = math.floor((y + self.extent) / (2.0 * self.extent) * self.rows)
+        return min(max(r, 0), self.rows - 1)
+
+    def region_of(self, x: float, y: float) -> int:
+        return self._row(y) * self.cols + self._col(x)
+
+    def bounds(self, region: int) -> tuple[float, float, float, float]:
+        """
+        (x0, x1, y0, y1) of a region; infinite on the sides of the outer regions.
+        """
+        r, c = divmod(region, self.cols)
+        w = 2.0 * self.extent / self.cols
+        h = 2.0 * self.extent / self.rows
+        return (
+            -math.inf if c == 0 else -self.extent + c * w,
+            math.inf if c == self.cols - 1 else -self.extent + (c + 1) * w,
+            -math.inf if r == 0 else -self.extent + r * h,
+            math.inf if r == self.rows - 1 else -self.extent + (r + 1) * h,
+        )
+
+    def keeps(self, region: int, x: float, y: float) -> bool:
+        """
+        True while (x, y) lies in region, or no more than handoff_slack past its border.
+        """
+        s = self.handoff_slack
+        r, c = divmod(region, self.cols)
+        return self._col(x - s) <= c <= self._col(x + s) and self._row(y - s) <= r <= self._row(y + s)
+
+    def ghost_regions(self, x: float, y: float, owner: int) -> list[int]:
+        """
+        Regions other than owner that a body at (x, y) is within ghost_margin of.
+        """
+        m = self.ghost_margin
+        c0, c1 = self._col(x - m), self._col(x + m)
+        r0, r1 = self._row(y - m), self._row(y + m)
+        if c0 == c1 and r0 == r1:
+            return []  # the common case: nowhere near a border
+        return [
+            r * self.cols + c
+            for r in range(r0, r1 + 1)
+            for c in range(c0, c1 + 1)
+            if r * self.cols + c != owner
+        ]
+
+    @classmethod
+    def parse(cls, text: str, **kwargs: Any) -> "RegionGrid":
+        """
+        "3x2" -> 3 columns, 2 rows.
+        """
+        cols, sep, rows = text.lower().partition("x")
+        try:
+            grid = cls(cols=int(cols), rows=int(rows) if sep else 1, **kwargs)
+        except ValueError:
+            raise ValueError(f"Expected a region grid like 2x2, got {text!r}") from None
+        if grid.cols < 1 or grid.rows < 1:
+            raise ValueError(f"Expected a region grid like 2x2, got {text!r}")
+        return grid
+
+
+@dataclass
+class Handoff:
+    """
+    A body on its way to another region, or entering the simulation.
+    """
+    body_id: int
+    spec: SceneSpec
+    pose: Pose | None = None  # None: place at spec.pos like a fresh spawn
+    lin_vel: tuple[float, float, float] = (0.0, 0.0, 0.0)
+    ang_vel: tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+
+@dataclass
+class _Ghosts:
+    """
+    Ghost updates for one region, from the regions that own the originals.
+    """
+    rows: bytes | bytearray = b""  # _POSE rows, with the original's sleep state
+    specs: dict[int, SceneSpec] = field(default_factory=dict)  # ghosts new to the region
+    gone: list[int] = field(default_factory=list)  # ghosts to drop
+
+    def add(self, other: "_Ghosts") -> None:
+        self.rows += other.rows
+        self.specs.update(other.specs)
+        self.gone.extend(other.gone)
+
+
+@dataclass
+class _StepRequest:
+    dt: float
+    max_substeps: int
+    substep_dt: float
+    arrivals: list[Handoff]
+    ghosts: _Ghosts
+    impulses: list[tuple[tuple[float, float, float], float, float]]  # (center, radius, strength)
+
+
+@dataclass
+class _StepReply:
+    steps: int
+    poses: bytes  # _POSE rows of the owned bodies that are awake, just stopped or just arrived
+    departures: list[Handoff]
+    born: list[tuple[int, SceneSpec]]  # bodies the worker created itself (broken groups)
+    died: list[int]
+    ghosts: dict[int, _Ghosts]  # by target region
+    bodies: int
+    active: int
+    ghost_count: int  # ghosts held by this region
+    busy: float  # CPU seconds the worker spent on this step
+
+
+def _pose(np: NodePath) -> Pose:
+    ts = np.node().getTransform()
+    p = ts.getPos()
+    q = ts.getQuat()
+    return (p[0], p[1], p[2], q[0], q[1], q[2], q[3])
+
+
+def _moved(a: Pose, b: Pose, epsilon: float) -> bool:
+    return any(abs(u - v) > epsilon for u, v in zip(a, b))
+
+
+class _Region:
+    """
+    Worker side: one World, its owned bodies and its ghosts.
+    """
+
+    def __init__(self, index: int, grid: RegionGrid, physics: PhysicsConfig) -> None:
+        self.index = index
+        self.grid = grid
+        self.root = NodePath(f"region_{index}")
+        self.ghost_root = self.root.attachNewNode("ghosts")
+        self.world = World(
+            self.root,
+            gravity=LVector3(*physics.gravity),
+            sleep=SleepSpec(linear=physics.sleep_linear, angular=physics.sleep_angular),
+            idle_skip=physics.idle_skip,
+        )
+        self.ids: dict[Any, int] = {}  # body -> id
+        self.nodes: dict[int, NodePath] = {}  # id -> owned body
+        self.ghosts: dict[int, tuple[NodePath, Pose]] = {}
+        self._ghosting: dict[int, set[int]] = {}  # owned body id -> regions holding its ghost
+        self._awake: set[int] = set()  # owned bodies awake after the last step
+        self._fresh: set[int] = set()  # owned bodies not reported yet
+        self._outbox: dict[int, _Ghosts] = {}
+        # bodies in here are far from every border: no handoff and no ghosts to think about
+        x0, x1, y0, y1 = grid.bounds(index)
+        m = grid.ghost_margin
+        self._inner = (x0 + m, x1 - m, y0 + m, y1 - m)
+        self._incoming: int | None = None  # id for the body being spawned by an arrival
+        self._leaving = False
+        self._next_local = 1
+        self._born: list[tuple[int, SceneSpec]] = []
+        self._died: list[int] = []
+        self.world.on_actor_added.append(self._on_added)
+        self.world.on_actor_removed.append(self._on_removed)
+
+    def _on_added(self, record) -> None:
+        body_id = self._incoming
+        if body_id is None:
+            # worker ids live above 2**32, one range per region, so they never clash
+            body_id = ((self.index + 1) << 32) | self._next_local
+            self._next_local += 1
+            self._born.append((body_id, record.spec))
+        self.ids[record.np.node()] = body_id
+        self.nodes[body_id] = record.np
+        self._fresh.add(body_id)
+
+    def _on_removed(self, record) -> None:
+        body_id = self.ids.pop(record.np.node(), None)
+        if body_id is None:
+            return
+        del self.nodes[body_id]
+        self._awake.discard(body_id)
+        self._fresh.discard(body_id)
+        # its ghosts go too; once handed over, the new owner sends fresh ones
+        for r in self._ghosting.pop(body_id, ()):
+            self._ghosts_for(r).gone.append(body_id)
+        if not self._leaving:
+            self._died.append(body_id)
+
+    def step(self, req: _StepRequest) -> _StepReply:
+        t0 = time.process_time()  # CPU time: other workers may share this core
+        world = self.world
+        # dropped ghosts first: one of them may be a body arriving here right now
+        self._drop_ghosts(req.ghosts.gone)
+        for h in req.arrivals:
+            self._arrive(h)
+        self._sync_ghosts(req.ghosts)
+        for center, radius, strength in req.impulses:
+            world.apply_radial_impulse(LPoint3(*center), radius, strength)
+
+        steps = world.step_physics(req.dt, req.max_substeps, req.substep_dt)
+
+        # sleeping bodies don't move: nothing to report, hand over or re-ghost for them
+        rows = []
+        departures = []
+        grid = self.grid
+        index = self.index
+        pack = _POSE.pack
+        was_awake = self._awake
+        fresh = self._fresh
+        ghosting = self._ghosting
+        ix0, ix1, iy0, iy1 = self._inner
+        awake_now: set[int] = set()
+        for body_id, np in list(self.nodes.items()):
+            awake = np.node().isActive()
+            if not (awake or body_id in was_awake or body_id in fresh):
+                continue
+            pose = _pose(np)
+            x, y = pose[0], pose[1]
+            inner = ix0 < x < ix1 and iy0 < y < iy1
+            if not inner and not grid.keeps(index, x, y):
+                departures.append(self._depart(body_id, np, pose))
+                continue
+            if awake:
+                awake_now.add(body_id)
+            row = pack(body_id, *pose, awake)
+            rows.append(row)
+            if not inner:
+                self._ghost(body_id, np, grid.ghost_regions(x, y, index), row)
+            elif body_id in ghosting:
+                self._ghost(body_id, np, [], row)  # moved away from the border
+        self._awake = awake_now
+        fresh.clear()
+
+        born, self._born = self._born, []
+        died, self._died = self._died, []
+        outbox, self._outbox = self._outbox, {}
+        for ghosts in outbox.values():
+            ghosts.rows = bytes(ghosts.rows)
+        return _StepReply(
+            steps, b"".join(rows), departures, born, died, outbox,
+            len(self.nodes), len(awake_now), len(self.ghosts), time.process_time() - t0,
+        )
+
+    def _arrive(self, h: Handoff) -> None:
+        pos = quat = None
+        if h.pose is not None:
+            # enters Bullet where it left the other region, like every spawn (see World.attach_actor)
+            x, y, z, qr, qi, qj, qk = h.pose
+            pos = LPoint3(x, y, z)
+            quat = LQuaternion(qr, qi, qj, qk)
+        self._incoming = h.body_id
+        try:
+            np = self.world.spawn(h.spec, visual=False, quat=quat, pos=pos)
+        finally:
+            self._incoming = None
+        if h.pose is not None:
+            body = np.node()
+            body.setLinearVelocity(LVector3(*h.lin_vel))
+            body.setAngularVelocity(LVector3(*h.ang_vel))
+
+    def _depart(self, body_id: int, np: NodePath, pose: Pose) -> Handoff:
+        body = np.node()
+        record = self.world.lookup(body)
+        lin = body.getLinearVelocity()
+        ang = body.getAngularVelocity()
+        self._leaving = True
+        try:
+            self.world.detach_actor(np)
+        finally:
+            self._leaving = False
+        return Handoff(body_id, record.spec, pose, (lin[0], lin[1], lin[2]), (ang[0], ang[1], ang[2]))
+
+    def _ghosts_for(self, region: int) -> _Ghosts:
+        ghosts = self._outbox.get(region)
+        if ghosts is None:
+            ghosts = self._outbox[region] = _Ghosts(rows=bytearray())
+        return ghosts
+
+    def _ghost(self, body_id: int, np: NodePath, regions: list[int], row: bytes) -> None:
+        # send an owned body's pose to the regions near it; the first time with its spec
+        old = self._ghosting.get(body_id)
+        if not regions and not old:
+            return
+        for r in regions:
+            ghosts = self._ghosts_for(r)
+            if not old or r not in old:
+                ghosts.specs[body_id] = self.world.lookup(np.node()).spec
+            ghosts.rows += row
+        if old:
+            for r in old.difference(regions):
+                self._ghosts_for(r).gone.append(body_id)
+        if regions:
+            self._ghosting[body_id] = set(regions)
+        else:
+            del self._ghosting[body_id]
+
+    def _drop_ghosts(self, gone: list[int]) -> None:
+        bullet = self.world.bullet_world
+        for body_id in gone:
+            entry = self.ghosts.pop(body_id, None)
+            if entry is not None:
+                bullet.removeRigidBody(entry[0].node())
+                entry[0].removeNode()
+
+    def _sync_ghosts(self, update: _Ghosts) -> None:
+        ghosts = self.ghosts
+        bullet = self.world.bullet_world
+        epsilon = self.grid.ghost_epsilon
+        moved = []
+        for body_id, *values, awake in _POSE.iter_unpack(update.rows):
+            pose = tuple(values)
+            entry = ghosts.get(body_id)
+            # compared with where the ghost is, not the last pose sent, so slow drift still adds up
+            if entry is not None and not _moved(entry[1], pose, epsilon):
+                continue
+            x, y, z, qr, qi, qj, qk = pose
+            if entry is None:
+                # pushes owned bodies, is never pushed back; not in the World's registry
+                node = actor_for_spec(update.specs[body_id]).make_node()
+                node.setMass(0.0)
+                np = self.ghost_root.attachNewNode(node)
+                np.setPosQuat(LPoint3(x, y, z), LQuaternion(qr, qi, qj, qk))
+                bullet.attachRigidBody(node)
+            else:
+                np = entry[0]
+                node = np.node()
+                if not node.isKinematic():
+                    # static for its first step: Bullet would take the jump from the origin
+                    # to the first pose as a kinematic velocity and fling its neighbours
+                    node.setKinematic(True)
+                np.setPosQuat(LPoint3(x, y, z), LQuaternion(qr, qi, qj, qk))
+            ghosts[body_id] = (np, pose)
+            if awake:
+                # an original that is asleep only settled into place; waking its neighbours
+                # over that would keep both regions awake for good
+                moved.append(LPoint3(x, y, z))
+
+        # a sleeping region would skip its step (idle_skip) and let a ghost pass through
+        world = self.world
+        for center in moved:
+            for body in world.bodies_in_radius(center, self.grid.ghost_margin):
+                record = world.lookup(body)
+                if record is not None and not body.isActive():
+                    world.wake(record.np)
+
+
+def _worker_main(conn, index: int, grid: RegionGrid, physics: PhysicsConfig) -> None:
+    region = _Region(index, grid, physics)
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            conn.close()
+            return
+        conn.send(region.step(msg))
+
+
+@dataclass
+class PartitionStats:
+    steps: int = 0  # step calls
+    handoffs: int = 0
+    ghosts: int = 0  # ghosts held across all regions after the last step
+    region_bodies: list[int] = field(default_factory=list)
+    region_active: list[int] = field(default_factory=list)
+    # seconds: the coordinator's own work, and per step the slowest worker's; with a core
+    # per region their sum is how long the steps take
+    coordinator_time: float = 0.0
+    critical_time: float = 0.0
+
+
+@dataclass
+class PartitionedWorld:
+    """
+    Coordinator: spawns bodies into their regions, steps all workers in parallel
+    and keeps the merged poses. Close it (or use it as a context manager) to stop the workers.
+    """
+    grid: RegionGrid = field(default_factory=RegionGrid)
+    physics: PhysicsConfig = PHYSICS
+
+    def __post_init__(self) -> None:
+        ctx = multiprocessing.get_context("spawn")  # workers must not inherit Panda state
+        self._conns = []
+        self._procs = []
+        for i in range(self.grid.count):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker_main, args=(child, i, self.grid, self.physics), daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+        self.poses: dict[int, Pose] = {}  # merged transform stream, spawn order
+        self.asleep: set[int] = set()  # ids of bodies their owner reported asleep
+        self.specs: dict[int, SceneSpec] = {}
+        self.owner: dict[int, int] = {}  # body id -> region, None while in transit
+        self._arrivals: list[list[Handoff]] = [[] for _ in range(self.grid.count)]
+        self._impulses: list[tuple[tuple[float, float, float], float, float]] = []
+        self._ghosts = [_Ghosts(rows=bytearray()) for _ in range(self.grid.count)]
+        self._next_id = 1
+        self.stats = PartitionStats(
+            region_bodies=[0] * self.grid.count, region_active=[0] * self.grid.count
+        )
+
+    def __enter__(self) -> "PartitionedWorld":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # public API
+    def spawn(self, spec: SceneSpec) -> int:
+        """
+        Queue a spec for the region its position lies in; it enters at the next step. Returns its id.
+        """
+        body_id = self._next_id
+        self._next_id += 1
+        region = self.grid.region_of(spec.pos[0], spec.pos[1])
+        self.specs[body_id] = spec
+        self.owner[body_id] = region
+        self.poses[body_id] = (*spec.pos, 1.0, 0.0, 0.0, 0.0)
+        self._arrivals[region].append(Handoff(body_id, spec))
+        return body_id
+
+    def apply_radial_impulse(self, center: LPoint3, radius: float, strength: float) -> None:
+        """
+        Sent to every region with the next step; each pushes the bodies it owns.
+        """
+        self._impulses.append(((center[0], center[1], center[2]), radius, strength))
+
+    def step_physics(self, dt: float, max_substeps: int, substep_dt: float) -> int:
+        """
+        One World.step_physics call in every region, all running at once. Returns the fixed steps taken.
+        """
+        t0 = time.process_time()  # not counting the wait for the workers
+        impulses, self._impulses = self._impulses, []
+        for i, conn in enumerate(self._conns):
+            arrivals, self._arrivals[i] = self._arrivals[i], []
+            ghosts, self._ghosts[i] = self._ghosts[i], _Ghosts(rows=bytearray())
+            ghosts.rows = bytes(ghosts.rows)
+            conn.send(_StepRequest(dt, max_substeps, substep_dt, arrivals, ghosts, impulses))
+
+        steps = 0
+        busy = 0.0
+        ghosts = 0
+        stats = self.stats
+        for i, conn in enumerate(self._conns):
+            reply: _StepReply = conn.recv()
+            steps = max(steps, reply.steps)
+            busy = max(busy, reply.busy)
+            ghosts += reply.ghost_count
+            self._merge(i, reply)
+        own = time.process_time() - t0
+        stats.ghosts = ghosts
+        stats.steps += 1
+        stats.coordinator_time += own
+        stats.critical_time += own + busy
+        return steps
+
+    def export_state(self, pos: Any = None, quat: Any = None) -> int:
+        """
+        Write the merged stream into flat float buffers, one row per body in spawn order.
+        """
+        poses = self.poses.values()
+        n = len(poses)
+        if pos is not None:
+            mv = _view(pos, n, 3, "pos")
+            mv[: 3 * n] = array(mv.format, [v for p in poses for v in p[:3]])
+        if quat is not None:
+            mv = _view(quat, n, 4, "quat")
+            mv[: 4 * n] = array(mv.format, [v for p in poses for v in p[3:]])
+        return n
+
+    @property
+    def body_count(self) -> int:
+        return len(self.poses)
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._procs = []
+
+    # internals
+    def _merge(self, region: int, reply: _StepReply) -> None:
+        # rows only for what moved; the rest keep their last pose
+        poses = self.poses
+        asleep = self.asleep
+        for body_id, *pose, awake in _POSE.iter_unpack(reply.poses):
+            poses[body_id] = tuple(pose)
+            if awake:
+                asleep.discard(body_id)
+            else:
+                asleep.add(body_id)
+        for body_id, spec in reply.born:
+            self.specs[body_id] = spec
+            self.owner[body_id] = region
+        for body_id in reply.died:
+            poses.pop(body_id, None)
+            asleep.discard(body_id)
+            self.specs.pop(body_id, None)
+            self.owner.pop(body_id, None)
+        grid = self.grid
+        for h in reply.departures:
+            # the receiving region learns the latest spec too (pieces of a broken group)
+            target = grid.region_of(h.pose[0], h.pose[1])
+            poses[h.body_id] = h.pose
+            asleep.discard(h.body_id)  # in transit, and awake again on arrival
+            self.specs[h.body_id] = h.spec
+            self.owner[h.body_id] = target
+            self._arrivals[target].append(h)
+            self.stats.handoffs += 1
+        for target, ghosts in reply.ghosts.items():
+            self._ghosts[target].add(ghosts)
+        self.stats.region_bodies[region] = reply.bodies
+        self.stats.region_active[region] = reply.active
+
+
+def run_headless(
+    grid: RegionGrid,
+    steps: int,
+    config_path: str | None = None,
+    specs: Iterable[SceneSpec] | None = None,
+    physics: PhysicsConfig = PHYSICS,
+) -> str:
+    """
+    Partitioned counterpart of HeadlessSim.run: one fixed step per call. Returns a summary line.
+    """
+    if specs is None:
+        specs = iter_scene_config(config_path) if config_path else [DEMO_CUBE]
+    dt = physics.dt_substep
+    with PartitionedWorld(grid=grid, physics=physics) as world:
+        for spec in specs:
+            world.spawn(spec)
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            world.step_physics(dt, 1, dt)
+        wall = time.perf_counter() - t0
+        stats = world.stats
+        regions = " ".join(str(n) for n in stats.region_bodies)
+        return (
+            f"{world.body_count} bodies in {grid.cols}x{grid.rows} regions ({regions}), "
+            f"{steps} steps ({steps * dt:.2f} s simulated) in {wall:.3f} s, "
+            f"{steps / wall if wall > 0.0 else 0.0:.0f} steps/s, {stats.handoffs} handoffs, {stats.ghosts} ghosts"
+        )
@@ -0,0 +1,222 @@
+"""
+Threaded physics: Bullet steps on a worker thread while the render thread draws.
+
+The World and its bodies belong to the worker. Their NodePaths live under a root
+that is never rendered; the window shows proxy nodes instead, one per actor, posed
+from a double buffer the worker publishes after every step. Anything else that
+touches the World (spawns, picks, impulses) goes into a command queue that the
+worker drains before it steps.
+
+doPhysics releases the GIL while Bullet runs, so on a multi-core machine the step
+for the next frame overlaps with culling and drawing the current one. The price is
+one frame of latency: a frame shows the state of the step kicked off a frame earlier.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from panda3d.core import NodePath, LPoint3, LQuaternion
+
+from core.body_state import BodyState
+from core.world import ActorRecord, World
+
+
+@dataclass
+class _Published:
+    records: list[ActorRecord] = field(default_factory=list)  # row order of state
+    state: BodyState = field(default_factory=BodyState)  # pos and quat only
+    roster: int = 0  # bumped whenever actors come or go
+
+
+@dataclass
+class PhysicsThread:
+    """
+    Drives a World from a worker thread. Call `frame(...)` once per rendered frame.
+
+    The World's scene_root must not be part of the rendered graph, and its actors
+    should be spawned without visuals; the proxies under `render_np` carry those.
+    """
+    world: World
+    render_np: NodePath
+    visual: bool = True  # attach actor visuals to new proxies (off when instanced)
+    # called on the render thread when an actor's proxy appears or goes away
+    on_proxy_added: list[Callable[[ActorRecord, NodePath], None]] = field(default_factory=list)
+    on_proxy_removed: list[Callable[[ActorRecord, NodePath], None]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._root = self.render_np.attachNewNode("physics_proxies")
+        self._commands: queue.SimpleQueue[Callable[[World], None]] = queue.SimpleQueue()
+        self._lock = threading.Lock()  # guards the buffer swap and the pending step
+        self._kick = threading.Event()
+        self._front = _Published()
+        self._back = _Published()
+        self._published = 0
+        self._seen = 0
+        self._roster = 0
+        self._pending_dt = 0.0
+        self._max_substeps = 1
+        self._substep_dt = 1.0 / 60.0
+        self._step = True
+        self._stopping = False
+        self._error: BaseException | None = None  # what killed the worker, raised again by frame()
+
+        # id(record) -> (record, proxy); records are dataclasses and don't hash
+        self._proxies: dict[int, tuple[ActorRecord, NodePath]] = {}
+        self._ordered: list[NodePath] = []  # proxies in the row order of the front buffer
+        self._roster_seen = -1
+        self.step_ms = 0.0  # wall time of the worker's last step, for the HUD
+
+        self.world.on_actor_added.append(self._on_roster)
+        self.world.on_actor_removed.append(self._on_roster)
+        self._thread = threading.Thread(target=self._run, name="physics", daemon=True)
+        self._thread.start()
+
+    # public API (render thread)
+    def submit(self, command: Callable[[World], None]) -> None:
+        """
+        Run command(world) on the worker before its next step.
+        """
+        self._commands.put(command)
+
+    def frame(self, dt: float, max_substeps: int, substep_dt: float, step: bool = True) -> bool:
+        """
+        Pose the proxies from the latest published step, then ask for the next one.
+        Never waits: if the worker is still busy, dt adds up for its next step.
+        Returns True when the proxies moved.
+
+        Raises whatever a command or step raised on the worker, which stopped at that point.
+        """
+        if self._error is not None:
+            raise self._error
+        moved = False
+        with self._lock:
+            if self._published != self._seen:
+                self._seen = self._published
+                self._apply(self._front)
+                moved = True
+            self._pending_dt += dt
+            self._max_substeps = max_substeps
+            self._substep_dt = substep_dt
+            self._step = step
+        self._kick.set()
+        return moved
+
+    @property
+    def proxies(self) -> list[tuple[ActorRecord, NodePath]]:
+        return list(self._proxies.values())
+
+    def copy_positions(self, buf) -> int:
+        """
+        Copy the published body positions (3 floats per row) into buf, growing it when
+        needed. Returns the row count.
+        """
+        with self._lock:
+            front = self._front
+            n = front.state.count
+            if len(buf) < 3 * n:
+                buf.extend([0.0] * (3 * n - len(buf)))
+            buf[: 3 * n] = front.state.pos[: 3 * n]
+        return n
+
+    def stop(self) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        self._kick.set()
+        self._thread.join()
+        self.world.on_actor_added.remove(self._on_roster)
+        self.world.on_actor_removed.remove(self._on_roster)
+
+    # worker
+    def _run(self) -> None:
+        try:
+            self._loop()
+        except BaseException as e:
+            # a dying thread only prints its traceback; the render thread raises it from frame()
+            self._error = e
+
+    def _loop(self) -> None:
+        world = self.world
+        while True:
+            self._kick.wait()
+            self._kick.clear()
+            if self._stopping:
+                return
+            with self._lock:
+                dt, self._pending_dt = self._pending_dt, 0.0
+                max_substeps = self._max_substeps
+                substep_dt = self._substep_dt
+                step = self._step
+            roster = self._roster
+            self._drain()
+
+            t0 = time.perf_counter()
+            steps = world.step_physics(dt, max_substeps, substep_dt) if step else 0
+            if steps or self._roster != roster or self._published == 0:
+                self._publish()
+            self.step_ms = (time.perf_counter() - t0) * 1000.0
+
+    def _drain(self) -> None:
+        commands = self._commands
+        while True:
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                return
+            command(self.world)
+
+    def _publish(self) -> None:
+        back = self._back
+        back.records = self.world.records
+        back.roster = self._roster
+        n = len(back.records)
+        state = back.state
+        state.reserve(n)
+        state.count = self.world.export_state(pos=state.pos, quat=state.quat)
+        with self._lock:
+            self._front, self._back = back, self._front
+            self._published += 1
+
+    def _on_roster(self, record: ActorRecord) -> None:
+        self._roster += 1
+
+    # render thread, under the lock
+    def _apply(self, front: _Published) -> None:
+        if front.roster != self._roster_seen:
+            self._roster_seen = front.roster
+            self._sync_proxies(front.records)
+        pos = front.state.pos
+        quat = front.state.quat
+        p = 0
+        q = 0
+        for proxy in self._ordered:
+            proxy.setPosQuat(
+                LPoint3(pos[p], pos[p + 1], pos[p + 2]),
+                LQuaternion(quat[q], quat[q + 1], quat[q + 2], quat[q + 3]),
+            )
+            p += 3
+            q += 4
+
+    def _sync_proxies(self, records: list[ActorRecord]) -> None:
+        old = self._proxies
+        proxies: dict[int, tuple[ActorRecord, NodePath]] = {}
+        for record in records:
+            entry = old.pop(id(record), None)
+            if entry is None:
+                proxy = self._root.attachNewNode(record.np.getName())
+                if self.visual:
+                    record.actor.attach_visual(proxy)
+                for cb in self.on_proxy_added:
+                    cb(record, proxy)
+                entry = (record, proxy)
+            proxies[id(record)] = entry
+        for record, proxy in old.values():
+            for cb in self.on_proxy_removed:
+                cb(record, proxy)
+            proxy.removeNode()
+        self._proxies = proxies
+        self._ordered = [proxy for _, proxy in proxies.values()]
@@ -0,0 +1,175 @@
+"""
+Per-phase frame timing with rolling percentiles, PStats collectors and an optional log file.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from panda3d.core import PStatCollector
+
+
+@dataclass
+class FrameProfiler:
+    """
+    Times named phases of each frame. Call begin_frame/end_frame around one frame and
+    wrap the work in `phase(name)` (or start/stop for phases split across tasks).
+
+    The log format follows the file suffix: .csv, or JSON lines for anything else.
+    """
+    window: int = 240  # frames kept for the rolling percentiles
+    log_path: str | None = None
+    expected_phases: tuple[str, ...] = ()  # CSV columns even if the first frame skips a phase
+
+    def __post_init__(self) -> None:
+        self._samples: dict[str, deque[float]] = {}
+        self._collectors: dict[str, PStatCollector] = {}
+        self._open: dict[str, float] = {}
+        self._frame: dict[str, float] = {}
+        self._frame_start = 0.0
+        self.frames = 0
+        self.counters: dict[str, Any] = {}
+
+        self._log = None
+        self._csv = None
+        self._columns: list[str] | None = None
+        if self.log_path:
+            self._log = open(self.log_path, "w", encoding="utf-8", newline="")
+            if Path(self.log_path).suffix == ".csv":
+                self._csv = csv.writer(self._log)
+
+    # frame
+    def begin_frame(self) -> None:
+        self._frame = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        frame_ms = (time.perf_counter() - self._frame_start) * 1000.0
+        self._record("frame", frame_ms)
+        self.frames += 1
+        if self._log is not None:
+            self._write_row(frame_ms)
+
+    # phases
+    def start(self, name: str) -> None:
+        self._collector(name).start()
+        self._open[name] = time.perf_counter()
+
+    def stop(self, name: str) -> None:
+        t0 = self._open.pop(name, None)
+        if t0 is None:
+            return
+        ms = (time.perf_counter() - t0) * 1000.0
+        self._collectors[name].stop()
+        self._frame[name] = self._frame.get(name, 0.0) + ms
+        self._record(name, ms)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    # stats
+    def percentiles(self, name: str, qs: tuple[float, ...] = (0.5, 0.95, 0.99)) -> tuple[float, ...]:
+        samples = self._samples.get(name)
+        if not samples:
+            return tuple(0.0 for _ in qs)
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(q * len(ordered)))] for q in qs)
+
+    def last(self, name: str) -> float:
+        """
+        The latest sample of a phase (or "frame") in ms, 0.0 before the first one.
+        """
+        samples = self._samples.get(name)
+        return samples[-1] if samples else 0.0
+
+    @property
+    def phases(self) -> list[str]:
+        return [n for n in self._samples if n != "frame"]
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    # internals
+    def _collector(self, name: str) -> PStatCollector:
+        c = self._collectors.get(name)
+        if c is None:
+            c = self._collectors[name] = PStatCollector(f"App:{name}")
+        return c
+
+    def _record(self, name: str, ms: float) -> None:
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(ms)
+
+    def _write_row(self, frame_ms: float) -> None:
+        row: dict[str, Any] = {"frame": self.frames, "t": round(time.time(), 4), "frame_ms": round(frame_ms, 4)}
+        for name, ms in self._frame.items():
+            row[f"{name}_ms"] = round(ms, 4)
+        row.update(self.counters)
+        if self._csv is None:
+            self._log.write(json.dumps(row) + "\n")
+            return
+        if self._columns is None:
+            # columns are fixed by the declared phases and the first logged frame; later keys are dropped
+            declared = [f"{p}_ms" for p in self.expected_phases]
+            self._columns = list(dict.fromkeys(["frame", "t", "frame_ms", *declared, *row]))
+            self._csv.writerow(self._columns)
+        self._csv.writerow([row.get(c, "") for c in self._columns])
+
+
+@dataclass
+class StartupTimer:
+    """
+    Wall time of each startup phase, up to the first frame on screen and past it for
+    work deferred until then. `mark(name)` closes the phase that ran since the last mark.
+    """
+    start: float = field(default_factory=time.perf_counter)  # pass the process' own start to count imports
+
+    def __post_init__(self) -> None:
+        self.phases: list[tuple[str, float]] = []  # (name, ms)
+        self.deferred: list[tuple[str, float]] = []
+        self.first_frame_ms: float | None = None
+        self._last = self.start
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000.0
+        self._last = now
+        if self.first_frame_ms is None:
+            self.phases.append((name, ms))
+        else:
+            self.deferred.append((name, ms))
+
+    def first_frame(self) -> None:
+        self.mark("first frame")
+        self.first_frame_ms = (self._last - self.start) * 1000.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # for deferred work that runs between frames: only its own time counts
+        self._last = time.perf_counter()
+        yield
+        self.mark(name)
+
+    def report(self) -> str:
+        total = self.first_frame_ms if self.first_frame_ms is not None else (self._last - self.start) * 1000.0
+        parts = ", ".join(f"{name} {ms:.0f}" for name, ms in self.phases)
+        line = f"Startup: first frame after {total:.0f} ms ({parts})"
+        if self.deferred:
+            line += "; deferred: " + ", ".join(f"{name} {ms:.0f}" for name, ms in self.deferred)
+        return line
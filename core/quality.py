@@ -0,0 +1,131 @@
+"""
+Adaptive quality: steps rendering and physics settings down when frames run long,
+and back up when there is headroom again.
+
+Each knob is an ordered list of settings, best first. A slow stretch of frames moves
+the knob of whichever side costs more (physics, or everything else, which is mostly
+rendering) one step down; spare time undoes the most recent step first.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable
+
+from core.profiling import FrameProfiler
+
+
+@dataclass
+class QualityState:
+    shadow_map_size: int
+    substeps: int  # catch-up budget: max fixed steps per frame
+    dt_substep: float  # fixed physics step
+    instanced: bool
+
+    def describe(self) -> str:
+        mode = "instanced" if self.instanced else "per-actor"
+        return f"shadow {self.shadow_map_size}  dt 1/{round(1.0 / self.dt_substep)}  budget {self.substeps}  {mode}"
+
+
+@dataclass
+class QualityController:
+    """
+    Call `update(now)` once per frame; `apply` is called with the new state after every change.
+    """
+    profiler: FrameProfiler
+    apply: Callable[[QualityState], None]
+    state: QualityState
+    target_fps: float = 60.0
+    shadow_map_sizes: tuple[int, ...] = (2048, 1024, 512, 256)
+    substep_budgets: tuple[int, ...] = (5, 3, 2)
+    substep_dts: tuple[float, ...] = (1.0 / 240.0, 1.0 / 120.0)
+    allow_instanced: bool = True
+    slow: float = 1.15  # step down when the p90 frame exceeds the budget by this factor
+    headroom: float = 0.6  # step up when the p90 frame stays under this share of the budget
+    min_frames: int = 45  # frames sampled since the last change before deciding again
+    down_delay_s: float = 1.0
+    up_delay_s: float = 4.0  # going up is slower, so settings don't flip back and forth
+    history: list[str] = field(default_factory=list)  # knobs stepped down, latest last
+
+    def __post_init__(self) -> None:
+        self._frames: list[float] = []
+        self._physics_ms = 0.0
+        self._changed_at = 0.0
+        self.changes = 0
+
+    @property
+    def budget_ms(self) -> float:
+        return 1000.0 / self.target_fps
+
+    def update(self, now: float) -> None:
+        frame_ms = self.profiler.last("frame")
+        if frame_ms <= 0.0:
+            return
+        self._frames.append(frame_ms)
+        self._physics_ms += self.profiler.last("physics")
+        if len(self._frames) < self.min_frames:
+            return
+
+        ordered = sorted(self._frames)
+        p90 = ordered[int(0.9 * (len(ordered) - 1))]
+        since = now - self._changed_at
+        changed = False
+        if p90 > self.budget_ms * self.slow and since >= self.down_delay_s:
+            physics_share = self._physics_ms / sum(self._frames)
+            changed = self._step_down(physics_first=physics_share >= 0.5, now=now)
+        elif p90 < self.budget_ms * self.headroom and since >= self.up_delay_s:
+            changed = self._step_up(now)
+        if not changed:
+            # keep a sliding window so one slow second long ago doesn't linger
+            drop = len(self._frames) // 2
+            self._physics_ms *= (len(self._frames) - drop) / len(self._frames)
+            del self._frames[:drop]
+
+    # internals
+    def _step_down(self, physics_first: bool, now: float) -> bool:
+        render = ("shadow", "instanced")
+        physics = ("dt", "budget")
+        for knob in (physics + render) if physics_first else (render + physics):
+            if self._move(knob, down=True):
+                self.history.append(knob)
+                self._changed(now)
+                return True
+        return False  # everything is as low as it goes
+
+    def _step_up(self, now: float) -> bool:
+        if not self.history or not self._move(self.history[-1], down=False):
+            return False
+        self.history.pop()
+        self._changed(now)
+        return True
+
+    def _move(self, knob: str, down: bool) -> bool:
+        s = self.state
+        step = 1 if down else -1
+        if knob == "shadow":
+            s.shadow_map_size, ok = _shift(self.shadow_map_sizes, s.shadow_map_size, step)
+        elif knob == "dt":
+            s.dt_substep, ok = _shift(self.substep_dts, s.dt_substep, step)
+        elif knob == "budget":
+            s.substeps, ok = _shift(self.substep_budgets, s.substeps, step)
+        else:
+            ok = self.allow_instanced and s.instanced != down
+            if ok:
+                s.instanced = down
+        return ok
+
+    def _changed(self, now: float) -> None:
+        self._frames.clear()
+        self._physics_ms = 0.0
+        self._changed_at = now
+        self.changes += 1
+        self.apply(self.state)
+
+
+def _shift(options: tuple, current, step: int):
+    """
+    The option `step` places after current (nearest option if current is not listed),
+    and whether that moved at all.
+    """
+    idx = min(range(len(options)), key=lambda i: abs(options[i] - current))
+    new = min(max(idx + step, 0), len(options) - 1)
+    return options[new], options[new] != current
@@ -0,0 +1,328 @@
+"""
+Recording and replay of simulation runs.
+
+A recording is an append-only binary stream of records, each a u8 type and a
+u32 payload length followed by the payload (little-endian):
+
+    SPAWN    u32 body id, 7 x f32 pose (pos, quat), UTF-8 JSON of the scene spec
+    DESPAWN  u32 body id
+    STEP     u32 frame, u32 fixed steps, f64 sim time, u32 n, n x (u32 body id, 7 x f32 pose)
+    EVENT    u8 kind (pick/impulse), 3 x f32 point, f32 radius, f32 strength
+
+STEP records hold only bodies that are awake, so settled scenes stay small.
+Spawns before the first STEP make up the initial scene. A replay rebuilds the
+bodies as plain NodePaths and feeds the recorded poses back without any physics.
+
+A replay only plays poses back. EVENT records say what the user did and when (for
+reading alongside the poses, see Replay.events), but nothing re-applies them: the
+outcome of every click is already in the poses that follow it. Reproducing a run
+means recording it again from the same scene and comparing with `diff`.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from panda3d.core import NodePath, LPoint3, LQuaternion
+
+from core.scene_config import spec_from_dict, spec_to_dict
+from core.world import ActorRecord, World
+from objects.primitives import actor_for_spec
+
+
+MAGIC = b"CWRC"
+FORMAT_VERSION = 1
+
+SPAWN = 1
+DESPAWN = 2
+STEP = 3
+EVENT = 4
+
+EVENT_PICK = 1
+EVENT_IMPULSE = 2
+
+_FILE_HEADER = struct.Struct("<4sHH")
+_RECORD = struct.Struct("<BI")
+_ID = struct.Struct("<I")
+_POSE = struct.Struct("<I7f")
+_STEP = struct.Struct("<IIdI")
+_EVENT = struct.Struct("<B5f")
+
+
+def _pose(np: NodePath) -> tuple[float, ...]:
+    p = np.getPos()
+    q = np.getQuat()
+    return (p[0], p[1], p[2], q[0], q[1], q[2], q[3])
+
+
+@dataclass
+class Recorder:
+    """
+    Hooks into a World and writes spawns, awake body poses per physics call, and input events.
+    """
+    world: World
+    path: str | Path
+
+    def __post_init__(self) -> None:
+        self._fh: BinaryIO = open(self.path, "wb")
+        self._fh.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        self._ids: dict[object, int] = {}
+        self._next_id = 0
+        self._pending: list[ActorRecord] = []
+        self.frames = 0
+
+        for record in self.world.records:
+            self._on_added(record)
+        self.world.on_actor_added.append(self._on_added)
+        self.world.on_actor_removed.append(self._on_removed)
+        self.world.on_step.append(self._on_step)
+
+    # public API
+    def record_pick(self, point: LPoint3) -> None:
+        self._write(EVENT, _EVENT.pack(EVENT_PICK, point[0], point[1], point[2], 0.0, 0.0))
+
+    def record_impulse(self, center: LPoint3, radius: float, strength: float) -> None:
+        self._write(EVENT, _EVENT.pack(EVENT_IMPULSE, center[0], center[1], center[2], radius, strength))
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self._flush_spawns()
+        self.world.on_actor_added.remove(self._on_added)
+        self.world.on_actor_removed.remove(self._on_removed)
+        self.world.on_step.remove(self._on_step)
+        self._fh.close()
+
+    # internals
+    def _write(self, kind: int, payload: bytes) -> None:
+        self._fh.write(_RECORD.pack(kind, len(payload)))
+        self._fh.write(payload)
+
+    def _on_added(self, record: ActorRecord) -> None:
+        # the spawner positions the body after attaching it; write it out at the next step
+        self._ids[record.np.node()] = self._next_id
+        self._next_id += 1
+        self._pending.append(record)
+
+    def _on_removed(self, record: ActorRecord) -> None:
+        if self._pending:
+            self._flush_spawns()  # a body may leave before its first step; spawn it first
+        body_id = self._ids.pop(record.np.node(), None)
+        if body_id is not None:
+            self._write(DESPAWN, _ID.pack(body_id))
+
+    def _flush_spawns(self) -> None:
+        for record in self._pending:
+            body_id = self._ids.get(record.np.node())
+            if body_id is None or record.spec is None:
+                continue
+            spec = json.dumps(spec_to_dict(record.spec), separators=(",", ":")).encode("utf-8")
+            self._write(SPAWN, _POSE.pack(body_id, *_pose(record.np)) + spec)
+        self._pending.clear()
+
+    def _on_step(self, steps: int) -> None:
+        if self._pending:
+            self._flush_spawns()
+        ids = self._ids
+        pack = _POSE.pack
+        chunks = []
+        for record in self.world.records:
+            body = record.np.node()
+            if body.isActive():
+                chunks.append(pack(ids[body], *_pose(record.np)))
+        stats = self.world.step_stats
+        header = _STEP.pack(self.frames, steps, stats.sim_time, len(chunks))
+        self._write(STEP, header + b"".join(chunks))
+        self.frames += 1
+
+
+@dataclass
+class StepFrame:
+    frame: int
+    steps: int
+    sim_time: float
+    poses: dict[int, tuple[float, ...]]
+
+
+def read_records(path: str | Path) -> Iterator[tuple[int, bytes]]:
+    with open(path, "rb") as fh:
+        magic, version, _ = _FILE_HEADER.unpack(fh.read(_FILE_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a CrashWorld recording: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {version}: {path}")
+        while True:
+            head = fh.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return  # a cut-off tail (crash while recording) ends the stream
+            kind, size = _RECORD.unpack(head)
+            payload = fh.read(size)
+            if len(payload) < size:
+                return
+            yield kind, payload
+
+
+def _decode_step(payload: bytes) -> StepFrame:
+    frame, steps, sim_time, n = _STEP.unpack_from(payload, 0)
+    poses = {}
+    for body_id, *pose in _POSE.iter_unpack(payload[_STEP.size:_STEP.size + n * _POSE.size]):
+        poses[body_id] = tuple(pose)
+    return StepFrame(frame=frame, steps=steps, sim_time=sim_time, poses=poses)
+
+
+@dataclass
+class Replay:
+    """
+    Plays a recording back onto plain NodePaths under `root`. No Bullet world is involved,
+    and recorded picks and impulses are collected in `events` rather than applied.
+    """
+    path: str | Path
+    root: NodePath
+    visual: bool = True
+
+    def __post_init__(self) -> None:
+        self._records = read_records(self.path)
+        self.nodes: dict[int, NodePath] = {}
+        self.events: list[tuple[int, tuple[float, ...]]] = []
+        self.frame: StepFrame | None = None
+        self.done = False
+
+    @property
+    def sim_time(self) -> float:
+        return self.frame.sim_time if self.frame is not None else 0.0
+
+    def step(self) -> bool:
+        """
+        Apply records up to and including the next STEP. Returns False at the end of the stream.
+        """
+        for kind, payload in self._records:
+            if kind == STEP:
+                self.frame = _decode_step(payload)
+                nodes = self.nodes
+                for body_id, (x, y, z, qr, qi, qj, qk) in self.frame.poses.items():
+                    np = nodes.get(body_id)
+                    if np is not None:
+                        np.setPosQuat(LPoint3(x, y, z), LQuaternion(qr, qi, qj, qk))
+                return True
+            if kind == SPAWN:
+                self._spawn(payload)
+            elif kind == DESPAWN:
+                (body_id,) = _ID.unpack(payload)
+                np = self.nodes.pop(body_id, None)
+                if np is not None:
+                    np.removeNode()
+            elif kind == EVENT:
+                kind_id, *values = _EVENT.unpack(payload)
+                self.events.append((kind_id, tuple(values)))
+        self.done = True
+        return False
+
+    def advance_to(self, sim_time: float) -> bool:
+        """
+        Step until the recorded clock reaches sim_time (or the recording ends).
+        """
+        while self.sim_time < sim_time:
+            if not self.step():
+                return False
+        return True
+
+    def run(self) -> int:
+        frames = 0
+        while self.step():
+            frames += 1
+        return frames
+
+    def _spawn(self, payload: bytes) -> None:
+        body_id, x, y, z, qr, qi, qj, qk = _POSE.unpack_from(payload, 0)
+        spec = spec_from_dict(json.loads(payload[_POSE.size:].decode("utf-8")))
+        np = self.root.attachNewNode(spec.name)
+        if self.visual:
+            actor_for_spec(spec).attach_visual(np)
+        np.setPosQuat(LPoint3(x, y, z), LQuaternion(qr, qi, qj, qk))
+        self.nodes[body_id] = np
+
+
+def diff_recordings(a: str | Path, b: str | Path, time_tolerance: float = 1e-6) -> dict[str, float]:
+    """
+    Compare two recordings of the same scene: the largest position difference of any
+    body, and the first sim time where it exceeds 1 mm.
+
+    Frames are matched by the fixed steps taken so far and the sim time, not by frame
+    number: with a varying frame time (the window app) two runs split the same steps
+    into different frames. Only frames where both runs stand at the same step and time
+    are compared; `unmatched` counts the others. Headless fixed-step runs match throughout.
+    """
+    ra = Replay(a, NodePath("a"), visual=False)
+    rb = Replay(b, NodePath("b"), visual=False)
+    max_err = 0.0
+    first_drift = -1.0
+    frames = 0
+    unmatched = 0
+    steps_a = steps_b = 0
+    more_a = ra.step()
+    more_b = rb.step()
+    if more_a:
+        steps_a += ra.frame.steps
+    if more_b:
+        steps_b += rb.frame.steps
+    while more_a and more_b:
+        if steps_a == steps_b and abs(ra.sim_time - rb.sim_time) <= time_tolerance:
+            frames += 1
+            for body_id, np_a in ra.nodes.items():
+                np_b = rb.nodes.get(body_id)
+                if np_b is None:
+                    continue
+                err = (np_a.getPos() - np_b.getPos()).length()
+                if err > max_err:
+                    max_err = err
+                if err > 1e-3 and first_drift < 0.0:
+                    first_drift = ra.sim_time
+            advance_a = advance_b = True
+        else:
+            unmatched += 1
+            # move whichever run is behind; at equal steps the clocks differ by idle time
+            advance_a = (steps_a, ra.sim_time) < (steps_b, rb.sim_time)
+            advance_b = not advance_a
+        if advance_a:
+            more_a = ra.step()
+            if more_a:
+                steps_a += ra.frame.steps
+        if advance_b:
+            more_b = rb.step()
+            if more_b:
+                steps_b += rb.frame.steps
+    return {"frames": frames, "unmatched": unmatched, "max_pos_error": max_err, "first_drift_time": first_drift}
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog="recording", description="Inspect CrashWorld recordings")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_play = sub.add_parser("replay", help="Play the recorded poses back headless, as fast as possible")
+    p_play.add_argument("path")
+    p_diff = sub.add_parser("diff", help="Compare two recordings of the same scene, matched by step and sim time")
+    p_diff.add_argument("a")
+    p_diff.add_argument("b")
+    args = parser.parse_args()
+
+    if args.cmd == "replay":
+        replay = Replay(args.path, NodePath("replay"), visual=False)
+        t0 = time.perf_counter()
+        frames = replay.run()
+        wall = time.perf_counter() - t0
+        rate = replay.sim_time / wall if wall > 0.0 else 0.0
+        print(
+            f"{frames} frames, {len(replay.nodes)} bodies, {replay.sim_time:.2f} s simulated "
+            f"in {wall:.3f} s ({rate:.0f}x real time), {len(replay.events)} events"
+        )
+    else:
+        print(json.dumps(diff_recordings(args.a, args.b)))
+
+
+if __name__ == "__main__":
+    main()
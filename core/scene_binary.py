@@ -0,0 +1,267 @@
+"""
+Compact binary scene format (.cwscene) and converters to/from the JSON schema.
+
+Layout, little-endian, every section 4-byte aligned:
+    header     magic "CWSC", u16 format version, u16 flags, u32 palette count, u32 cube count
+    palette    per entry 6 x f32: size, mass, r, g, b, a
+    indices    per cube u32 palette index
+    positions  per cube 3 x f32
+    names      (flag bit 0) u32 offsets[count + 1], then one UTF-8 blob
+
+Cubes without a stored name get the JSON default "cube_<idx>". The file is read
+memory-mapped, so loading costs a header check and a palette scan, not a parse.
+Values are stored as float32, which is plenty for sizes, colors and positions.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from core.scene_config import (
+    BINARY_SUFFIX,
+    CubeBatch,
+    CubeSpec,
+    SceneConfigError,
+    SceneSpec,
+    load_scene_config,
+)
+
+
+MAGIC = b"CWSC"
+FORMAT_VERSION = 1
+FLAG_NAMES = 1
+SUFFIX = BINARY_SUFFIX
+
+_HEADER = struct.Struct("<4sHHII")
+_PALETTE_FLOATS = 6
+
+
+def _le(a: array) -> array:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+
+def _view(mem: memoryview, offset: int, count: int, typecode: str) -> memoryview:
+    size = 4 * count
+    if offset + size > len(mem):
+        raise SceneConfigError("Binary scene is truncated")
+    view = mem[offset:offset + size].cast(typecode)
+    if sys.byteorder != "little":
+        # mapped views can't be swapped in place; fall back to a swapped copy
+        a = array(typecode, view)
+        a.byteswap()
+        view = memoryview(a)
+    return view
+
+
+@dataclass
+class BinaryScene:
+    """
+    A memory-mapped .cwscene file. Columns are memoryviews straight into the mapping.
+    """
+    path: Path
+
+    def __post_init__(self) -> None:
+        with open(self.path, "rb") as fh:
+            try:
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise SceneConfigError(f"Binary scene is empty: {self.path}") from e
+        mem = memoryview(self._mmap)
+        if len(mem) < _HEADER.size:
+            raise SceneConfigError(f"Binary scene is truncated: {self.path}")
+
+        magic, version, flags, n_palette, n_cubes = _HEADER.unpack_from(mem, 0)
+        if magic != MAGIC:
+            raise SceneConfigError(f"Not a CrashWorld binary scene: {self.path}")
+        if version != FORMAT_VERSION:
+            raise SceneConfigError(f"Unsupported binary scene version {version}: {self.path}")
+
+        off = _HEADER.size
+        self.palette = _view(mem, off, n_palette * _PALETTE_FLOATS, "f")
+        off += 4 * n_palette * _PALETTE_FLOATS
+        self.indices = _view(mem, off, n_cubes, "I")
+        off += 4 * n_cubes
+        self.positions = _view(mem, off, n_cubes * 3, "f")
+        off += 12 * n_cubes
+
+        self._name_offsets: memoryview | None = None
+        if flags & FLAG_NAMES:
+            self._name_offsets = _view(mem, off, n_cubes + 1, "I")
+            off += 4 * (n_cubes + 1)
+            self._name_blob = mem[off:off + self._name_offsets[-1]]
+            if len(self._name_blob) != self._name_offsets[-1]:
+                raise SceneConfigError(f"Binary scene is truncated: {self.path}")
+        self._mem = mem
+
+        self._validate(n_palette, n_cubes)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def _validate(self, n_palette: int, n_cubes: int) -> None:
+        pal = self.palette
+        for i in range(n_palette):
+            size, mass, r, g, b, a = pal[i * 6:i * 6 + 6]
+            if not size > 0.0:
+                raise SceneConfigError(f'palette[{i}]: "size" must be > 0')
+            if not mass >= 0.0:
+                raise SceneConfigError(f'palette[{i}]: "mass" must be >= 0')
+            for j, x in enumerate((r, g, b, a)):
+                if not 0.0 <= x <= 1.0:
+                    raise SceneConfigError(f'palette[{i}]: "color[{j}]" must be in range [0..1]')
+        if n_cubes and max(self.indices) >= n_palette:
+            raise SceneConfigError("Binary scene references a palette entry that does not exist")
+
+    def name(self, idx: int) -> str:
+        offsets = self._name_offsets
+        if offsets is None:
+            return f"cube_{idx}"
+        return str(self._name_blob[offsets[idx]:offsets[idx + 1]], "utf-8")
+
+    def batches(self, batch_size: int = 4096) -> Iterator[CubeBatch]:
+        """
+        Cubes as CubeBatch columns (float64 arrays, like the JSON streaming parser).
+        """
+        pal = self.palette
+        for start in range(0, len(self), batch_size):
+            idx = self.indices[start:start + batch_size]
+            size = array("d", (pal[6 * k] for k in idx))
+            mass = array("d", (pal[6 * k + 1] for k in idx))
+            color = array("d", (c for k in idx for c in pal[6 * k + 2:6 * k + 6]))
+            pos = array("d", self.positions[3 * start:3 * (start + len(idx))])
+            names = [self.name(i) for i in range(start, start + len(idx))]
+            yield CubeBatch(start=start, names=names, size=size, mass=mass, color=color, pos=pos)
+
+    def specs(self) -> Iterator[CubeSpec]:
+        # one CubeSpec payload per palette entry, shared by every cube using it
+        pal = self.palette
+        entries = [
+            (pal[6 * k], pal[6 * k + 1], tuple(pal[6 * k + 2:6 * k + 6]))
+            for k in range(len(pal) // 6)
+        ]
+        pos = self.positions
+        for i, k in enumerate(self.indices):
+            size, mass, color = entries[k]
+            p = 3 * i
+            yield CubeSpec(
+                name=self.name(i),
+                size=size,
+                mass=mass,
+                color=color,
+                pos=(pos[p], pos[p + 1], pos[p + 2]),
+            )
+
+    def close(self) -> None:
+        views = [self.palette, self.indices, self.positions]
+        if self._name_offsets is not None:
+            views += [self._name_offsets, self._name_blob]
+        for view in views + [self._mem]:
+            view.release()
+        self._mmap.close()
+
+
+def load_binary_scene(path: str | Path) -> BinaryScene:
+    return BinaryScene(Path(path))
+
+
+def write_binary_scene(specs: Iterable[SceneSpec], path: str | Path) -> int:
+    """
+    Write specs as a .cwscene file. Returns the number of palette entries.
+    """
+    palette: dict[tuple, int] = {}
+    pal = array("f")
+    indices = array("I")
+    positions = array("f")
+    names: list[str] = []
+    custom_names = False
+
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, CubeSpec):
+            raise SceneConfigError(f'Binary scenes hold single cubes only; group "{spec.name}" is not supported')
+        if spec.sleep is not None:
+            raise SceneConfigError(f'Binary scenes have no sleep settings; cube "{spec.name}" sets some')
+        key = (spec.size, spec.mass, tuple(spec.color))
+        k = palette.get(key)
+        if k is None:
+            k = palette[key] = len(palette)
+            pal.append(spec.size)
+            pal.append(spec.mass)
+            pal.extend(spec.color)
+        indices.append(k)
+        positions.extend(spec.pos)
+        names.append(spec.name)
+        custom_names = custom_names or spec.name != f"cube_{i}"
+
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_NAMES if custom_names else 0, len(palette), len(indices)))
+        _le(pal).tofile(fh)
+        _le(indices).tofile(fh)
+        _le(positions).tofile(fh)
+        if custom_names:
+            blobs = [n.encode("utf-8") for n in names]
+            offsets = array("I", [0])
+            total = 0
+            for b in blobs:
+                total += len(b)
+                offsets.append(total)
+            _le(offsets).tofile(fh)
+            fh.write(b"".join(blobs))
+    return len(palette)
+
+
+def _short(x: float) -> float:
+    # float32 round trip: keep JSON readable (0.6, not 0.6000000238418579)
+    return float(f"{x:.7g}")
+
+
+def json_to_binary(src: str | Path, dst: str | Path) -> int:
+    return write_binary_scene(load_scene_config(src), dst)
+
+
+def binary_to_json(src: str | Path, dst: str | Path) -> int:
+    scene = load_binary_scene(src)
+    try:
+        with open(dst, "w", encoding="utf-8") as fh:
+            fh.write('{\n  "version": 1,\n  "cubes": [\n')
+            for i, spec in enumerate(scene.specs()):
+                cube = {
+                    "name": spec.name,
+                    "size": _short(spec.size),
+                    "mass": _short(spec.mass),
+                    "color": [_short(c) for c in spec.color],
+                    "pos": [_short(p) for p in spec.pos],
+                }
+                fh.write(("    " if i == 0 else ",\n    ") + json.dumps(cube, separators=(",", ":")))
+            fh.write("\n  ]\n}\n")
+        return len(scene)
+    finally:
+        scene.close()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="scene_binary", description="Convert CrashWorld scene configs")
+    parser.add_argument("src", help="Input scene (.json or .cwscene)")
+    parser.add_argument("dst", help="Output scene (.cwscene or .json)")
+    args = parser.parse_args()
+
+    if Path(args.src).suffix == SUFFIX:
+        n = binary_to_json(args.src, args.dst)
+        print(f"Wrote {n} cubes to {args.dst}")
+    else:
+        n = json_to_binary(args.src, args.dst)
+        print(f"Wrote {args.dst} ({n} palette entries)")
+
+
+if __name__ == "__main__":
+    main()
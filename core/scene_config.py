@@ -2,13 +2,40 @@
 Scene config loader.
 
 Loads a JSON file describing cubes (size, color, position) and validates it.
+Optional "groups" bundle cubes into one rigid compound body each.
+An optional "sleep" block sets the scene's sleep thresholds; cubes and groups may override it.
 """
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import math
+from array import array
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator, TextIO
+
+
+@dataclass(frozen=True)
+class SleepSpec:
+    """
+    When a body may fall asleep: below both speed thresholds for Bullet's deactivation time.
+    None leaves a value to the next level up (group, scene, then Bullet's defaults).
+    """
+    linear: float | None = None  # m/s
+    angular: float | None = None  # rad/s
+    enabled: bool | None = None  # False keeps the body awake for good
+
+    def over(self, base: SleepSpec | None) -> SleepSpec:
+        """
+        This spec with its unset values taken from base.
+        """
+        if base is None:
+            return self
+        return SleepSpec(
+            linear=base.linear if self.linear is None else self.linear,
+            angular=base.angular if self.angular is None else self.angular,
+            enabled=base.enabled if self.enabled is None else self.enabled,
+        )
 
 
 @dataclass(frozen=True)
@@ -18,6 +45,41 @@ class CubeSpec:
     mass: float
     color: tuple[float, float, float, float]
     pos: tuple[float, float, float]
+    sleep: SleepSpec | None = None
+
+
+@dataclass(frozen=True)
+class GroupSpec:
+    """
+    Several cubes simulated as one rigid body. Cube positions are relative to `pos`.
+    A breakable group falls apart into single cubes when hit by an impulse >= break_impulse.
+    """
+    name: str
+    pos: tuple[float, float, float]
+    cubes: tuple[CubeSpec, ...]
+    breakable: bool = False
+    break_impulse: float = 10.0
+    sleep: SleepSpec | None = None
+
+    @property
+    def mass(self) -> float:
+        return sum(c.mass for c in self.cubes)
+
+
+SceneSpec = CubeSpec | GroupSpec
+
+
+# Spawned when no config file is given.
+DEMO_CUBE = CubeSpec(
+    name="box",
+    size=1.0,
+    mass=1.0,
+    color=(0.9, 0.3, 0.2, 1.0),
+    pos=(0.0, 0.0, 8.0),
+)
+
+
+_DEFAULT_COLOR = (0.9, 0.3, 0.2, 1.0)
 
 
 class SceneConfigError(RuntimeError):
@@ -62,43 +124,125 @@ def _as_positive_float(v: Any, field: str) -> float:
     return f
 
 
-def parse_scene_config(data: dict[str, Any]) -> list[CubeSpec]:
-    _require(isinstance(data, dict), "Config root must be a JSON object")
+def _as_sleep(v: Any, default: SleepSpec | None = None) -> SleepSpec | None:
+    if v is None:
+        return default
+    _require(isinstance(v, dict), '"sleep" must be an object')
+    unknown = set(v) - {f.name for f in fields(SleepSpec)}
+    _require(not unknown, f'"sleep" has unknown keys: {", ".join(sorted(unknown))}')
+    linear = v.get("linear")
+    angular = v.get("angular")
+    enabled = v.get("enabled")
+    for key, x in (("linear", linear), ("angular", angular)):
+        if x is not None:
+            _require(isinstance(x, (int, float)) and x >= 0.0, f'"sleep.{key}" must be a number >= 0')
+    _require(enabled is None or isinstance(enabled, bool), '"sleep.enabled" must be true or false')
+    spec = SleepSpec(
+        linear=None if linear is None else float(linear),
+        angular=None if angular is None else float(angular),
+        enabled=enabled,
+    )
+    return spec.over(default)
+
+
+def _parse_cube(idx: int, raw: Any, sleep: SleepSpec | None = None) -> CubeSpec:
+    _require(isinstance(raw, dict), f'cubes[{idx}] must be an object')
+
+    name = _as_str(raw.get("name", f"cube_{idx}"), "name")
+    size = _as_positive_float(raw.get("size"), "size")
+    mass = float(raw.get("mass", 1.0))
+    _require(mass >= 0.0, '"mass" must be >= 0')
+    color = _as_color(raw.get("color", list(_DEFAULT_COLOR)))
+    pos = _as_pos(raw.get("pos"))
 
-    version = data.get("version", 1)
+    return CubeSpec(
+        name=name,
+        size=size,
+        mass=mass,
+        color=color,
+        pos=pos,
+        sleep=_as_sleep(raw.get("sleep"), sleep),
+    )
+
+
+def _parse_group(idx: int, raw: Any, sleep: SleepSpec | None = None) -> GroupSpec:
+    _require(isinstance(raw, dict), f'groups[{idx}] must be an object')
+
+    name = _as_str(raw.get("name", f"group_{idx}"), "name")
+    pos = _as_pos(raw.get("pos", [0.0, 0.0, 0.0]))
+    breakable = raw.get("breakable", False)
+    _require(isinstance(breakable, bool), '"breakable" must be true or false')
+    break_impulse = _as_positive_float(raw.get("break_impulse", 10.0), "break_impulse")
+    sleep = _as_sleep(raw.get("sleep"), sleep)  # the group body's; its cubes inherit it on breaking
+
+    cubes = raw.get("cubes")
+    _require(isinstance(cubes, list) and len(cubes) > 0, f'groups[{idx}]: "cubes" must be a non-empty list')
+
+    return GroupSpec(
+        name=name,
+        pos=pos,
+        cubes=tuple(_parse_cube(j, c, sleep) for j, c in enumerate(cubes)),
+        breakable=breakable,
+        break_impulse=break_impulse,
+        sleep=sleep,
+    )
+
+
+def spec_to_dict(spec: SceneSpec) -> dict[str, Any]:
+    """
+    The JSON schema entry for a spec (a "cubes" item, or a "groups" item).
+    """
+    if isinstance(spec, GroupSpec):
+        out = {
+            "name": spec.name,
+            "pos": list(spec.pos),
+            "breakable": spec.breakable,
+            "break_impulse": spec.break_impulse,
+            "cubes": [spec_to_dict(c) for c in spec.cubes],
+        }
+    else:
+        out = {"name": spec.name, "size": spec.size, "mass": spec.mass, "color": list(spec.color), "pos": list(spec.pos)}
+    if spec.sleep is not None:
+        out["sleep"] = {k: v for k, v in vars(spec.sleep).items() if v is not None}
+    return out
+
+
+def spec_from_dict(raw: dict[str, Any]) -> SceneSpec:
+    # groups are the entries that carry their own cube list
+    if isinstance(raw, dict) and "cubes" in raw:
+        return _parse_group(0, raw)
+    return _parse_cube(0, raw)
+
+
+def _check_version(version: Any) -> None:
     _require(isinstance(version, int) and version >= 1, '"version" must be an integer >= 1')
 
-    cubes = data.get("cubes")
-    _require(isinstance(cubes, list), '"cubes" must be a list')
 
-    specs: list[CubeSpec] = []
-    for idx, raw in enumerate(cubes):
-        _require(isinstance(raw, dict), f'cubes[{idx}] must be an object')
+def parse_scene_config(data: dict[str, Any]) -> list[SceneSpec]:
+    _require(isinstance(data, dict), "Config root must be a JSON object")
 
-        name = _as_str(raw.get("name", f"cube_{idx}"), "name")
-        size = _as_positive_float(raw.get("size"), "size")
-        mass = float(raw.get("mass", 1.0))
-        _require(mass >= 0.0, '"mass" must be >= 0')
-        color = _as_color(raw.get("color", [0.9, 0.3, 0.2, 1.0]))
-        pos = _as_pos(raw.get("pos"))
+    _check_version(data.get("version", 1))
 
-        specs.append(
-            CubeSpec(
-                name=name,
-                size=size,
-                mass=mass,
-                color=color,
-                pos=pos,
-            )
-        )
+    # a scene made only of groups may leave out "cubes"
+    cubes = data.get("cubes", [] if "groups" in data else None)
+    _require(isinstance(cubes, list), '"cubes" must be a list')
+    groups = data.get("groups", [])
+    _require(isinstance(groups, list), '"groups" must be a list')
+    sleep = _as_sleep(data.get("sleep"))
 
+    specs: list[SceneSpec] = [_parse_cube(idx, raw, sleep) for idx, raw in enumerate(cubes)]
+    specs.extend(_parse_group(idx, raw, sleep) for idx, raw in enumerate(groups))
     return specs
 
 
-def load_scene_config(path: str | Path) -> list[CubeSpec]:
-    p = Path(path)
-    _require(p.exists(), f"Config file not found: {p}")
-    _require(p.is_file(), f"Config path is not a file: {p}")
+def load_scene_config(path: str | Path) -> list[SceneSpec]:
+    p = _check_path(path)
+    if p.suffix == BINARY_SUFFIX:
+        scene = _binary_scene(p)
+        try:
+            return list(scene.specs())
+        finally:
+            scene.close()
 
     try:
         data = json.loads(p.read_text(encoding="utf-8"))
@@ -106,3 +250,284 @@ def load_scene_config(path: str | Path) -> list[CubeSpec]:
         raise SceneConfigError(f"Failed to read/parse JSON: {p} ({e})") from e
 
     return parse_scene_config(data)
+
+
+def _check_path(path: str | Path) -> Path:
+    p = Path(path)
+    _require(p.exists(), f"Config file not found: {p}")
+    _require(p.is_file(), f"Config path is not a file: {p}")
+    return p
+
+
+# Binary scenes (see core.scene_binary) are picked by file suffix.
+BINARY_SUFFIX = ".cwscene"
+
+
+def _binary_scene(p: Path):
+    from core.scene_binary import load_binary_scene  # imports this module
+
+    return load_binary_scene(p)
+
+
+# --- streaming ---
+
+@dataclass
+class CubeBatch:
+    """
+    A run of validated cubes stored column-wise: pos (3 per cube), color (4 per cube).
+    Sleep settings are rare, so they are kept as a scene default plus per-cube exceptions.
+    """
+    start: int
+    names: list[str]
+    size: array
+    mass: array
+    color: array
+    pos: array
+    sleep: SleepSpec | None = None
+    sleep_overrides: dict[int, SleepSpec] | None = None  # batch index -> spec
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def specs(self) -> Iterator[CubeSpec]:
+        size, mass, color, pos = self.size, self.mass, self.color, self.pos
+        sleep = self.sleep
+        overrides = self.sleep_overrides or {}
+        for i, name in enumerate(self.names):
+            c = 4 * i
+            p = 3 * i
+            yield CubeSpec(
+                name=name,
+                size=size[i],
+                mass=mass[i],
+                color=(color[c], color[c + 1], color[c + 2], color[c + 3]),
+                pos=(pos[p], pos[p + 1], pos[p + 2]),
+                sleep=overrides.get(i, sleep),
+            )
+
+
+def _validate_batch(start: int, raws: list[Any], sleep: SleepSpec | None = None) -> CubeBatch:
+    """
+    Fast path: append raw fields straight into columns, then range-check whole columns.
+    Any failure re-runs the per-cube validator so the error message stays the same.
+    """
+    names: list[str] = []
+    size = array("d")
+    mass = array("d")
+    color = array("d")
+    pos = array("d")
+    try:
+        for idx, raw in enumerate(raws, start):
+            name = raw.get("name")
+            if name is None:
+                name = f"cube_{idx}"
+            elif type(name) is not str or not name.strip():
+                raise ValueError
+            c = raw.get("color", _DEFAULT_COLOR)
+            p = raw.get("pos")
+            if type(c) not in (list, tuple) or len(c) != 4 or type(p) not in (list, tuple) or len(p) != 3:
+                raise ValueError
+            if "sleep" in raw:
+                raise ValueError  # per-cube sleep settings take the slow path
+            names.append(name)
+            size.append(raw.get("size"))
+            mass.append(raw.get("mass", 1.0))
+            color.extend(c)
+            pos.extend(p)
+        ok = not raws or (min(size) > 0.0 and min(mass) >= 0.0 and min(color) >= 0.0 and max(color) <= 1.0)
+        # min/max skip a NaN that isn't first; a NaN anywhere turns a column's sum into NaN
+        ok = ok and not math.isnan(sum(size) + sum(mass) + sum(color))
+    except (AttributeError, TypeError, ValueError):
+        ok = False
+
+    overrides = None
+    if not ok:
+        # slow path: raises the exact error for the first bad cube
+        specs = [_parse_cube(idx, raw, sleep) for idx, raw in enumerate(raws, start)]
+        overrides = {i: s.sleep for i, s in enumerate(specs) if s.sleep != sleep} or None
+        names = [s.name for s in specs]
+        size = array("d", (s.size for s in specs))
+        mass = array("d", (s.mass for s in specs))
+        color = array("d", (x for s in specs for x in s.color))
+        pos = array("d", (x for s in specs for x in s.pos))
+
+    return CubeBatch(
+        start=start, names=names, size=size, mass=mass, color=color, pos=pos, sleep=sleep, sleep_overrides=overrides
+    )
+
+
+class _JsonStream:
+    """
+    Minimal incremental JSON reader: walks the top-level object and decodes one value at a time.
+    """
+
+    def __init__(self, fh: TextIO, chunk_size: int) -> None:
+        self._fh = fh
+        self._chunk = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, n: int) -> bool:
+        if self._eof:
+            return False
+        data = self._fh.read(max(n, self._chunk))
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buf = self._buf
+            n = len(buf)
+            pos = self._pos
+            while pos < n and buf[pos] in " \t\r\n":
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill(self._chunk):
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"expected one of {chars!r} at offset {self._pos}, got {ch!r}")
+        self._pos += 1
+        return ch
+
+    def value(self) -> Any:
+        self.peek()
+        want = self._chunk
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # the value may just be cut off at the end of the buffer
+                if not self._fill(want):
+                    raise
+                want *= 2
+                continue
+            if end == len(self._buf) and not self._eof and self._buf[self._pos] not in "{[\"":
+                # a number at the buffer end may continue in the next chunk
+                if self._fill(self._chunk):
+                    continue
+            self._pos = end
+            return obj
+
+
+def iter_scene_batches(
+    path: str | Path, batch_size: int = 4096, chunk_size: int = 1 << 16
+) -> Iterator[CubeBatch | GroupSpec]:
+    """
+    Stream a scene config: yields validated CubeBatch runs of up to batch_size cubes,
+    and each group as one GroupSpec.
+
+    Only one batch and one read chunk are held in memory. Path errors are raised at once,
+    everything else while iterating. A scene "sleep" block must come before "cubes" and "groups".
+    """
+    p = _check_path(path)
+    if p.suffix == BINARY_SUFFIX:
+        return _binary_batches(_binary_scene(p), batch_size)
+    return _stream_batches(p, batch_size, chunk_size)
+
+
+def _binary_batches(scene, batch_size: int) -> Iterator[CubeBatch]:
+    # the mapping is released once the batches are used up, or when the iterator is dropped
+    try:
+        yield from scene.batches(batch_size)
+    finally:
+        scene.close()
+
+
+def _stream_batches(p: Path, batch_size: int, chunk_size: int) -> Iterator[CubeBatch | GroupSpec]:
+    version: Any = 1
+    sleep: SleepSpec | None = None
+    seen_cubes = False
+    seen_groups = False
+    with p.open("r", encoding="utf-8") as fh:
+        js = _JsonStream(fh, chunk_size)
+        try:
+            if js.peek() != "{":
+                js.value()  # let the decoder report garbage, otherwise it is valid JSON
+                raise SceneConfigError("Config root must be a JSON object")
+            js.expect("{")
+            if js.peek() == "}":
+                js.expect("}")
+            else:
+                while True:
+                    key = js.value()
+                    js.expect(":")
+                    if key == "cubes":
+                        seen_cubes = True
+                        _check_version(version)  # if it came first, fail before any spawning
+                        if js.peek() != "[":
+                            js.value()
+                            raise SceneConfigError('"cubes" must be a list')
+                        js.expect("[")
+                        idx = 0
+                        raws: list[Any] = []
+                        if js.peek() == "]":
+                            js.expect("]")
+                        else:
+                            while True:
+                                raws.append(js.value())
+                                if len(raws) >= batch_size:
+                                    yield _validate_batch(idx, raws, sleep)
+                                    idx += len(raws)
+                                    raws = []
+                                if js.expect(",]") == "]":
+                                    break
+                        if raws:
+                            yield _validate_batch(idx, raws, sleep)
+                    elif key == "groups":
+                        seen_groups = True
+                        _check_version(version)
+                        if js.peek() != "[":
+                            js.value()
+                            raise SceneConfigError('"groups" must be a list')
+                        js.expect("[")
+                        if js.peek() == "]":
+                            js.expect("]")
+                        else:
+                            idx = 0
+                            while True:
+                                # groups are small; each one is decoded and validated whole
+                                yield _parse_group(idx, js.value(), sleep)
+                                idx += 1
+                                if js.expect(",]") == "]":
+                                    break
+                    else:
+                        value = js.value()
+                        if key == "version":
+                            version = value
+                        elif key == "sleep":
+                            # cubes already spawned can't pick it up any more
+                            _require(not (seen_cubes or seen_groups), '"sleep" must come before "cubes" and "groups"')
+                            sleep = _as_sleep(value)
+                    if js.expect(",}") == "}":
+                        break
+        except ValueError as e:  # JSONDecodeError included
+            raise SceneConfigError(f"Failed to read/parse JSON: {p} ({e})") from e
+
+    _check_version(version)
+    _require(seen_cubes or seen_groups, '"cubes" must be a list')
+
+
+def iter_scene_config(path: str | Path, batch_size: int = 4096) -> Iterator[SceneSpec]:
+    """
+    Lazily yield CubeSpecs and GroupSpecs from a scene config file, parsed and validated in batches.
+    """
+    return _flatten(iter_scene_batches(path, batch_size))  # path errors surface here, not on first next()
+
+
+def _flatten(items: Iterator[CubeBatch | GroupSpec]) -> Iterator[SceneSpec]:
+    for item in items:
+        if isinstance(item, GroupSpec):
+            yield item
+        else:
+            yield from item.specs()
@@ -23,13 +23,74 @@ class CameraConfig:
 @dataclass(frozen=True)
 class PhysicsConfig:
     gravity: tuple[float, float, float] = (0.0, 0.0, -9.81)
-    substeps: int = 5
-    dt_substep: float = 1.0 / 240.0
+    substeps: int = 5  # catch-up budget: max fixed steps per frame, the rest is dropped
+    dt_substep: float = 1.0 / 240.0  # fixed physics step
+    sleep_linear: float = 0.8  # m/s; bodies slower than this (and sleep_angular) for ~2 s fall asleep
+    sleep_angular: float = 1.0  # rad/s
+    idle_skip: bool = True  # no physics steps while every body sleeps
+    threaded: bool = False  # step Bullet on a worker thread, overlapping with rendering
+
+@dataclass(frozen=True)
+class ImpulseConfig:
+    radius: float = 4.0  # m; bodies within this distance of the click are pushed
+    strength: float = 35.0  # impulse at the center, falling off towards the radius
+
+
+@dataclass(frozen=True)
+class SpawnConfig:
+    streaming: bool = True  # spawn config scenes over several frames instead of all at once
+    budget_ms: float = 4.0  # spawn time allowed per frame
+    freeze_until_loaded: bool = True  # no physics steps until every actor is spawned
+
+
+@dataclass(frozen=True)
+class DespawnConfig:
+    max_actors: int | None = None  # oldest actors are removed beyond this count, scene actors included
+    lifetime_s: float | None = None  # remove actors older than this (sim seconds)
+    kill_z: float | None = -50.0  # remove bodies that fell below this height
+    bounds_radius: float | None = 500.0  # remove bodies this far from the origin (horizontally)
+    pool_size: int = 512  # despawned cubes kept for reuse by later spawns
+
+
+@dataclass(frozen=True)
+class PerfConfig:
+    hud: bool = False  # start with the performance overlay visible (toggle: F3)
+    log_path: str | None = None  # per-frame timings: .csv, or JSON lines otherwise
+    window: int = 240  # frames in the rolling percentiles
+    counter_interval: int = 15  # frames between body/contact counter samples (visits every body)
+    startup_report: bool = False  # print how long each startup phase took once startup is done
+
 
 @dataclass(frozen=True)
 class QualityConfig:
     shadows: bool = True
     shadow_map_size: int = 512  # default 1024, lower if on WSL/X11 or iGPU
+    instanced: bool = False  # draw all same-size cubes in one instanced batch (no shadows)
+    # adaptive quality: trade shadows, physics rate and rendering mode for a steady frame rate
+    adaptive: bool = False  # opt-in: it changes how a run looks, and with more substep_dts how it simulates
+    target_fps: float | None = None  # None: the display's refresh rate, 60 if the display doesn't say
+    shadow_map_sizes: tuple[int, ...] = (2048, 1024, 512, 256)  # allowed sizes, best first
+    substep_budgets: tuple[int, ...] = (5, 3, 2)  # catch-up steps per frame, best first
+    # fixed physics steps, best first; add 1.0 / 120.0 to let it halve the physics rate,
+    # which changes simulation results
+    substep_dts: tuple[float, ...] = (1.0 / 240.0,)
+    adaptive_instancing: bool = True  # may switch to instanced rendering as the last render step
+    fit_shadow_area: bool = True  # keep the sun's ortho lens around the bodies
+    static_batching: bool = True  # merge visuals of static and long-sleeping bodies per grid cell
+    batch_cell_size: float = 8.0  # m; a wake-up rebuilds only its own cell
+    batch_after_s: float = 3.0  # seconds asleep before a body is batched
+    floor_mode: str = "shader"  # "shader": one grid-shaded quad at any size; "lines": card plus line grid
+    floor_size: float = 200.0  # m, half extent of the visual floor
+    floor_step: float = 5.0  # m between grid lines
+
+
+@dataclass(frozen=True)
+class StreamConfig:
+    enabled: bool = False  # publish body transforms for other local processes (core.streaming)
+    name: str = "crashworld"  # shared-memory block clients attach to
+    capacity: int = 16384  # bodies per frame; larger frames are dropped
+    slots: int = 8  # frames kept for readers that lag behind
+    keyframe_interval: int = 8  # frames between full snapshots, at most `slots`
 
 
 QUALITY = QualityConfig
@@ -37,4 +98,9 @@ QUALITY = QualityConfig
 WINDOW = WindowConfig()
 CAMERA = CameraConfig()
 PHYSICS = PhysicsConfig()
+IMPULSE = ImpulseConfig()
+SPAWN = SpawnConfig()
+DESPAWN = DespawnConfig()
+PERF = PerfConfig()
+STREAM = StreamConfig()
 
@@ -0,0 +1,49 @@
+"""
+Spatial queries on top of Bullet's broadphase.
+
+A sphere ghost is moved to the query point and contact-tested against the
+world, so only bodies whose AABB overlaps the sphere are visited.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from panda3d.core import NodePath, LPoint3
+from panda3d.bullet import BulletWorld, BulletGhostNode, BulletSphereShape, BulletRigidBodyNode
+
+
+@dataclass
+class RadialQuery:
+    """
+    Finds the rigid bodies within a radius of a point.
+    """
+    bullet_world: BulletWorld
+
+    def __post_init__(self) -> None:
+        # one ghost per radius; shapes are cheap and radii are few
+        self._root = NodePath("spatial_query")
+        self._ghosts: dict[float, NodePath] = {}
+
+    def bodies_near(self, center: LPoint3, radius: float) -> list[BulletRigidBodyNode]:
+        """
+        Rigid bodies whose collision shape touches the sphere (center, radius).
+        """
+        ghost_np = self._ghost(radius)
+        ghost_np.setPos(center)
+        ghost = ghost_np.node()
+
+        found: dict[BulletRigidBodyNode, None] = {}
+        for contact in self.bullet_world.contactTest(ghost).getContacts():
+            node = contact.getNode1() if contact.getNode0() == ghost else contact.getNode0()
+            if isinstance(node, BulletRigidBodyNode):
+                found[node] = None
+        return list(found)
+
+    def _ghost(self, radius: float) -> NodePath:
+        ghost_np = self._ghosts.get(radius)
+        if ghost_np is None:
+            ghost = BulletGhostNode(f"query_r{radius:g}")
+            ghost.addShape(BulletSphereShape(radius))
+            ghost_np = self._root.attachNewNode(ghost)
+            self._ghosts[radius] = ghost_np
+        return ghost_np
@@ -0,0 +1,143 @@
+"""
+Incremental spawning: creates actors in batches under a per-frame time budget.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from direct.task import Task
+
+from core.scene_config import CubeSpec, GroupSpec, SceneSpec, iter_scene_batches, load_scene_config
+
+
+# yielded by a spec source that has nothing ready yet: the spawner tries again next frame
+PENDING = None
+_END = object()
+
+
+@dataclass
+class _Failed:
+    error: BaseException
+
+
+@dataclass
+class BackgroundSpecs:
+    """
+    Parses and validates a scene config on a worker thread, so the work overlaps with
+    opening the window and drawing the first frames (both release the GIL).
+
+    Iterating waits for each spec; `ready()` never waits and yields PENDING instead.
+    Errors, a missing file included, are raised by whoever consumes the specs.
+    """
+    path: str | Path
+    streamed: bool = True  # False: load_scene_config, the whole file validated before the first spec
+    batch_size: int = 4096
+    max_batches: int = 4  # parsed batches held ahead of the consumer
+
+    def __post_init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_batches)
+        self._thread = threading.Thread(target=self._run, name="scene_parse", daemon=True)
+        self._thread.start()
+
+    def __iter__(self) -> Iterator[SceneSpec]:
+        return self._items(block=True)
+
+    def ready(self) -> Iterator[SceneSpec | None]:
+        return self._items(block=False)
+
+    def _run(self) -> None:
+        try:
+            if self.streamed:
+                for item in iter_scene_batches(self.path, self.batch_size):
+                    self._queue.put(item)
+            else:
+                self._queue.put(load_scene_config(self.path))
+        except BaseException as e:
+            self._queue.put(_Failed(e))
+        else:
+            self._queue.put(_END)
+
+    def _items(self, block: bool) -> Iterator[SceneSpec | None]:
+        while True:
+            try:
+                item = self._queue.get(block)
+            except queue.Empty:
+                yield PENDING
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            if isinstance(item, GroupSpec):
+                yield item
+            elif isinstance(item, list):
+                yield from item
+            else:
+                yield from item.specs()
+
+
+@dataclass
+class SpawnStreamer:
+    """
+    Frame task that pulls specs and spawns them until the frame's budget is used up.
+    """
+    specs: Iterable[CubeSpec]
+    spawn_one: Callable[[CubeSpec], None]
+    total: int | None = None
+    budget_ms: float = 4.0
+    on_progress: Callable[[int, int | None], None] | None = None
+    on_done: Callable[[], None] | None = None
+
+    def __post_init__(self) -> None:
+        if self.total is None and hasattr(self.specs, "__len__"):
+            self.total = len(self.specs)  # type: ignore[arg-type]
+        self._it = iter(self.specs)
+        self.spawned = 0
+        self.done = False
+        self.load_time = 0.0
+
+    @property
+    def progress(self) -> float:
+        if self.done:
+            return 1.0
+        if not self.total:
+            return 0.0
+        return self.spawned / self.total
+
+    def step(self) -> bool:
+        """
+        Spawn one frame's worth of actors. Returns True once all specs are spawned.
+        """
+        if self.done:
+            return True
+
+        t0 = time.perf_counter()
+        deadline = t0 + self.budget_ms / 1000.0
+        spawn_one = self.spawn_one
+        count = 0
+        for spec in self._it:
+            if spec is PENDING:
+                break  # the source is still parsing
+            spawn_one(spec)
+            count += 1
+            # checking the clock every few actors keeps its overhead negligible
+            if count % 16 == 0 and time.perf_counter() >= deadline:
+                break
+        else:
+            self.done = True
+
+        self.spawned += count
+        self.load_time += time.perf_counter() - t0
+        if self.on_progress is not None:
+            self.on_progress(self.spawned, self.total)
+        if self.done and self.on_done is not None:
+            self.on_done()
+        return self.done
+
+    def task(self, task: Task) -> Task:
+        return Task.done if self.step() else Task.cont
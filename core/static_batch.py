@@ -0,0 +1,208 @@
+"""
+Static batching: visuals of bodies that don't move are merged into one flattened node per grid cell.
+
+Static bodies (mass 0) are batched right away, others once they have slept for a while.
+A batched body's own visual is stashed, and a copy of it, placed at the body's pose,
+lives in its cell. flattenStrong then merges the copies with the same render state (color),
+so a settled cell costs a handful of draw calls instead of one per cube. When a body
+wakes up it leaves its cell again and shows its own visual.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+from panda3d.core import NodePath
+from panda3d.bullet import BulletRigidBodyNode
+
+from core.world import ActorRecord, World
+
+
+@dataclass
+class _Member:
+    record: ActorRecord
+    static: bool
+    asleep_since: float | None = None
+    cell: "_Cell | None" = None
+    holder: NodePath | None = None  # this body's copy inside the cell's source tree
+    index: int = 0  # position in StaticBatcher._members
+
+
+@dataclass
+class _Cell:
+    key: tuple[int, int]
+    source: NodePath  # unflattened copies, never rendered
+    flat: NodePath | None = None  # the flattened copy under the batch root
+    count: int = 0
+    dirty: bool = False
+    urgent: bool = False  # a member left: its copy is still drawn next to its own visual
+    pending: list[_Member] = field(default_factory=list)  # joined; visuals stashed on rebuild
+
+
+@dataclass
+class StaticBatcher:
+    """
+    Call `update(now)` once per frame after physics. Bodies are visited round-robin,
+    `scan_budget` per frame, so the cost per frame stays flat in large scenes; a body
+    woken by a contact (rather than through World) may show its old pose for a few frames.
+
+    Cells that lost a member are rebuilt in the same frame. Cells that only gained members
+    can wait, since those still show their own visuals; `rebuild_budget` of them per frame.
+    Small cells keep a rebuild cheap (about 7 ms for 2000 cubes in 8 m cells vs 100 ms in 32 m).
+    """
+    render_np: NodePath
+    world: World
+    cell_size: float = 8.0
+    sleep_delay: float = 3.0  # seconds a body must sleep before it is batched
+    scan_budget: int = 4096  # bodies checked per frame
+    rebuild_budget: int = 2  # cells with new members flattened per frame
+
+    def __post_init__(self) -> None:
+        self._root = self.render_np.attachNewNode("static_batches")
+        self._cells: dict[tuple[int, int], _Cell] = {}
+        self._by_body: dict[BulletRigidBodyNode, _Member] = {}
+        self._members: list[_Member] = []
+        self._cursor = 0
+        self.rebuilds = 0
+
+        for record in self.world.records:
+            self._on_added(record)
+        self.world.on_actor_added.append(self._on_added)
+        self.world.on_actor_removed.append(self._on_removed)
+        self.world.on_wake.append(self._on_wake)
+
+    # public API
+    def update(self, now: float) -> None:
+        members = self._members
+        n = len(members)
+        if n:
+            budget = min(self.scan_budget, n)
+            cursor = self._cursor % n
+            for _ in range(budget):
+                self._check(members[cursor], now)
+                cursor += 1
+                if cursor == n:
+                    cursor = 0
+            self._cursor = cursor
+        spare = self.rebuild_budget
+        for cell in [c for c in self._cells.values() if c.dirty]:
+            if cell.urgent:
+                self._rebuild(cell)
+            elif spare > 0:
+                self._rebuild(cell)
+                spare -= 1
+
+    def clear(self) -> None:
+        """
+        Split everything out again, e.g. before visuals are swapped for instancing.
+        """
+        for member in self._members:
+            if member.cell is not None:
+                self._unbatch(member)
+            member.asleep_since = None
+        for cell in list(self._cells.values()):
+            self._rebuild(cell)
+
+    @property
+    def batched(self) -> int:
+        return sum(c.count for c in self._cells.values())
+
+    @property
+    def draw_nodes(self) -> int:
+        return sum(1 for c in self._cells.values() if c.flat is not None)
+
+    # world callbacks
+    def _on_added(self, record: ActorRecord) -> None:
+        body = record.np.node()
+        member = _Member(record=record, static=body.getMass() <= 0.0, index=len(self._members))
+        self._by_body[body] = member
+        self._members.append(member)
+
+    def _on_removed(self, record: ActorRecord) -> None:
+        member = self._by_body.pop(record.np.node(), None)
+        if member is None:
+            return
+        if member.cell is not None:
+            self._unbatch(member)  # also unstashes the visual, for bodies that go back to the pool
+        # swap-remove
+        last = self._members.pop()
+        if last is not member:
+            self._members[member.index] = last
+            last.index = member.index
+
+    def _on_wake(self, body: BulletRigidBodyNode) -> None:
+        member = self._by_body.get(body)
+        if member is None:
+            return
+        member.asleep_since = None
+        if member.cell is not None:
+            self._unbatch(member)  # the cell is rebuilt in the next update, before rendering
+
+    # internals
+    def _check(self, member: _Member, now: float) -> None:
+        record = member.record
+        if member.cell is not None:
+            if not member.static and record.np.node().isActive():
+                self._unbatch(member)
+            return
+        if not record.visual:
+            return  # instanced bodies have no visual of their own
+        if member.static:
+            self._batch(member)
+            return
+        if record.np.node().isActive():
+            member.asleep_since = None
+        elif member.asleep_since is None:
+            member.asleep_since = now
+        elif now - member.asleep_since >= self.sleep_delay:
+            self._batch(member)
+
+    def _key(self, np: NodePath) -> tuple[int, int]:
+        pos = np.getPos(self.render_np)
+        return (math.floor(pos.x / self.cell_size), math.floor(pos.y / self.cell_size))
+
+    def _batch(self, member: _Member) -> None:
+        np = member.record.np
+        key = self._key(np)
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = _Cell(key=key, source=NodePath(f"batch_src_{key[0]}_{key[1]}"))
+        holder = cell.source.attachNewNode("member")
+        holder.setMat(np.getMat(self.render_np))
+        for child in np.getChildren():
+            child.instanceTo(holder)  # shared here; the rebuild copies and flattens them
+        cell.pending.append(member)
+        member.cell = cell
+        member.holder = holder
+        cell.count += 1
+        cell.dirty = True
+
+    def _unbatch(self, member: _Member) -> None:
+        cell = member.cell
+        member.holder.removeNode()
+        member.record.np.unstashAll()
+        member.cell = None
+        member.holder = None
+        member.asleep_since = None
+        cell.count -= 1
+        cell.dirty = True
+        cell.urgent = True
+
+    def _rebuild(self, cell: _Cell) -> None:
+        if cell.flat is not None:
+            cell.flat.removeNode()
+            cell.flat = None
+        cell.dirty = False
+        cell.urgent = False
+        pending, cell.pending = cell.pending, []
+        if cell.count == 0:
+            del self._cells[cell.key]
+            return
+        flat = cell.source.copyTo(self._root)
+        flat.flattenStrong()
+        cell.flat = flat
+        self.rebuilds += 1
+        # the new members are drawn by the cell from now on
+        for member in pending:
+            if member.cell is cell:
+                member.record.np.getChildren().stash()
@@ -0,0 +1,311 @@
+"""
+Transform streaming: a running World publishes body poses to a shared-memory ring
+that other local processes (dashboards, loggers, a second viewer) read in place.
+
+The block is named (see multiprocessing.shared_memory), little-endian, and laid out as
+
+    header     magic "CWTS", u16 format version, u16 state (1 running, 2 closed),
+               u32 slot count, u32 capacity (rows per slot), u32 slot size,
+               u32 keyframe interval, u64 head (last complete frame, 0: none), padded to 64 bytes
+    key slot   a copy of the latest keyframe
+    ring       slot count slots; frame f lives in slot f % slot count
+
+and every slot is
+
+    u64 seq (frame number, 0 while it is written), u32 flags (bit 0: keyframe),
+    u32 body count, f64 sim time, u64 fixed steps, u32 rows, u32 removed, padded to 64 bytes,
+    then capacity x u32 body ids, capacity x 3 f32 pos, capacity x 4 f32 quat (r, i, j, k),
+    capacity x u32 removed body ids
+
+A keyframe holds every body. Other frames are deltas: bodies that are awake, that
+just fell asleep (their last pose) or that just spawned, plus the ids of bodies
+that are gone. A settled scene publishes nothing at all.
+
+The publisher never waits for anyone. A reader that falls more than a ring behind
+has missed frames; it picks up again from the key slot, which is rewritten every
+`keyframe_interval` frames, so the ring always still holds the deltas after it.
+A frame with more rows than fit in a slot is dropped, and the next one is a keyframe.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+
+from panda3d.bullet import BulletRigidBodyNode
+
+from core.body_state import export_state
+from core.world import ActorRecord, World
+
+
+MAGIC = b"CWTS"
+FORMAT_VERSION = 1
+
+RUNNING = 1
+CLOSED = 2
+
+KEYFRAME = 1
+
+_HEADER = struct.Struct("<4sHHIIIIQ")
+_HEADER_SIZE = 64
+_HEAD = struct.Struct("<Q")
+_HEAD_OFF = _HEADER.size - _HEAD.size
+_SLOT = struct.Struct("<QIIdQII")
+_SLOT_SIZE = 64
+_SEQ = struct.Struct("<Q")
+
+
+def _slot_size(capacity: int) -> int:
+    return _SLOT_SIZE + 36 * capacity
+
+
+@dataclass
+class TransformPublisher:
+    """
+    Hooks into a World and publishes body transforms after every physics call that steps.
+    `close()` removes the shared-memory block again.
+    """
+    world: World
+    name: str = "crashworld"
+    capacity: int = 16384  # rows per frame
+    slots: int = 8
+    keyframe_interval: int = 8  # at most `slots`, or a late reader could not catch up
+    dropped: int = 0  # frames that did not fit into a slot
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.keyframe_interval <= self.slots:
+            raise ValueError(f"keyframe_interval must be between 1 and slots ({self.slots}), got {self.keyframe_interval}")
+        self._slot_size = _slot_size(self.capacity)
+        self._shm = shared_memory.SharedMemory(
+            name=self.name, create=True, size=_HEADER_SIZE + (self.slots + 1) * self._slot_size
+        )
+        _HEADER.pack_into(
+            self._shm.buf, 0, MAGIC, FORMAT_VERSION, RUNNING,
+            self.slots, self.capacity, self._slot_size, self.keyframe_interval, 0,
+        )
+        self._ids: dict[BulletRigidBodyNode, int] = {}
+        self._next_id = 0
+        self._moving: list[BulletRigidBodyNode] = []  # awake at the last frame
+        self._spawned: list[BulletRigidBodyNode] = []
+        self._removed = array("I")
+        self._frame = 0
+        self._key_due = True
+        self.frames = 0  # frames published
+
+        for record in self.world.records:
+            self._on_added(record)
+        self.world.on_actor_added.append(self._on_added)
+        self.world.on_actor_removed.append(self._on_removed)
+        self.world.on_step.append(self._on_step)
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self.world.on_actor_added.remove(self._on_added)
+        self.world.on_actor_removed.remove(self._on_removed)
+        self.world.on_step.remove(self._on_step)
+        _HEADER.pack_into(
+            self._shm.buf, 0, MAGIC, FORMAT_VERSION, CLOSED,
+            self.slots, self.capacity, self._slot_size, self.keyframe_interval, self._frame,
+        )
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    # world callbacks
+    def _on_added(self, record: ActorRecord) -> None:
+        body = record.np.node()
+        self._ids[body] = self._next_id
+        self._next_id += 1
+        self._spawned.append(body)
+
+    def _on_removed(self, record: ActorRecord) -> None:
+        body_id = self._ids.pop(record.np.node(), None)
+        if body_id is not None:
+            self._removed.append(body_id)
+
+    def _on_step(self, steps: int) -> None:
+        ids = self._ids
+        key = self._key_due or (self._frame + 1) % self.keyframe_interval == 0
+        if key:
+            bodies = list(ids)
+            self._moving = [body for body in bodies if body.isActive()]
+        else:
+            moving = [body for body in ids if body.isActive()]
+            # the previous movers that stopped still owe their resting pose, new bodies their first;
+            # a dict keeps the order and drops pooled bodies that are both
+            rows = dict.fromkeys(moving)
+            rows.update(dict.fromkeys(body for body in self._moving if body in ids))
+            rows.update(dict.fromkeys(body for body in self._spawned if body in ids))
+            bodies = list(rows)
+            self._moving = moving
+        self._spawned.clear()
+        removed, self._removed = self._removed, array("I")
+        if len(bodies) > self.capacity or len(removed) > self.capacity:
+            self.dropped += 1
+            self._key_due = True
+            return
+        self._key_due = False
+        self._write(bodies, array("I", [ids[body] for body in bodies]), array("I") if key else removed, key)
+
+    # internals
+    def _write(self, bodies: list[BulletRigidBodyNode], body_ids: array, removed: array, key: bool) -> None:
+        self._frame += 1
+        frame = self._frame
+        buf = self._shm.buf
+        cap = self.capacity
+        off = _HEADER_SIZE + (1 + (frame % self.slots)) * self._slot_size
+        n = len(bodies)
+        stats = self.world.step_stats
+
+        _SLOT.pack_into(buf, off, 0, KEYFRAME if key else 0, len(self._ids), stats.sim_time, stats.steps, n, len(removed))
+        cols = off + _SLOT_SIZE
+        buf[cols:cols + 4 * n] = body_ids.tobytes()
+        with buf[cols + 4 * cap:cols + 16 * cap].cast("f") as pos, buf[cols + 16 * cap:cols + 32 * cap].cast("f") as quat:
+            export_state(bodies, n, pos=pos, quat=quat)
+        buf[cols + 32 * cap:cols + 32 * cap + 4 * len(removed)] = removed.tobytes()
+        _SEQ.pack_into(buf, off, frame)
+
+        if key:
+            key_off = _HEADER_SIZE
+            _SEQ.pack_into(buf, key_off, 0)
+            for start, size in ((_SEQ.size, _SLOT_SIZE - _SEQ.size), (_SLOT_SIZE, 4 * n),
+                                (_SLOT_SIZE + 4 * cap, 12 * n), (_SLOT_SIZE + 16 * cap, 16 * n)):
+                buf[key_off + start:key_off + start + size] = buf[off + start:off + start + size]
+            _SEQ.pack_into(buf, key_off, frame)
+        _HEAD.pack_into(buf, _HEAD_OFF, frame)
+        self.frames += 1
+
+
+@dataclass
+class StreamFrame:
+    """
+    One published frame. The columns are views into shared memory, not copies: the
+    publisher reuses the slot `slots` frames later, so read them promptly, then check
+    `valid()` (or copy them with bytes()/array() first when they must be kept).
+    """
+    frame: int
+    keyframe: bool
+    bodies: int  # bodies in the World at this frame
+    sim_time: float
+    steps: int
+    ids: memoryview  # u32, one per row
+    pos: memoryview  # f32, 3 per row
+    quat: memoryview  # f32, 4 per row
+    removed: memoryview  # u32 ids of bodies gone since the previous frame
+    _buf: memoryview = field(repr=False, default=None)
+    _off: int = field(repr=False, default=0)
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    def valid(self) -> bool:
+        """
+        False once the publisher started to overwrite this frame's slot.
+        """
+        return _SEQ.unpack_from(self._buf, self._off)[0] == self.frame
+
+    def release(self) -> None:
+        for view in (self.ids, self.pos, self.quat, self.removed):
+            view.release()
+
+
+class TransformClient:
+    """
+    Reads a TransformPublisher's ring from another process.
+
+        client = TransformClient("crashworld")
+        while not client.closed:
+            for frame in client.poll():
+                ...  # frame.ids / pos / quat / removed
+                frame.release()
+
+    `poll()` returns the frames published since the last call, oldest first. When the
+    reader fell behind and the ring moved on, it starts over from the latest keyframe
+    (`missed` counts the frames skipped that way).
+    """
+
+    def __init__(self, name: str = "crashworld") -> None:
+        # the block belongs to the publisher: this process' resource tracker must not unlink it on exit
+        if sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._buf = self._shm.buf
+        magic, version, _, self.slots, self.capacity, self._slot_size, self.keyframe_interval, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            self._close_shm()
+            raise ValueError(f"Not a CrashWorld transform stream: {name}")
+        if version != FORMAT_VERSION:
+            self._close_shm()
+            raise ValueError(f"Unsupported transform stream version {version}: {name}")
+        self._next = 0  # next frame wanted; 0 until synced to a keyframe
+        self.missed = 0
+
+    @property
+    def closed(self) -> bool:
+        return _HEADER.unpack_from(self._buf, 0)[2] == CLOSED
+
+    @property
+    def head(self) -> int:
+        return _HEAD.unpack_from(self._buf, _HEAD_OFF)[0]
+
+    def poll(self) -> list[StreamFrame]:
+        head = self.head
+        if head == 0 or head < self._next:
+            return []
+        frames: list[StreamFrame] = []
+        if self._next == 0 or head - self._next >= self.slots:
+            key = self._read(_HEADER_SIZE)
+            if key is None:
+                return []  # the key slot is being rewritten; next time
+            if self._next:
+                self.missed += key.frame - self._next
+            frames.append(key)
+            self._next = key.frame + 1
+        while self._next <= head:
+            frame = self._read(_HEADER_SIZE + (1 + self._next % self.slots) * self._slot_size)
+            if frame is None or frame.frame != self._next:
+                break  # overwritten under us; the next poll resyncs from the key slot
+            frames.append(frame)
+            self._next += 1
+        return frames
+
+    def close(self) -> None:
+        """
+        Release every StreamFrame first: shared memory can't be unmapped while views of it exist.
+        """
+        self._buf = None
+        self._close_shm()
+
+    def _close_shm(self) -> None:
+        self._shm.close()
+
+    def _read(self, off: int) -> StreamFrame | None:
+        buf = self._buf
+        seq, flags, bodies, sim_time, steps, n, n_removed = _SLOT.unpack_from(buf, off)
+        if seq == 0 or n > self.capacity or n_removed > self.capacity:
+            return None
+        cap = self.capacity
+        cols = off + _SLOT_SIZE
+        frame = StreamFrame(
+            frame=seq,
+            keyframe=bool(flags & KEYFRAME),
+            bodies=bodies,
+            sim_time=sim_time,
+            steps=steps,
+            ids=buf[cols:cols + 4 * n].cast("I"),
+            pos=buf[cols + 4 * cap:cols + 4 * cap + 12 * n].cast("f"),
+            quat=buf[cols + 16 * cap:cols + 16 * cap + 16 * n].cast("f"),
+            removed=buf[cols + 32 * cap:cols + 32 * cap + 4 * n_removed].cast("I"),
+            _buf=buf,
+            _off=off,
+        )
+        if not frame.valid():
+            frame.release()
+            return None
+        return frame
@@ -3,11 +3,22 @@ World and physics orchestration.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Protocol
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
 
-from panda3d.core import NodePath, LVector3
-from panda3d.bullet import BulletWorld, BulletRigidBodyNode
+from panda3d.core import NodePath, LVector3, LPoint3, LQuaternion
+from panda3d.bullet import BulletWorld, BulletRigidBodyNode, BulletBoxShape
+
+from core.body_state import BodyState, apply_rows, export_state, import_state
+from core.checkpoint import AWAKE, BodyColumns, read_checkpoint, save_checkpoint
+from core.spatial import RadialQuery
+from core.scene_config import CubeSpec, GroupSpec, SceneSpec, SleepSpec
+from objects.primitives import BoxActor, CompoundActor, actor_for_spec
+
+
+# what Bullet uses for a body nobody configured
+BULLET_SLEEP = SleepSpec(linear=0.8, angular=1.0, enabled=True)
 
 
 class Actor(Protocol):
@@ -19,6 +30,87 @@ class Actor(Protocol):
     def attach_visual(self, parent: NodePath) -> None: ...
 
 
+@dataclass
+class ActorRecord:
+    """
+    Registry entry for an attached actor.
+    """
+    np: NodePath
+    actor: Actor
+    spec: SceneSpec | None = None
+    visual: bool = True
+    born: float = 0.0  # sim time of the spawn
+
+
+@dataclass
+class DespawnPolicy:
+    """
+    When World removes actors on its own. Unset limits are not enforced.
+    """
+    max_actors: int | None = None  # oldest actors go first once the count is exceeded
+    lifetime: float | None = None  # seconds of sim time an actor may live
+    kill_z: float | None = -50.0  # below the ground plane: fell through or out of the world
+    bounds_radius: float | None = None  # horizontal distance from the origin
+    check_interval: int = 60  # fixed steps between position checks (they visit every body)
+
+
+@dataclass
+class ActorPool:
+    """
+    Despawned single-cube bodies parked for reuse, so spawning in long sessions
+    resets a body in place instead of building a new body, shape and visual.
+
+    Bodies are keyed by what is baked into them: box size, and color when they carry a visual.
+    """
+    max_free: int = 512  # parked bodies in total; beyond that despawned bodies are destroyed
+
+    def __post_init__(self) -> None:
+        self._free: dict[tuple, list[NodePath]] = {}
+        self.parked = 0
+        self.reused = 0
+
+    @staticmethod
+    def key(actor: Actor, visual: bool) -> tuple | None:
+        if type(actor) is not BoxActor:
+            return None  # groups are rare and may break apart; they are rebuilt
+        return (actor.size, actor.color if visual else None, visual)
+
+    def take(self, key: tuple) -> NodePath | None:
+        free = self._free.get(key)
+        if not free:
+            return None
+        self.parked -= 1
+        self.reused += 1
+        return free.pop()
+
+    def clear(self) -> None:
+        for free in self._free.values():
+            for np in free:
+                np.removeNode()
+        self._free.clear()
+        self.parked = 0
+
+    def put(self, key: tuple, np: NodePath) -> bool:
+        if self.parked >= self.max_free:
+            return False
+        self._free.setdefault(key, []).append(np)
+        self.parked += 1
+        return True
+
+
+@dataclass
+class StepStats:
+    """
+    Counters for the fixed-step scheduler.
+    """
+    frames: int = 0
+    steps: int = 0  # fixed steps simulated
+    caught_up: int = 0  # extra steps run in one frame to catch up after a slow frame
+    dropped: int = 0  # steps discarded because they exceeded the catch-up budget
+    idle: int = 0  # steps skipped because every body was asleep
+    sim_time: float = 0.0
+
+
 @dataclass
 class World:
     """
@@ -26,6 +118,17 @@ class World:
     """
     scene_root: NodePath
     gravity: LVector3
+    sleep: SleepSpec | None = None  # scene-wide sleep defaults; specs may override them per actor
+    idle_skip: bool = True  # skip the solver (and Bullet's transform sync) while every body sleeps
+    despawn_policy: DespawnPolicy | None = None  # checked after every step_physics call
+    pool: ActorPool | None = None  # recycle despawned cubes
+    # called with the ActorRecord whenever an actor enters or leaves the world
+    on_actor_added: list[Callable[[ActorRecord], None]] = field(default_factory=list)
+    on_actor_removed: list[Callable[[ActorRecord], None]] = field(default_factory=list)
+    # called with the body whenever World wakes it (spawn, wake, impulse); not for contact wake-ups
+    on_wake: list[Callable[[BulletRigidBodyNode], None]] = field(default_factory=list)
+    # called after every step_physics call that ran the solver, with the number of fixed steps
+    on_step: list[Callable[[int], None]] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         self._world = BulletWorld()
@@ -41,16 +144,571 @@ class World:
         self._ground_np = self.scene_root.attachNewNode(ground)
         self._world.attachRigidBody(ground)
 
-    def attach_actor(self, actor: Actor) -> NodePath:
+        self._radial = RadialQuery(self._world)
+
+        # body node -> record; Panda nodes hash by pointer, so lookups are O(1)
+        self._registry: dict[BulletRigidBodyNode, ActorRecord] = {}
+
+        # bodies that may be awake; everything else is known to sleep (see all_asleep)
+        self._awake: set[BulletRigidBodyNode] = set()
+        self._settled = False
+        self.idle = False  # the last step_physics call was skipped
+
+        # (body, record) in spawn order, for max_actors and lifetime; stale entries are skipped
+        self._spawn_order: deque[tuple[BulletRigidBodyNode, ActorRecord]] = deque()
+        self._steps_to_bounds_check = 0
+
+        # fixed-step scheduler state
+        self._accumulator = 0.0
+        self._substep_dt = 0.0
+        self.step_stats = StepStats()
+
+    def attach_actor(
+        self,
+        actor: Actor,
+        visual: bool = True,
+        spec: SceneSpec | None = None,
+        pos: LPoint3 | None = None,
+        quat: LQuaternion | None = None,
+    ) -> NodePath:
+        """
+        Attach an actor's rigid body at pos/quat; skip its visual when running headless.
+        """
         node = actor.make_node()
+        self._apply_sleep(node, spec.sleep if spec is not None else None)
         np = self.scene_root.attachNewNode(node)
+        # posed before Bullet sees it: bodies added at the origin and moved afterwards
+        # all overlap in the broadphase until the next step, which makes attaching quadratic
+        self._pose(np, pos, quat)
         self._world.attachRigidBody(node)
-        actor.attach_visual(np)
+        if visual:
+            actor.attach_visual(np)
+        self._register(np, actor, spec, visual)
         return np
 
-    def step_physics(self, dt: float, max_substeps: int, substep_dt: float) -> None:
+    def spawn(
+        self, spec: SceneSpec, visual: bool = True, quat: LQuaternion | None = None, pos: LPoint3 | None = None
+    ) -> NodePath:
+        """
+        Build the actor for a scene spec (single cube or rigid group) and place it,
+        optionally turned by quat. Takes a parked body from the pool when one fits.
+        pos, when given, is the body's own position and replaces spec.pos.
+        """
+        actor = actor_for_spec(spec)
+        if pos is None:
+            pos = LPoint3(*spec.pos)
+            if isinstance(actor, CompoundActor):
+                pos += actor.center  # the body origin is the group's center of mass
+        np = self._reuse(actor, spec, visual, pos, quat) if self.pool is not None else None
+        if np is None:
+            np = self.attach_actor(actor, visual=visual, spec=spec, pos=pos, quat=quat)
+        np.setName(spec.name)
+        return np
+
+    def detach_actor(self, np: NodePath) -> None:
+        node = np.node()
+        record = self._registry.pop(node, None)
+        self._awake.discard(node)
+        self._world.removeRigidBody(node)
+        if record is not None:
+            for cb in self.on_actor_removed:
+                cb(record)
+        np.removeNode()
+
+    def despawn(self, np: NodePath) -> None:
+        """
+        Remove an actor; single cubes are parked in the pool (if any) instead of destroyed.
+        """
+        node = np.node()
+        record = self._registry.get(node)
+        key = ActorPool.key(record.actor, record.visual) if record is not None and self.pool is not None else None
+        if key is None or not self.pool.put(key, np):
+            self.detach_actor(np)
+            return
+        del self._registry[node]
+        self._awake.discard(node)
+        self._world.removeRigidBody(node)
+        for cb in self.on_actor_removed:
+            cb(record)
+        np.detachNode()
+
+    def break_apart(self, np: NodePath) -> list[NodePath]:
+        """
+        Replace a rigid group by one body per cube, keeping each cube's pose and velocity.
+        """
+        record = self._registry[np.node()]
+        actor = record.actor
+        group = record.spec
+        body = np.node()
+        mat = np.getMat()
+        quat = np.getQuat()
+        origin = np.getPos()
+        lin = body.getLinearVelocity()
+        ang = body.getAngularVelocity()
+        self.detach_actor(np)
+
+        pieces = []
+        for cube in actor.cubes:
+            pos = mat.xformPoint(actor.local_pos(cube))
+            spec = CubeSpec(
+                name=f"{group.name}/{cube.name}" if group is not None else cube.name,
+                size=cube.size,
+                mass=cube.mass,
+                color=cube.color,
+                pos=(pos.x, pos.y, pos.z),
+                sleep=cube.sleep,
+            )
+            piece_np = self.spawn(spec, visual=record.visual, quat=quat)
+            piece = piece_np.node()
+            piece.setLinearVelocity(lin + ang.cross(pos - origin))
+            piece.setAngularVelocity(ang)
+            pieces.append(piece_np)
+        return pieces
+
+    def lookup(self, node: BulletRigidBodyNode) -> ActorRecord | None:
+        return self._registry.get(node)
+
+    def set_sleep(self, np: NodePath, sleep: SleepSpec | None) -> None:
+        """
+        Change an actor's sleep thresholds at runtime; None restores the scene defaults.
+        """
+        self._apply_sleep(np.node(), sleep, reset=True)
+        self.wake(np)
+
+    def wake(self, np: NodePath) -> None:
+        node = np.node()
+        node.setActive(True)
+        self._mark_awake(node)
+
+    @property
+    def all_asleep(self) -> bool:
+        """
+        True when no actor body is awake. Cheap in both states: a busy scene stops at the
+        first awake body, a settled one answers from a flag.
+
+        Bodies are only tracked as awake after a spawn, wake or impulse (through this class).
+        Others woken by contacts are caught by one full scan before the scene counts as settled.
+        Static (mass 0) bodies are never tracked: Bullet reports them active forever.
+        """
+        if self._settled:
+            return True
+        awake = self._awake
+        while awake:
+            body = next(iter(awake))
+            if body.isActive():
+                return False
+            awake.discard(body)
+        # the tracked set went quiet; make sure no body was woken behind our back
+        awake.update(body for body in self._registry if body.isActive() and body.getMass() > 0.0)
+        self._settled = not awake
+        return self._settled
+
+    def pick(self, ray_from: LPoint3, ray_to: LPoint3) -> tuple[ActorRecord | None, LPoint3 | None]:
+        """
+        Closest ray hit as (record, hit position); record is None for non-actors like the ground.
+        """
+        result = self._world.rayTestClosest(ray_from, ray_to)
+        if not result.hasHit():
+            return None, None
+        return self._registry.get(result.getNode()), result.getHitPos()
+
+    @property
+    def actor_count(self) -> int:
+        return len(self._registry)
+
+    @property
+    def records(self) -> list[ActorRecord]:
+        return list(self._registry.values())
+
+    def export_state(self, pos=None, quat=None, lin_vel=None, ang_vel=None) -> int:
+        """
+        Fill preallocated float buffers with every actor body's state, one row per body
+        in `records` order (see core.body_state for the layout). Returns the body count.
+        """
+        return export_state(self._registry, len(self._registry), pos, quat, lin_vel, ang_vel)
+
+    def snapshot(self, state: BodyState | None = None) -> BodyState:
+        """
+        Export everything into a reusable BodyState, growing its buffers when needed.
+        """
+        if state is None:
+            state = BodyState()
+        n = len(self._registry)
+        state.reserve(n)
+        state.count = self.export_state(state.pos, state.quat, state.lin_vel, state.ang_vel)
+        return state
+
+    def apply_impulses(self, impulses, indices=None) -> int:
+        """
+        Central impulses from a flat buffer of 3 floats per row, rows in `records` order
+        (or matching `indices`). Zero rows are skipped and leave sleeping bodies asleep.
+        Returns the number of bodies pushed.
+        """
+        return self._apply_rows(impulses, indices, "applyCentralImpulse")
+
+    def apply_forces(self, forces, indices=None) -> int:
+        """
+        Like apply_impulses, but central forces; Bullet clears them after the next step_physics call.
+        """
+        return self._apply_rows(forces, indices, "applyCentralForce")
+
+    def save_checkpoint(self, path) -> int:
+        """
+        Write every actor with its motion and sleep state, plus the sim clock (see core.checkpoint).
+        Returns the number of bodies written.
+        """
+        return save_checkpoint(self, path)
+
+    def load_checkpoint(self, path, visual: bool = True) -> int:
+        """
+        Replace all actors by those of a checkpoint and continue from its clock.
+        Returns the number of bodies restored.
+
+        Cubes are built in batches per palette entry from the checkpoint's columns: box
+        shapes are shared per size, visual nodes per size and color, and poses and velocities
+        are set in one pass (core.body_state.import_state). Bodies that were asleep stay
+        asleep, so a settled scene is idle from the start.
+        Contact caches are not saved: a pile that was still moving resumes close to,
+        but not bit-for-bit like, the run that wrote the checkpoint.
+        """
+        cp = read_checkpoint(path)
+        for record in self.records:
+            self.detach_actor(record.np)
+        self._accumulator = 0.0
+        self.step_stats = StepStats(sim_time=cp.sim_time, steps=cp.steps)
+
+        # cubes are built per palette entry: one configured body (box shape shared per size,
+        # mass, sleep settings) is copied for each cube, and they all share one actor and one
+        # visual per size and color; bodies still join the world in checkpoint order
+        cols = cp.cubes
+        n = cols.count
+        names = cp.names
+        pos = cols.pos.tolist()
+        nodes: list[BulletRigidBodyNode] = [None] * n
+        actors: list[Actor] = [None] * n
+        specs: list[SceneSpec] = [None] * n
+        shared: list[NodePath | None] = [None] * n
+        batches: dict[int, list[int]] = {}
+        for i, k in enumerate(cp.indices):
+            batches.setdefault(k, []).append(i)
+        shapes: dict[float, BulletBoxShape] = {}
+        for k, members in batches.items():
+            size, mass, color, sleep = cp.palette[k]
+            shape = shapes.get(size)
+            if shape is None:
+                h = size * 0.5
+                shape = shapes[size] = BulletBoxShape(LVector3(h, h, h))
+            proto = BulletRigidBodyNode("box")
+            proto.addShape(shape)
+            proto.setMass(mass)
+            self._apply_sleep(proto, sleep)
+            actor = BoxActor(size=size, mass=mass, color=color)
+            template = actor.shared_visual() if visual else None
+            for i in members:
+                name = names[i] if names is not None else f"cube_{i}"
+                node = proto.makeCopy()
+                node.setName(name)
+                nodes[i] = node
+                actors[i] = actor
+                specs[i] = CubeSpec(name=name, size=size, mass=mass, color=color, pos=tuple(pos[3 * i:3 * i + 3]), sleep=sleep)
+                shared[i] = template
+        self._restore(nodes, actors, specs, cols, visual, shared)
+
+        group_nodes = []
+        group_actors = []
+        for spec in cp.groups:
+            actor = CompoundActor(cubes=spec.cubes)
+            node = actor.make_node()
+            node.setName(spec.name)
+            self._apply_sleep(node, spec.sleep)
+            group_nodes.append(node)
+            group_actors.append(actor)
+        self._restore(group_nodes, group_actors, cp.groups, cp.group_bodies, visual)
+        return n + len(cp.groups)
+
+    def physics_counters(self) -> dict[str, int]:
+        """
+        Active/sleeping actor bodies and contact manifolds. Visits every body, so sample it sparsely.
+
+        Bullet creates a manifold for each broadphase pair that reaches the narrowphase;
+        `touching` counts the manifolds that currently hold contact points.
+        Static bodies are neither: Bullet keeps them active although they never move.
+        """
+        static = active = 0
+        for body in self._registry:
+            if body.getMass() <= 0.0:
+                static += 1
+            elif body.isActive():
+                active += 1
+        manifolds = self._world.getManifolds()
+        return {
+            "bodies": len(self._registry),
+            "static": static,
+            "active": active,
+            "sleeping": len(self._registry) - static - active,
+            "manifolds": len(manifolds),
+            "touching": sum(1 for m in manifolds if m.getNumManifoldPoints() > 0),
+        }
+
+    def step_physics(self, dt: float, max_substeps: int, substep_dt: float) -> int:
+        """
+        Advance by whole fixed steps of substep_dt; the remainder carries over to the next frame.
+
+        At most max_substeps steps run per call (the catch-up budget). Time beyond that
+        is dropped and counted, so a hitch never snowballs into ever longer frames.
+        Bullet keeps a matching accumulator and interpolates the synced transforms
+        between the last two physics states, so motion stays smooth at any frame rate.
+        Returns the number of fixed steps taken.
+        """
+        acc = self._accumulator + dt
+        steps = int(acc / substep_dt)
+        if steps > max_substeps:
+            dropped = steps - max_substeps
+            acc -= dropped * substep_dt
+            dt -= dropped * substep_dt
+            steps = max_substeps
+            self.step_stats.dropped += dropped
+        stats = self.step_stats
+        self.idle = self.idle_skip and self.all_asleep
+        if self.idle:
+            # nothing moves: skip the solver and Bullet's per-body sync, only the clock runs on.
+            # The accumulator stays put, it has to match the one Bullet keeps internally.
+            stats.frames += 1
+            stats.idle += steps
+            stats.sim_time += steps * substep_dt
+            if self.despawn_policy is not None:
+                self._enforce_despawn(0)  # nothing moves, but lifetimes still run out
+            return 0
+
+        self._accumulator = acc - steps * substep_dt
+        self._substep_dt = substep_dt
+
         self._world.doPhysics(dt, max_substeps, substep_dt)
 
+        stats.frames += 1
+        stats.steps += steps
+        stats.caught_up += max(0, steps - 1)
+        stats.sim_time += steps * substep_dt
+        for cb in self.on_step:
+            cb(steps)
+        if self.despawn_policy is not None:
+            self._enforce_despawn(steps)
+        return steps
+
+    @property
+    def interpolation_alpha(self) -> float:
+        """
+        Fraction of a fixed step carried over, i.e. how far visuals lie between the last two states.
+        """
+        if self._substep_dt <= 0.0:
+            return 0.0
+        return self._accumulator / self._substep_dt
+
+    def bodies_in_radius(self, center: LPoint3, radius: float) -> list[BulletRigidBodyNode]:
+        return self._radial.bodies_near(center, radius)
+
+    def apply_radial_impulse(self, center: LPoint3, radius: float, strength: float) -> int:
+        """
+        Push dynamic bodies away from center with linear falloff. Returns the number pushed.
+
+        Rigid groups are hit at their cube closest to the center, which also spins them.
+        A breakable group hit at least as hard as its break_impulse falls apart first,
+        and its cubes are pushed one by one.
+        """
+        pushed = 0
+        registry = self._registry
+        for body in self._radial.bodies_near(center, radius):
+            record = registry.get(body)
+            if record is None or body.getMass() <= 0.0:
+                continue  # static objects stay fixed
+
+            if isinstance(record.actor, CompoundActor):
+                pushed += self._push_group(record, center, radius, strength)
+                continue
+
+            delta = body.getTransform().getPos() - center
+            dist = delta.length()
+            if dist <= 0.001 or dist > radius:
+                continue
+
+            falloff = 1.0 - (dist / radius)
+            body.setActive(True)  # sleeping bodies ignore impulses otherwise
+            self._mark_awake(body)
+            body.applyCentralImpulse(delta * (strength * falloff / dist))
+            pushed += 1
+        return pushed
+
+    def _push_group(self, record: ActorRecord, center: LPoint3, radius: float, strength: float) -> int:
+        actor = record.actor
+        mat = record.np.getMat()
+        hit = min((mat.xformPoint(actor.local_pos(c)) for c in actor.cubes), key=lambda p: (p - center).length())
+        delta = hit - center
+        dist = delta.length()
+        if dist <= 0.001 or dist > radius:
+            return 0
+
+        impulse = strength * (1.0 - dist / radius)
+        group = record.spec
+        if isinstance(group, GroupSpec) and group.breakable and impulse >= group.break_impulse:
+            pushed = 0
+            for piece_np in self.break_apart(record.np):
+                piece_delta = piece_np.getPos() - center
+                piece_dist = piece_delta.length()
+                if 0.001 < piece_dist <= radius:
+                    piece_np.node().applyCentralImpulse(
+                        piece_delta * (strength * (1.0 - piece_dist / radius) / piece_dist)
+                    )
+                    pushed += 1
+            return pushed
+
+        body = record.np.node()
+        body.setActive(True)
+        self._mark_awake(body)
+        body.applyImpulse(delta * (impulse / dist), hit - record.np.getPos())
+        return 1
+
+    def _register(
+        self, np: NodePath, actor: Actor, spec: SceneSpec | None, visual: bool, awake: bool = True
+    ) -> ActorRecord:
+        node = np.node()
+        if awake:
+            self._mark_awake(node)
+        record = ActorRecord(np=np, actor=actor, spec=spec, visual=visual, born=self.step_stats.sim_time)
+        self._registry[node] = record
+        policy = self.despawn_policy
+        if policy is not None and (policy.max_actors is not None or policy.lifetime is not None):
+            self._spawn_order.append((node, record))
+        for cb in self.on_actor_added:
+            cb(record)
+        return record
+
+    def _restore(
+        self,
+        nodes: list[BulletRigidBodyNode],
+        actors: list[Actor],
+        specs: list[SceneSpec],
+        cols: BodyColumns,
+        visual: bool,
+        shared: list[NodePath | None] | None = None,
+    ) -> None:
+        # every body is posed (and given its velocities) before any joins the world
+        root = self.scene_root
+        nps = [root.attachNewNode(node) for node in nodes]
+        import_state(nodes, cols.count, cols.pos, cols.quat, cols.lin_vel, cols.ang_vel)
+        attach = self._world.attachRigidBody
+        flags = cols.flags.tolist()
+        for i, np in enumerate(nps):
+            node = nodes[i]
+            actor = actors[i]
+            attach(node)
+            if visual:
+                template = shared[i] if shared is not None else None
+                if template is not None:
+                    template.instanceTo(np)
+                else:
+                    actor.attach_visual(np)
+            awake = bool(flags[i] & AWAKE)
+            if not awake:
+                node.setActive(False)
+            self._register(np, actor, specs[i], visual, awake=awake)
+
+    @staticmethod
+    def _pose(np: NodePath, pos: LPoint3 | None, quat: LQuaternion | None) -> None:
+        # a pooled body keeps its old pose otherwise; a fresh one starts at the origin anyway
+        np.setPosQuat(pos if pos is not None else LPoint3.zero(), quat if quat is not None else LQuaternion.identQuat())
+
+    def _reuse(
+        self, actor: Actor, spec: SceneSpec, visual: bool, pos: LPoint3, quat: LQuaternion | None
+    ) -> NodePath | None:
+        key = ActorPool.key(actor, visual)
+        np = self.pool.take(key) if key is not None else None
+        if np is None:
+            return None
+        # reset in place: same shape and visual, fresh mass, motion and sleep state
+        node = np.node()
+        node.setMass(actor.mass)
+        node.setLinearVelocity(LVector3.zero())
+        node.setAngularVelocity(LVector3.zero())
+        node.clearForces()
+        self._apply_sleep(node, spec.sleep, reset=True)
+        np.reparentTo(self.scene_root)
+        self._pose(np, pos, quat)
+        self._world.attachRigidBody(node)
+        node.setActive(True)
+        self._register(np, actor, spec, visual)
+        return np
+
+    def _enforce_despawn(self, steps: int) -> None:
+        policy = self.despawn_policy
+        registry = self._registry
+        order = self._spawn_order
+
+        def oldest() -> ActorRecord | None:
+            while order:
+                body, record = order[0]
+                if registry.get(body) is record:
+                    return record
+                order.popleft()  # despawned or detached meanwhile
+            return None
+
+        if policy.max_actors is not None:
+            while len(registry) > policy.max_actors:
+                record = oldest()
+                if record is None:
+                    break  # actors spawned before the policy was set are not tracked
+                self.despawn(record.np)
+        if policy.lifetime is not None:
+            deadline = self.step_stats.sim_time - policy.lifetime
+            record = oldest()
+            while record is not None and record.born < deadline:
+                self.despawn(record.np)
+                record = oldest()
+
+        if policy.kill_z is None and policy.bounds_radius is None:
+            return
+        self._steps_to_bounds_check -= steps
+        if self._steps_to_bounds_check > 0 or steps == 0:
+            return  # sleeping scenes don't move, so they can't leave the bounds
+        self._steps_to_bounds_check = policy.check_interval
+        kill_z = policy.kill_z
+        r2 = policy.bounds_radius ** 2 if policy.bounds_radius is not None else None
+        out = []
+        for body, record in registry.items():
+            x, y, z = body.getTransform().getPos()
+            if (kill_z is not None and z < kill_z) or (r2 is not None and x * x + y * y > r2):
+                out.append(record.np)
+        for np in out:
+            self.despawn(np)
+
+    def _apply_rows(self, values, indices, method: str) -> int:
+        touched = apply_rows(list(self._registry), values, indices, method)
+        for body in touched:
+            self._mark_awake(body)
+        return len(touched)
+
+    def _mark_awake(self, body: BulletRigidBodyNode) -> None:
+        if body.getMass() <= 0.0:
+            return  # static: never moves, and would keep all_asleep False for good
+        self._awake.add(body)
+        self._settled = False
+        for cb in self.on_wake:
+            cb(body)
+
+    def _apply_sleep(self, body: BulletRigidBodyNode, sleep: SleepSpec | None, reset: bool = False) -> None:
+        # per-actor values win over the scene defaults, which win over Bullet's own
+        if self.sleep is not None:
+            sleep = self.sleep if sleep is None else sleep.over(self.sleep)
+        if reset:
+            sleep = BULLET_SLEEP if sleep is None else sleep.over(BULLET_SLEEP)
+        elif sleep is None:
+            return  # a new body already has Bullet's defaults
+        if sleep.linear is not None:
+            body.setLinearSleepThreshold(sleep.linear)
+        if sleep.angular is not None:
+            body.setAngularSleepThreshold(sleep.angular)
+        if sleep.enabled is not None:
+            body.setDeactivationEnabled(sleep.enabled)
+
     @property
     def bullet_world(self) -> BulletWorld:
         return self._world
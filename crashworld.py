@@ -4,7 +4,9 @@ Entry point for CrashWorld.
 """
 from __future__ import annotations
 import argparse
-from core.app import CrashWorldApp
+import time
+
+_START = time.perf_counter()  # the startup report counts imports from here
 
 
 def main() -> None:
@@ -14,9 +16,146 @@ def main() -> None:
         default=None,
         help="Path to a JSON scene config file (spawns all cubes at startup).",
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run the physics only: no window, no rendering.",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=1000,
+        help="Number of fixed physics steps to run in headless mode.",
+    )
+    parser.add_argument(
+        "--partitions",
+        default=None,
+        help="Headless only: split the ground into COLSxROWS regions, one worker process each (e.g. 2x2).",
+    )
+    parser.add_argument(
+        "--instanced",
+        action="store_true",
+        help="Draw cubes with hardware instancing (one draw call per cube size).",
+    )
+    parser.add_argument(
+        "--hud",
+        action="store_true",
+        help="Show the performance overlay at startup (toggle with F3).",
+    )
+    parser.add_argument(
+        "--perf-log",
+        default=None,
+        help="Write per-frame phase timings and counters to this file (.csv or JSON lines).",
+    )
+    parser.add_argument(
+        "--threaded",
+        action="store_true",
+        help="Step physics on a worker thread so it overlaps with rendering.",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="Record spawns, body poses and input events to this file.",
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        help="Play a recording's poses back instead of simulating (no physics; recorded clicks are not re-applied).",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Start from a saved checkpoint (.cwck) instead of the scene config.",
+    )
+    parser.add_argument(
+        "--save-checkpoint",
+        default=None,
+        help="Checkpoint file to write: after a headless run, or on F5 in the window.",
+    )
+    parser.add_argument(
+        "--stream",
+        metavar="NAME",
+        default=None,
+        help="Publish body transforms to the shared-memory block NAME (read with core.streaming.TransformClient).",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="Print how long each startup phase took, up to the first frame and the work deferred past it.",
+    )
     args = parser.parse_args()
-    
-    app = CrashWorldApp(config_path=args.config)
+
+    if args.headless:
+        # imported lazily so headless runs never touch ShowBase
+        if args.replay:
+            from panda3d.core import NodePath
+            from core.recording import Replay
+
+            replay = Replay(args.replay, NodePath("replay"), visual=False)
+            frames = replay.run()
+            print(f"Replayed {frames} frames ({replay.sim_time:.2f} s simulated), {len(replay.nodes)} bodies")
+            return
+
+        if args.partitions:
+            from core.partition import RegionGrid, run_headless
+
+            try:
+                grid = RegionGrid.parse(args.partitions)
+            except ValueError as e:
+                parser.error(str(e))
+            print(run_headless(grid, args.steps, config_path=args.config))
+            return
+
+        from core.headless import HeadlessSim
+
+        sim = HeadlessSim(config_path=args.config, checkpoint_path=args.checkpoint)
+        recorder = None
+        if args.record:
+            from core.recording import Recorder
+
+            recorder = Recorder(sim.world, args.record)
+        publisher = None
+        if args.stream:
+            from core.settings import STREAM
+            from core.streaming import TransformPublisher
+
+            publisher = TransformPublisher(
+                sim.world,
+                name=args.stream,
+                capacity=STREAM.capacity,
+                slots=STREAM.slots,
+                keyframe_interval=STREAM.keyframe_interval,
+            )
+        print(sim.run(args.steps).summary())
+        if recorder is not None:
+            recorder.close()
+        if publisher is not None:
+            publisher.close()
+        if args.save_checkpoint:
+            n = sim.world.save_checkpoint(args.save_checkpoint)
+            print(f"Saved {n} bodies to {args.save_checkpoint}")
+        return
+
+    from core.profiling import StartupTimer
+
+    startup = StartupTimer(start=_START)
+    from core.app import CrashWorldApp
+
+    startup.mark("imports")
+    app = CrashWorldApp(
+        config_path=args.config,
+        instanced=args.instanced or None,
+        perf_log=args.perf_log,
+        hud=args.hud or None,
+        record_path=args.record,
+        replay_path=args.replay,
+        threaded=args.threaded or None,
+        checkpoint_path=args.checkpoint,
+        save_checkpoint_path=args.save_checkpoint,
+        stream_name=args.stream,
+        startup=startup,
+        startup_report=args.startup_report or None,
+    )
     app.run()
 
 
@@ -1,5 +1,5 @@
 """
-Simple primitive actors: ground plane visual, dynamic box.
+Simple primitive actors: ground plane visual, dynamic box, rigid compound of boxes.
 """
 from __future__ import annotations
 
@@ -18,10 +18,13 @@ from panda3d.core import (
     LineSegs,
     Material,
     LightAttrib,
+    LPoint3,
+    TransformState,
 )
 from panda3d.bullet import BulletBoxShape, BulletRigidBodyNode
 
-from util.geom import make_grid
+from core.scene_config import CubeSpec, GroupSpec
+from util.geom import make_grid, make_grid_floor
 
 
 @dataclass
@@ -42,43 +45,141 @@ class BoxActor:
         return node
 
     def attach_visual(self, parent: NodePath) -> None:
-        fmt = GeomVertexFormat.getV3n3()
-        vdata = GeomVertexData("box", fmt, Geom.UHStatic)
-        vdata.setNumRows(24)
-        vw = GeomVertexWriter(vdata, "vertex")
-        nw = GeomVertexWriter(vdata, "normal")
+        # shares one Geom and Material per (size, color); only the GeomNode is per cube
+        _box_template(self.size, self.color).copyTo(parent)
 
-        def face(nx, ny, nz, verts):
-            for v in verts:
-                vw.addData3f(*v)
-                nw.addData3f(nx, ny, nz)
+    def shared_visual(self) -> NodePath:
+        """
+        The visual node every cube of this size and color can share: instanceTo() it under
+        each body when building many cubes at once. Never modify it in place.
+        """
+        return _box_template(self.size, self.color)
 
-        s = self.size * 0.5
-        face(0, 0, 1, [(-s, -s, s), (s, -s, s), (s, s, s), (-s, s, s)])
-        face(0, 0, -1, [(-s, s, -s), (s, s, -s), (s, -s, -s), (-s, -s, -s)])
-        face(0, 1, 0, [(-s, s, s), (s, s, s), (s, s, -s), (-s, s, -s)])
-        face(0, -1, 0, [(-s, -s, -s), (s, -s, -s), (s, -s, s), (-s, -s, s)])
-        face(1, 0, 0, [(s, -s, s), (s, -s, -s), (s, s, -s), (s, s, s)])
-        face(-1, 0, 0, [(-s, s, s), (-s, s, -s), (-s, -s, -s), (-s, -s, s)])
-
-        tris = GeomTriangles(Geom.UHStatic)
-        for i in range(0, 24, 4):
-            tris.addVertices(i, i + 1, i + 2)
-            tris.addVertices(i, i + 2, i + 3)
-
-        geom = Geom(vdata)
-        geom.addPrimitive(tris)
-        node = GeomNode("box_geom")
-        node.addGeom(geom)
-        vis = parent.attachNewNode(node)
-        vis.setColor(*self.color)
-
-        # simple material for specular highlights
-        mat = Material()
-        mat.setDiffuse((self.color[0], self.color[1], self.color[2], 1.0))
-        mat.setSpecular((0.2, 0.2, 0.2, 1.0))
-        mat.setShininess(16.0)
-        vis.setMaterial(mat, 1)
+    def instance_parts(self) -> list[tuple[float, tuple[float, float, float, float], LPoint3 | None]]:
+        """
+        (size, color, offset from the body origin) per drawn cube, for instanced rendering.
+        """
+        return [(self.size, self.color, None)]
+
+
+@dataclass
+class CompoundActor:
+    """
+    Several cubes welded into one rigid body: one box shape per cube, placed around
+    the center of mass so Bullet rotates the body about the right point.
+    """
+    cubes: tuple[CubeSpec, ...]
+
+    def __post_init__(self) -> None:
+        self.mass = sum(c.mass for c in self.cubes)
+        weights = [c.mass for c in self.cubes] if self.mass > 0.0 else [1.0] * len(self.cubes)
+        total = sum(weights)
+        self.center = LPoint3(
+            *(sum(w * c.pos[i] for w, c in zip(weights, self.cubes)) / total for i in range(3))
+        )
+
+    def local_pos(self, cube: CubeSpec) -> LPoint3:
+        """
+        Cube position relative to the body origin (the center of mass).
+        """
+        return LPoint3(*cube.pos) - self.center
+
+    def make_node(self) -> BulletRigidBodyNode:
+        node = BulletRigidBodyNode("compound")
+        for c in self.cubes:
+            s = c.size * 0.5
+            node.addShape(BulletBoxShape(LVector3(s, s, s)), TransformState.makePos(self.local_pos(c)))
+        node.setMass(self.mass)
+        return node
+
+    def attach_visual(self, parent: NodePath) -> None:
+        holder = parent.attachNewNode("compound_geom")
+        for c in self.cubes:
+            _box_template(c.size, c.color).copyTo(holder).setPos(self.local_pos(c))
+        # the cubes never move relative to each other: merge them into one GeomNode per color
+        holder.flattenStrong()
+
+    def instance_parts(self) -> list[tuple[float, tuple[float, float, float, float], LPoint3 | None]]:
+        return [(c.size, c.color, self.local_pos(c)) for c in self.cubes]
+
+
+def actor_for_spec(spec: CubeSpec | GroupSpec) -> BoxActor | CompoundActor:
+    if isinstance(spec, GroupSpec):
+        return CompoundActor(cubes=spec.cubes)
+    return BoxActor(size=spec.size, mass=spec.mass, color=spec.color)
+
+
+# Visual cache: one unit-cube Geom for all boxes, one template node per (size, color).
+_unit_box: Geom | None = None
+_box_templates: dict[tuple[float, tuple[float, float, float, float]], NodePath] = {}
+
+
+def unit_box_geom() -> Geom:
+    """
+    Shared 24-vertex flat-shaded cube with edge length 1, centered on the origin.
+    """
+    global _unit_box
+    if _unit_box is not None:
+        return _unit_box
+
+    fmt = GeomVertexFormat.getV3n3()
+    vdata = GeomVertexData("box", fmt, Geom.UHStatic)
+    vdata.setNumRows(24)
+    vw = GeomVertexWriter(vdata, "vertex")
+    nw = GeomVertexWriter(vdata, "normal")
+
+    def face(nx, ny, nz, verts):
+        for v in verts:
+            vw.addData3f(*v)
+            nw.addData3f(nx, ny, nz)
+
+    s = 0.5
+    face(0, 0, 1, [(-s, -s, s), (s, -s, s), (s, s, s), (-s, s, s)])
+    face(0, 0, -1, [(-s, s, -s), (s, s, -s), (s, -s, -s), (-s, -s, -s)])
+    face(0, 1, 0, [(-s, s, s), (s, s, s), (s, s, -s), (-s, s, -s)])
+    face(0, -1, 0, [(-s, -s, -s), (s, -s, -s), (s, -s, s), (-s, -s, s)])
+    face(1, 0, 0, [(s, -s, s), (s, -s, -s), (s, s, -s), (s, s, s)])
+    face(-1, 0, 0, [(-s, s, s), (-s, s, -s), (-s, -s, -s), (-s, -s, s)])
+
+    tris = GeomTriangles(Geom.UHStatic)
+    for i in range(0, 24, 4):
+        tris.addVertices(i, i + 1, i + 2)
+        tris.addVertices(i, i + 2, i + 3)
+
+    geom = Geom(vdata)
+    geom.addPrimitive(tris)
+    _unit_box = geom
+    return geom
+
+
+def _box_template(size: float, color: tuple[float, float, float, float]) -> NodePath:
+    key = (size, tuple(color))
+    tpl = _box_templates.get(key)
+    if tpl is not None:
+        return tpl
+
+    node = GeomNode("box_geom")
+    node.addGeom(unit_box_geom())
+    tpl = NodePath(node)
+    tpl.setScale(size)
+    tpl.setColor(*color)
+
+    # simple material for specular highlights
+    mat = Material()
+    mat.setDiffuse((color[0], color[1], color[2], 1.0))
+    mat.setSpecular((0.2, 0.2, 0.2, 1.0))
+    mat.setShininess(16.0)
+    tpl.setMaterial(mat, 1)
+
+    _box_templates[key] = tpl
+    return tpl
+
+
+def box_visual_cache_size() -> int:
+    """
+    Number of distinct (size, color) cube types built so far.
+    """
+    return len(_box_templates)
 
 
 class GroundPlane:
@@ -87,7 +188,17 @@ class GroundPlane:
     """
 
     @staticmethod
-    def attach_visual_floor(parent: NodePath, size: float = 200.0, step: float = 5.0) -> None:
+    def attach_visual_floor(parent: NodePath, size: float = 200.0, step: float = 5.0, mode: str = "lines") -> None:
+        """
+        mode "shader" draws floor and grid as one shaded quad, so size costs nothing;
+        "lines" is a plain card plus line geometry and works without shaders.
+        """
+        if mode == "shader":
+            make_grid_floor(size=size, step=step).reparentTo(parent)
+            return
+        if mode != "lines":
+            raise ValueError(f"Unknown floor mode: {mode!r}")
+
         cm = CardMaker("floor")
         cm.setFrame(-size, size, -size, size)
         floor = parent.attachNewNode(cm.generate())
@@ -0,0 +1,71 @@
+"""
+On-screen performance overlay: frame and phase percentiles, body and contact counters.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from direct.gui.OnscreenText import OnscreenText
+from direct.showbase.ShowBase import ShowBase
+from panda3d.core import TextNode
+
+from core.profiling import FrameProfiler
+
+
+@dataclass
+class PerfHud:
+    """
+    Text block in the top-right corner, refreshed a few times per second.
+    """
+    base: ShowBase
+    profiler: FrameProfiler
+    extra: Callable[[], dict[str, object]] | None = None  # more "key: value" lines
+    refresh_s: float = 0.25
+    visible: bool = True
+
+    def __post_init__(self) -> None:
+        self._text = OnscreenText(
+            text="",
+            parent=self.base.a2dTopRight,
+            pos=(-0.05, -0.08),
+            scale=0.045,
+            align=TextNode.ARight,
+            fg=(1.0, 1.0, 1.0, 1.0),
+            bg=(0.0, 0.0, 0.0, 0.45),
+            mayChange=True,
+        )
+        self._next = 0.0
+        if not self.visible:
+            self._text.hide()
+
+    # public API
+    def toggle(self) -> None:
+        self.visible = not self.visible
+        if self.visible:
+            self._text.show()
+            self._next = 0.0
+        else:
+            self._text.hide()
+
+    def update(self, now: float) -> None:
+        if not self.visible or now < self._next:
+            return
+        self._next = now + self.refresh_s
+        self._text.setText(self._format())
+
+    # internals
+    def _format(self) -> str:
+        prof = self.profiler
+        p50, p95, p99 = prof.percentiles("frame")
+        fps = 1000.0 / p50 if p50 > 0.0 else 0.0
+        lines = [f"{fps:5.0f} fps   frame {p50:5.2f} / {p95:5.2f} / {p99:5.2f} ms", "p50 / p95 / p99"]
+        for name in prof.phases:
+            a, b, c = prof.percentiles(name)
+            lines.append(f"{name:>12}  {a:6.2f} {b:6.2f} {c:6.2f}")
+        counters = dict(prof.counters)
+        if self.extra is not None:
+            counters.update(self.extra())
+        for key, value in counters.items():
+            lines.append(f"{key}: {value}")
+        return "\n".join(lines)
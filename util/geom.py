@@ -1,9 +1,52 @@
 """
-Geometry utilities: grid lines and helpers.
+Geometry utilities: grid lines, a procedural grid floor and helpers.
 """
 from __future__ import annotations
 
-from panda3d.core import LineSegs, NodePath
+from panda3d.core import CardMaker, GeomNode, LineSegs, LVecBase4f, NodePath, Shader
+
+
+_grid_cache: dict[tuple, GeomNode] = {}
+
+_FLOOR_VERT = """
+#version 150
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelMatrix;
+
+in vec4 p3d_Vertex;
+
+out vec2 v_world;
+
+void main() {
+    v_world = (p3d_ModelMatrix * p3d_Vertex).xy;
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+}
+"""
+
+_FLOOR_FRAG = """
+#version 150
+uniform vec4 floor_color;
+uniform vec4 line_color;
+uniform float grid_step;
+uniform float line_px;
+
+in vec2 v_world;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    vec2 coord = v_world / grid_step;
+    vec2 deriv = fwidth(coord);
+    // distance to the nearest line, in pixels
+    vec2 dist = abs(fract(coord - 0.5) - 0.5) / max(deriv, vec2(1e-6));
+    float line = 1.0 - clamp(min(dist.x, dist.y) / line_px, 0.0, 1.0);
+    // far away the lines get denser than a few pixels; fade them out instead of flickering
+    float fade = 1.0 - smoothstep(0.15, 0.5, max(deriv.x, deriv.y));
+    p3d_FragColor = mix(floor_color, line_color, line * fade);
+}
+"""
+
+_floor_shader: Shader | None = None
 
 
 def make_grid(
@@ -14,7 +57,18 @@ def make_grid(
 ) -> NodePath:
     """
     Create a square grid on Z=z spanning [-size, size].
+
+    The line geometry is built once per (size, step, z, color); later calls return
+    a new node sharing the same vertex data.
     """
+    key = (float(size), float(step), float(z), tuple(color))
+    node = _grid_cache.get(key)
+    if node is None:
+        node = _grid_cache[key] = _build_grid(size, step, z, color)
+    return NodePath(node.makeCopy())
+
+
+def _build_grid(size: float, step: float, z: float, color: tuple[float, float, float, float]) -> GeomNode:
     ls = LineSegs()
     ls.setThickness(1.0)
     ls.setColor(*color)
@@ -28,5 +82,33 @@ def make_grid(
         ls.moveTo(-size, y, z)
         ls.drawTo(size, y, z)
 
-    return NodePath(ls.create())
+    return ls.create()
+
+
+def make_grid_floor(
+    size: float,
+    step: float,
+    floor_color: tuple[float, float, float, float] = (0.85, 0.85, 0.85, 1.0),
+    line_color: tuple[float, float, float, float] = (0.75, 0.75, 0.75, 1.0),
+    line_px: float = 1.0,
+) -> NodePath:
+    """
+    Create a floor quad on Z=0 spanning [-size, size] with the grid drawn by a shader.
+
+    It is four vertices and one draw call at any size; lines are anti-aliased and
+    fade out with distance. Needs GLSL 1.50.
+    """
+    global _floor_shader
+    if _floor_shader is None:
+        _floor_shader = Shader.make(Shader.SL_GLSL, _FLOOR_VERT, _FLOOR_FRAG)
 
+    cm = CardMaker("grid_floor")
+    cm.setFrame(-size, size, -size, size)
+    floor = NodePath(cm.generate())
+    floor.setP(-90)
+    floor.setShader(_floor_shader)
+    floor.setShaderInput("floor_color", LVecBase4f(*floor_color))
+    floor.setShaderInput("line_color", LVecBase4f(*line_color))
+    floor.setShaderInput("grid_step", float(step))
+    floor.setShaderInput("line_px", float(line_px))
+    return floor